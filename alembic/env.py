@@ -30,7 +30,10 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-DATABASE_URL = os.getenv("POSTGRES_URL_ALEMBIC", "")
+# `alembic -x url=<shard url> upgrade head` migrates one shard database.
+DATABASE_URL = context.get_x_argument(as_dictionary=True).get(
+    "url", os.getenv("POSTGRES_URL_ALEMBIC", "")
+)
 config.set_main_option("sqlalchemy.url", DATABASE_URL)
 
 # other values from the config, defined by the needs of env.py,
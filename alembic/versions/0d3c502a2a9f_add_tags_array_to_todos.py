@@ -0,0 +1,126 @@
+"""add tags array to todos
+
+Revision ID: 0d3c502a2a9f
+Revises: 7ee1bc25a46d
+Create Date: 2026-10-19 16:02:18.640571
+
+Adds todos.tags (todo_category[]) with a (user_id, tags) GIN index through
+btree_gin, backfills it from categories in committed batches, and rebuilds
+the covering sort indexes so list pages keep their index-only scans.
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0d3c502a2a9f'
+down_revision: Union[str, Sequence[str], None] = '7ee1bc25a46d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = int(os.getenv("TODOS_TAGS_BATCH_SIZE", "50000"))
+
+# Snapshot of TODO_SORT_EXPRESSIONS / TODO_LIST_COLUMNS in src/entities/todos.py.
+SORT_INDEXES = {
+    'priority': 'priority',
+    'deadline': "coalesce(deadline, 'infinity'::timestamptz)",
+    'created_at': 'created_at',
+    'title': 'title',
+}
+LIST_COLUMNS = [
+    'title',
+    'description',
+    'categories',
+    'tags',
+    'priority',
+    'complete',
+    'deadline',
+    'created_at',
+]
+
+
+def _create_sort_indexes(list_columns: list[str]) -> None:
+    for field, expression in SORT_INDEXES.items():
+        op.create_index(
+            f'ix_todos_sort_{field}',
+            'todos',
+            ['user_id', sa.text(expression), 'id'],
+            unique=False,
+            postgresql_where=sa.text('deleted_at IS NULL'),
+            postgresql_include=[
+                column for column in list_columns if column != expression
+            ],
+        )
+
+
+def _drop_sort_indexes() -> None:
+    for field in SORT_INDEXES:
+        op.drop_index(f'ix_todos_sort_{field}', table_name='todos')
+
+
+def _backfill_in_batches() -> None:
+    conn = op.get_bind()
+    last_id = None
+    with op.get_context().autocommit_block():
+        while True:
+            last_id = conn.execute(
+                sa.text(
+                    "WITH batch AS ("
+                    "  SELECT id, user_id FROM todos"
+                    "  WHERE CAST(:last_id AS uuid) IS NULL OR id > CAST(:last_id AS uuid)"
+                    "  ORDER BY id LIMIT :batch_size"
+                    "), filled AS ("
+                    "  UPDATE todos t SET tags = ARRAY[t.categories]"
+                    "  FROM batch b WHERE t.id = b.id AND t.user_id = b.user_id"
+                    "  AND t.tags = '{}' AND t.categories IS NOT NULL"
+                    ") SELECT id FROM batch ORDER BY id DESC LIMIT 1"
+                ),
+                {"last_id": last_id, "batch_size": BATCH_SIZE},
+            ).scalar()
+            if last_id is None:
+                break
+        # Rows written by the previous release behind the cursor.
+        conn.execute(
+            sa.text(
+                "UPDATE todos SET tags = ARRAY[categories] "
+                "WHERE tags = '{}' AND categories IS NOT NULL"
+            )
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    op.add_column(
+        'todos',
+        sa.Column(
+            'tags',
+            postgresql.ARRAY(
+                postgresql.ENUM(name='todo_category', create_type=False)
+            ),
+            server_default=sa.text("'{}'"),
+            nullable=False,
+        ),
+    )
+    _backfill_in_batches()
+    op.create_index(
+        'ix_todos_tags',
+        'todos',
+        ['user_id', 'tags'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+    _drop_sort_indexes()
+    _create_sort_indexes(LIST_COLUMNS)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _drop_sort_indexes()
+    _create_sort_indexes([column for column in LIST_COLUMNS if column != 'tags'])
+    op.drop_index('ix_todos_tags', table_name='todos')
+    op.drop_column('todos', 'tags')
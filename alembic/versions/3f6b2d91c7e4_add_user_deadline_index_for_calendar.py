@@ -0,0 +1,36 @@
+"""add user deadline index for calendar
+
+Revision ID: 3f6b2d91c7e4
+Revises: a84176e7995d
+Create Date: 2026-10-19 18:04:37.215096
+
+The calendar view reads one user's todos with a deadline in a time window.
+ix_todos_open_deadline leads with deadline across all users and skips
+completed todos, so it cannot serve that range.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6b2d91c7e4'
+down_revision: Union[str, Sequence[str], None] = 'a84176e7995d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_todos_user_deadline',
+        'todos',
+        ['user_id', 'deadline', 'id'],
+        unique=False,
+        postgresql_where=sa.text('deadline IS NOT NULL AND deleted_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_todos_user_deadline', table_name='todos')
@@ -0,0 +1,148 @@
+"""hash partition todos by user_id
+
+Revision ID: 519bea6bf0bf
+Revises: a8b626fd50a7
+Create Date: 2026-10-19 10:12:41.118204
+
+Online migration: the partitioned copy is kept in sync by a trigger while
+existing rows are copied in committed batches, then the tables are swapped
+under a short ACCESS EXCLUSIVE lock.
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '519bea6bf0bf'
+down_revision: Union[str, Sequence[str], None] = 'a8b626fd50a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Pinned: downgrades and reruns must see the layout this revision created.
+PARTITION_COUNT = 16
+BATCH_SIZE = int(os.getenv("TODOS_PARTITION_BATCH_SIZE", "50000"))
+
+
+def _copy_in_batches(source: str, target: str) -> None:
+    conn = op.get_bind()
+    last_id = None
+    with op.get_context().autocommit_block():
+        while True:
+            last_id = conn.execute(
+                sa.text(
+                    f"WITH batch AS ("
+                    f"  SELECT * FROM {source}"
+                    f"  WHERE CAST(:last_id AS uuid) IS NULL OR id > CAST(:last_id AS uuid)"
+                    f"  ORDER BY id LIMIT :batch_size"
+                    # Writers to these rows wait for the batch to commit, so
+                    # their trigger upsert lands on the copied row.
+                    f"  FOR SHARE"
+                    f"), copied AS ("
+                    f"  INSERT INTO {target} SELECT * FROM batch"
+                    f"  ON CONFLICT DO NOTHING"
+                    f") SELECT id FROM batch ORDER BY id DESC LIMIT 1"
+                ),
+                {"last_id": last_id, "batch_size": BATCH_SIZE},
+            ).scalar()
+            if last_id is None:
+                break
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if PARTITION_COUNT < 1:
+        return
+
+    op.execute(
+        "CREATE TABLE todos_partitioned "
+        "(LIKE todos INCLUDING DEFAULTS) PARTITION BY HASH (user_id)"
+    )
+    for remainder in range(PARTITION_COUNT):
+        op.execute(
+            f"CREATE TABLE todos_p{remainder} PARTITION OF todos_partitioned "
+            f"FOR VALUES WITH (MODULUS {PARTITION_COUNT}, REMAINDER {remainder})"
+        )
+    op.execute(
+        "ALTER TABLE todos_partitioned "
+        "ADD CONSTRAINT todos_partitioned_pkey PRIMARY KEY (id, user_id)"
+    )
+    op.execute(
+        "ALTER TABLE todos_partitioned ADD CONSTRAINT todos_partitioned_user_id_fkey "
+        "FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE"
+    )
+    op.execute("CREATE INDEX ix_todos_partitioned_user_id ON todos_partitioned (user_id)")
+
+    # Mirror writes made while the copy runs. An upsert rather than
+    # DELETE + INSERT: a row a batch has copied but not yet committed is
+    # invisible to the DELETE, and the INSERT would then fail on its key.
+    columns = [
+        column["name"]
+        for column in sa.inspect(op.get_bind()).get_columns("todos")
+        if column["name"] not in ("id", "user_id")
+    ]
+    assignments = ", ".join(f"{name} = EXCLUDED.{name}" for name in columns)
+    op.execute(
+        f"""
+        CREATE FUNCTION todos_partition_sync() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                DELETE FROM todos_partitioned
+                WHERE id = OLD.id AND user_id = OLD.user_id;
+                RETURN OLD;
+            END IF;
+            IF TG_OP = 'UPDATE'
+               AND (OLD.id, OLD.user_id) IS DISTINCT FROM (NEW.id, NEW.user_id) THEN
+                DELETE FROM todos_partitioned
+                WHERE id = OLD.id AND user_id = OLD.user_id;
+            END IF;
+            INSERT INTO todos_partitioned SELECT NEW.*
+            ON CONFLICT (id, user_id) DO UPDATE SET {assignments};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER todos_partition_sync AFTER INSERT OR UPDATE OR DELETE "
+        "ON todos FOR EACH ROW EXECUTE FUNCTION todos_partition_sync()"
+    )
+
+    _copy_in_batches("todos", "todos_partitioned")
+
+    op.execute("LOCK TABLE todos IN ACCESS EXCLUSIVE MODE")
+    # A batch can re-copy a row deleted after its snapshot was taken.
+    op.execute(
+        "DELETE FROM todos_partitioned p WHERE NOT EXISTS "
+        "(SELECT 1 FROM todos t WHERE t.id = p.id AND t.user_id = p.user_id)"
+    )
+    op.execute("DROP TRIGGER todos_partition_sync ON todos")
+    op.execute("DROP FUNCTION todos_partition_sync()")
+    op.execute("DROP TABLE todos")
+    op.execute("ALTER TABLE todos_partitioned RENAME TO todos")
+    op.execute("ALTER TABLE todos RENAME CONSTRAINT todos_partitioned_pkey TO todos_pkey")
+    op.execute(
+        "ALTER TABLE todos "
+        "RENAME CONSTRAINT todos_partitioned_user_id_fkey TO todos_user_id_fkey"
+    )
+    op.execute("ALTER INDEX ix_todos_partitioned_user_id RENAME TO ix_todos_user_id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if PARTITION_COUNT < 1:
+        return
+
+    op.execute("LOCK TABLE todos IN ACCESS EXCLUSIVE MODE")
+    op.execute("CREATE TABLE todos_unpartitioned (LIKE todos INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO todos_unpartitioned SELECT * FROM todos")
+    op.execute("DROP TABLE todos")
+    op.execute("ALTER TABLE todos_unpartitioned RENAME TO todos")
+    op.execute("ALTER TABLE todos ADD CONSTRAINT todos_pkey PRIMARY KEY (id)")
+    op.execute("ALTER TABLE todos ADD CONSTRAINT todos_id_key UNIQUE (id)")
+    op.execute(
+        "ALTER TABLE todos ADD CONSTRAINT todos_user_id_fkey "
+        "FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE"
+    )
+    op.execute("CREATE INDEX ix_todos_user_id ON todos (user_id)")
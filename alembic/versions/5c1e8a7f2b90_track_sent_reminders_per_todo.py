@@ -0,0 +1,121 @@
+"""track sent reminders per todo
+
+Revision ID: 5c1e8a7f2b90
+Revises: 3f6b2d91c7e4
+Create Date: 2026-10-19 19:12:40.118325
+
+Replaces the global (deadline, id) reminder watermarks with per-todo
+due_soon_sent_for / overdue_sent_for columns. A watermark skipped every
+todo created or moved to a deadline behind it. Open todos the old
+scheduler already announced are backfilled in committed batches, up to
+each watermark, so the switch sends no duplicates.
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e8a7f2b90'
+down_revision: Union[str, Sequence[str], None] = '3f6b2d91c7e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = int(os.getenv("TODOS_REMINDERS_BATCH_SIZE", "50000"))
+
+PENDING_INDEXES = {
+    'ix_todos_due_soon_pending': 'due_soon_sent_for',
+    'ix_todos_overdue_pending': 'overdue_sent_for',
+}
+
+
+def _backfill_in_batches() -> None:
+    conn = op.get_bind()
+    watermarks = dict(
+        conn.execute(sa.text("SELECT name, deadline FROM reminder_watermarks")).all()
+    )
+    now = conn.execute(sa.text("SELECT now()")).scalar()
+    # Without a watermark the old scheduler had announced nothing before now.
+    overdue_upto = watermarks.get('todo.overdue', now)
+    due_soon_upto = max(watermarks.get('todo.due_soon', now), overdue_upto)
+
+    last_id = None
+    with op.get_context().autocommit_block():
+        while True:
+            last_id = conn.execute(
+                sa.text(
+                    "WITH batch AS ("
+                    "  SELECT id, user_id FROM todos"
+                    "  WHERE CAST(:last_id AS uuid) IS NULL OR id > CAST(:last_id AS uuid)"
+                    "  ORDER BY id LIMIT :batch_size"
+                    "), marked AS ("
+                    "  UPDATE todos t SET"
+                    "    due_soon_sent_for = t.deadline,"
+                    "    overdue_sent_for = CASE"
+                    "      WHEN t.deadline <= :overdue_upto THEN t.deadline END"
+                    "  FROM batch b WHERE t.id = b.id AND t.user_id = b.user_id"
+                    "  AND t.complete = false AND t.deleted_at IS NULL"
+                    "  AND t.deadline <= :due_soon_upto"
+                    ") SELECT id FROM batch ORDER BY id DESC LIMIT 1"
+                ),
+                {
+                    "last_id": last_id,
+                    "batch_size": BATCH_SIZE,
+                    "overdue_upto": overdue_upto,
+                    "due_soon_upto": due_soon_upto,
+                },
+            ).scalar()
+            if last_id is None:
+                break
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'todos',
+        sa.Column('due_soon_sent_for', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        'todos',
+        sa.Column('overdue_sent_for', sa.DateTime(timezone=True), nullable=True),
+    )
+    _backfill_in_batches()
+    for name, column in PENDING_INDEXES.items():
+        op.create_index(
+            name,
+            'todos',
+            ['deadline', 'id'],
+            unique=False,
+            postgresql_where=sa.text(
+                f'complete = false AND deleted_at IS NULL '
+                f'AND {column} IS DISTINCT FROM deadline'
+            ),
+        )
+    op.drop_index('ix_todos_open_deadline', table_name='todos')
+    op.drop_table('reminder_watermarks')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The old scheduler starts again from the present when it has no watermark.
+    op.create_table(
+        'reminder_watermarks',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('deadline', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('todo_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.create_index(
+        'ix_todos_open_deadline',
+        'todos',
+        ['deadline', 'id'],
+        unique=False,
+        postgresql_where=sa.text('complete = false AND deleted_at IS NULL'),
+    )
+    for name in PENDING_INDEXES:
+        op.drop_index(name, table_name='todos')
+    op.drop_column('todos', 'overdue_sent_for')
+    op.drop_column('todos', 'due_soon_sent_for')
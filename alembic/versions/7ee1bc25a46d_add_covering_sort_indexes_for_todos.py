@@ -0,0 +1,63 @@
+"""add covering sort indexes for todo lists
+
+Revision ID: 7ee1bc25a46d
+Revises: e210a2848760
+Create Date: 2026-10-19 14:21:07.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7ee1bc25a46d'
+down_revision: Union[str, Sequence[str], None] = 'e210a2848760'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Snapshot of TODO_SORT_EXPRESSIONS / TODO_LIST_COLUMNS in src/entities/todos.py.
+SORT_INDEXES = {
+    'priority': 'priority',
+    'deadline': "coalesce(deadline, 'infinity'::timestamptz)",
+    'created_at': 'created_at',
+    'title': 'title',
+}
+LIST_COLUMNS = [
+    'title',
+    'description',
+    'categories',
+    'priority',
+    'complete',
+    'deadline',
+    'created_at',
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_todos_active_user_priority', table_name='todos')
+    for field, expression in SORT_INDEXES.items():
+        op.create_index(
+            f'ix_todos_sort_{field}',
+            'todos',
+            ['user_id', sa.text(expression), 'id'],
+            unique=False,
+            postgresql_where=sa.text('deleted_at IS NULL'),
+            postgresql_include=[
+                column for column in LIST_COLUMNS if column != expression
+            ],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for field in SORT_INDEXES:
+        op.drop_index(f'ix_todos_sort_{field}', table_name='todos')
+    op.create_index(
+        'ix_todos_active_user_priority',
+        'todos',
+        ['user_id', 'priority'],
+        unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
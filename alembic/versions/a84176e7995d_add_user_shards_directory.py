@@ -0,0 +1,50 @@
+"""add user shards directory
+
+Revision ID: a84176e7995d
+Revises: 0d3c502a2a9f
+Create Date: 2026-10-19 17:11:52.301884
+
+Every existing user is on the primary database, so the directory is
+backfilled with shard 'primary'. Shard databases get the table too but have
+no users yet and never read it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a84176e7995d'
+down_revision: Union[str, Sequence[str], None] = '0d3c502a2a9f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'user_shards',
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('username', sa.String(length=30), nullable=False),
+        sa.Column('shard', sa.String(length=30), nullable=False),
+        sa.Column('moving', sa.Boolean(), server_default=sa.false(), nullable=False),
+        sa.Column(
+            'updated_at',
+            sa.DateTime(timezone=True),
+            server_default=sa.text('now()'),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint('user_id'),
+        sa.UniqueConstraint('email'),
+        sa.UniqueConstraint('username'),
+    )
+    op.execute(
+        "INSERT INTO user_shards (user_id, email, username, shard) "
+        "SELECT id, email, username, 'primary' FROM users"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_shards')
@@ -0,0 +1,43 @@
+"""add deadline reminder watermarks and open deadline index
+
+Revision ID: bbcfde471bbe
+Revises: 519bea6bf0bf
+Create Date: 2026-10-19 11:02:15.540371
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'bbcfde471bbe'
+down_revision: Union[str, Sequence[str], None] = '519bea6bf0bf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'reminder_watermarks',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('deadline', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('todo_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.create_index(
+        'ix_todos_open_deadline',
+        'todos',
+        ['deadline', 'id'],
+        unique=False,
+        postgresql_where=sa.text('complete = false'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_todos_open_deadline', table_name='todos')
+    op.drop_table('reminder_watermarks')
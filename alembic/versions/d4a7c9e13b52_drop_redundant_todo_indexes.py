@@ -0,0 +1,74 @@
+"""drop redundant todo indexes
+
+Revision ID: d4a7c9e13b52
+Revises: 5c1e8a7f2b90
+Create Date: 2026-10-19 21:12:45.308117
+
+ix_todos_user_id serves no query: lookups by id use the (id, user_id)
+primary key and list statements use the ix_todos_sort_* indexes. The sort
+indexes are rebuilt without INCLUDE columns. The list statement selects
+description, so it can never be index-only once description is left out,
+and the other included columns only made every entry larger.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a7c9e13b52'
+down_revision: Union[str, Sequence[str], None] = '5c1e8a7f2b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Snapshot of TODO_SORT_EXPRESSIONS in src/entities/todos.py, and of the
+# columns the sort indexes carried before this revision.
+SORT_INDEXES = {
+    'priority': 'priority',
+    'deadline': "coalesce(deadline, 'infinity'::timestamptz)",
+    'created_at': 'created_at',
+    'title': 'title',
+}
+LIST_COLUMNS = [
+    'title',
+    'description',
+    'categories',
+    'tags',
+    'priority',
+    'complete',
+    'deadline',
+    'created_at',
+]
+
+
+def _create_sort_indexes(list_columns: list[str]) -> None:
+    for field, expression in SORT_INDEXES.items():
+        op.create_index(
+            f'ix_todos_sort_{field}',
+            'todos',
+            ['user_id', sa.text(expression), 'id'],
+            unique=False,
+            postgresql_where=sa.text('deleted_at IS NULL'),
+            postgresql_include=[
+                column for column in list_columns if column != expression
+            ],
+        )
+
+
+def _drop_sort_indexes() -> None:
+    for field in SORT_INDEXES:
+        op.drop_index(f'ix_todos_sort_{field}', table_name='todos')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_todos_user_id', table_name='todos')
+    _drop_sort_indexes()
+    _create_sort_indexes([])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _drop_sort_indexes()
+    _create_sort_indexes(LIST_COLUMNS)
+    op.create_index('ix_todos_user_id', 'todos', ['user_id'], unique=False)
@@ -0,0 +1,60 @@
+"""add soft delete to todos
+
+Revision ID: e210a2848760
+Revises: ac02d224c426
+Create Date: 2026-10-19 13:05:44.392816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e210a2848760'
+down_revision: Union[str, Sequence[str], None] = 'ac02d224c426'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('todos', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_todos_active_user_priority',
+        'todos',
+        ['user_id', 'priority'],
+        unique=False,
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+    op.create_index(
+        'ix_todos_deleted_at',
+        'todos',
+        ['deleted_at'],
+        unique=False,
+        postgresql_where=sa.text('deleted_at IS NOT NULL'),
+    )
+    op.drop_index('ix_todos_open_deadline', table_name='todos')
+    op.create_index(
+        'ix_todos_open_deadline',
+        'todos',
+        ['deadline', 'id'],
+        unique=False,
+        postgresql_where=sa.text('complete = false AND deleted_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_todos_open_deadline', table_name='todos')
+    op.create_index(
+        'ix_todos_open_deadline',
+        'todos',
+        ['deadline', 'id'],
+        unique=False,
+        postgresql_where=sa.text('complete = false'),
+    )
+    op.drop_index('ix_todos_deleted_at', table_name='todos')
+    op.drop_index('ix_todos_active_user_priority', table_name='todos')
+    op.execute('DELETE FROM todos WHERE deleted_at IS NOT NULL')
+    op.drop_column('todos', 'deleted_at')
@@ -0,0 +1,22 @@
+import os
+
+from fastapi import APIRouter, HTTPException, Request
+from starlette import status
+
+from src.auth.service import AdminUser
+from src.observability.tracing import TracedRoute
+
+router = APIRouter(prefix="/admin/admission", tags=["admin"], route_class=TracedRoute)
+
+
+@router.get("/stats")
+async def get_admission_stats(request: Request, admin: AdminUser):
+    """This worker's admission pools: limit, in flight, queued, admitted, shed.
+
+    404 when ADMISSION_ENABLED is off, since there are no pools to report.
+    """
+
+    admission = getattr(request.state, "admission", None)
+    if admission is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return {"worker": os.getpid(), "pools": admission.stats()}
@@ -2,9 +2,15 @@ from fastapi import FastAPI
 from src.auth.router import router as auth_router
 from src.users.router import router as users_router
 from src.todos.router import router as todos_router
+from src.events.router import router as events_router
+from src.profiling.router import router as profiling_router
+from src.admission.router import router as admission_router
 
 
 def register_routes(app: FastAPI):
     app.include_router(auth_router)
     app.include_router(users_router)
     app.include_router(todos_router)
+    app.include_router(events_router)
+    app.include_router(profiling_router)
+    app.include_router(admission_router)
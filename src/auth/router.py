@@ -1,19 +1,46 @@
 from fastapi import APIRouter, Depends, Response, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from starlette import status
 from typing import Annotated
 from src.dependency import DbSession
 from src.auth.schemas import RegisterUserRequest, Tokens
 from src.auth.service import create_user, login, refresh_access_token
+from src.idempotency.service import (
+    IdempotencyKeyHeader,
+    request_fingerprint,
+    run_idempotent,
+)
+from src.observability.tracing import TracedRoute
 
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=TracedRoute)
 
 
 @router.post("/create", status_code=status.HTTP_201_CREATED)
-async def register_user(db: DbSession, register_user_request: RegisterUserRequest):
-    user = create_user(db, register_user_request)
-    return {"id": user.id, "email": user.email, "username": user.username}
+async def register_user(
+    db: DbSession,
+    register_user_request: RegisterUserRequest,
+    idempotency_key: IdempotencyKeyHeader = None,
+):
+    def register():
+        user = create_user(db, register_user_request)
+        return {"id": user.id, "email": user.email, "username": user.username}
+
+    # Argon2 hashing and the directory/shard commits stay off the event loop.
+    if idempotency_key is None:
+        return await run_in_threadpool(register)
+    # No db=: the directory row may commit apart from the user row. A retry
+    # after a crash between them is answered by the directory's uniqueness
+    # check with 409, so it never creates a second user.
+    return await run_idempotent(
+        "auth.create",
+        idempotency_key,
+        # The password never reaches the idempotency table, not even hashed.
+        request_fingerprint(register_user_request, exclude={"password"}),
+        register,
+        status_code=status.HTTP_201_CREATED,
+    )
 
 
 @router.post("/login", status_code=status.HTTP_200_OK, response_model=Tokens)
@@ -22,7 +49,8 @@ async def login_for_tokens(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     response: Response,
 ):
-    return login(db, form_data, response)
+    # Argon2 verification is CPU- and memory-bound; keep it off the event loop.
+    return await run_in_threadpool(login, db, form_data, response)
 
 
 @router.post("/refresh", status_code=status.HTTP_200_OK, response_model=Tokens)
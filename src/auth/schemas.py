@@ -1,4 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field, field_validator
+from dataclasses import dataclass, field
+from typing import Any, Mapping
 from uuid import UUID
 import re
 
@@ -44,10 +46,22 @@ class Tokens(BaseModel):
     token_type: str
 
 
-class TokenData(BaseModel):
-    user_id: str | None = None
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """The authenticated caller, built once per request from a verified JWT.
 
-    def get_uuid(cls) -> UUID | None:
-        if cls.user_id:
-            return UUID(cls.user_id)
-        return None
+    A plain slotted dataclass rather than a Pydantic model: the claims are
+    already validated by jwt.decode, and user_id is parsed to a UUID once.
+    """
+
+    user_id: UUID
+    email: str | None = None
+    expires_at: int | None = None
+    claims: Mapping[str, Any] = field(default_factory=dict, repr=False)
+
+    def get_uuid(self) -> UUID:
+        return self.user_id
+
+
+# Kept for callers that still import the old Pydantic name.
+TokenData = Principal
@@ -2,16 +2,23 @@ import os
 from dotenv import load_dotenv
 from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
-from src.auth.schemas import RegisterUserRequest, TokenData, Tokens
+from src.auth.schemas import Principal, RegisterUserRequest, Tokens
+from src.entities.shards import UserShard
 from src.entities.users import Users
+from src.events.outbox import record_event
+from src.database.routing import mark_user_write
+from src.database.sharding import shards
 import logging
+from src.observability.tracing import traced
 from starlette import status
 from datetime import datetime, timezone, timedelta
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.future import select
 from sqlalchemy.orm import Session
 import jwt
 from jwt.exceptions import PyJWTError
-from uuid import UUID
+from uuid import UUID, uuid4
 from typing import Annotated
 from fastapi import Depends, HTTPException, Response, Request
 
@@ -22,27 +29,61 @@ SECRET_KEY = os.getenv("JWT_SECRET")
 ALGORITHM = os.getenv("ALGORITHM")
 JWT_ACCESS_TOKEN_TTL = int(os.getenv("JWT_ACCESS_TOKEN_TTL"))
 JWT_REFRESH_TOKEN_TTL = int(os.getenv("JWT_REFRESH_TOKEN_TTL"))
-
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+ADMIN_USER_IDS = {
+    UUID(user_id.strip())
+    for user_id in os.getenv("ADMIN_USER_IDS", "").split(",")
+    if user_id.strip()
+}
+
+# Argon2id cost; calibrate with `python -m src.scripts.calibrate_argon2`.
+# Hashes made with other settings are upgraded on the next successful login.
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+
+logger = logging.getLogger(__name__)
+
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=ARGON2_TIME_COST,
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__parallelism=ARGON2_PARALLELISM,
+)
 oauth2_bearer = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 if not SECRET_KEY:
     raise RuntimeError("JWT_SECRET not set in environment")
 
 
+@traced("argon2.hash")
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+@traced("argon2.verify")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
 
     try:
         return pwd_context.verify(plain_password, hashed_password)
     except Exception as e:
-        logging.error(f"Password verification failed: {e}")
+        logger.error("Password verification failed: %s", e)
         return False
 
 
+@traced("argon2.verify")
+def verify_and_rehash(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Verify a password and return a new hash if the stored one uses old costs."""
+
+    try:
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+    except Exception as e:
+        logger.error("Password verification failed: %s", e)
+        return False, None
+
+
 # async def authenticate_user(
 #     email: str, password: str, db: AsyncSession
 # ) -> Users | bool:
@@ -67,6 +108,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 #         )
 
 
+@traced()
 def create_access_token(
     email: str, user_id: UUID, expires_minutes: int = JWT_ACCESS_TOKEN_TTL
 ) -> str:
@@ -76,13 +118,14 @@ def create_access_token(
         payload = {"sub": email, "id": str(user_id), "exp": expire}
         return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
     except Exception as e:
-        logging.error(f"Failed to create access token: {e}")
+        logger.error("Failed to create access token: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create access token",
         )
 
 
+@traced()
 def create_refresh_token(
     email: str, user_id: UUID, expires_days: int = JWT_REFRESH_TOKEN_TTL
 ) -> str:
@@ -92,55 +135,71 @@ def create_refresh_token(
         payload = {"sub": email, "id": str(user_id), "exp": expire, "type": "refresh"}
         return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
     except Exception as e:
-        logging.error(f"Failed to create refresh token: {e}")
+        logger.error("Failed to create refresh token: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create refresh token",
         )
 
 
-def verify_token(token: str) -> TokenData:
+@traced()
+def verify_token(token: str) -> Principal:
 
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("id")
-        if not user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload"
-            )
-        return TokenData(user_id=user_id)
+        user_id = UUID(payload["id"])
+        return Principal(
+            user_id=user_id,
+            email=payload.get("sub"),
+            expires_at=payload.get("exp"),
+            claims=payload,
+        )
     except PyJWTError as e:
-        logging.warning(f"Token verification failed: {e}")
+        logger.warning("Token verification failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token"
         )
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload"
+        )
 
 
+@traced()
 def create_user(db: Session, register_user_request: RegisterUserRequest):
+    """Register a user on the shard the ring picks for its new id.
+
+    `db` is a primary session: the user_shards directory row reserves the
+    email and username globally. When the user lands on another shard the
+    reservation is committed first and undone if the shard write fails.
+    """
 
     try:
-        existing_email = (
-            db.query(Users).filter(Users.email == register_user_request.email).first()
-        )
+        existing = db.execute(
+            select(UserShard.email, UserShard.username)
+            .where(
+                or_(
+                    UserShard.email == register_user_request.email,
+                    UserShard.username == register_user_request.username,
+                )
+            )
+            .limit(2)
+        ).all()
 
-        if existing_email:
-            logging.warning(
-                f"Registration failed: Email already exists: {register_user_request.email}"
+        if any(row.email == register_user_request.email for row in existing):
+            logger.warning(
+                "Registration failed: Email already exists: %s",
+                register_user_request.email,
             )
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Email already registered",
             )
 
-        existing_username = (
-            db.query(Users)
-            .filter(Users.username == register_user_request.username)
-            .first()
-        )
-
-        if existing_username:
-            logging.warning(
-                f"Registration failed: Username already exists: {register_user_request.username}"
+        if existing:
+            logger.warning(
+                "Registration failed: Username already exists: %s",
+                register_user_request.username,
             )
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
@@ -148,44 +207,135 @@ def create_user(db: Session, register_user_request: RegisterUserRequest):
             )
 
         create_user_model = Users(
+            id=uuid4(),
             email=register_user_request.email,
             username=register_user_request.username,
             password=get_password_hash(register_user_request.password),
         )
-        db.add(create_user_model)
-        db.commit()
-
-        logging.info(f"Successfully registered user: {register_user_request.email}")
+        shard = shards.ring.shard_for(create_user_model.id)
+        directory_entry = UserShard(
+            user_id=create_user_model.id,
+            email=create_user_model.email,
+            username=create_user_model.username,
+            shard=shard,
+        )
+        db.add(directory_entry)
+        shard_db = db if shards.is_primary(shard) else shards.sessions[shard]()
+        try:
+            if shard_db is not db:
+                db.commit()
+            shard_db.add(create_user_model)
+            record_event(
+                shard_db,
+                "user.created",
+                "user",
+                create_user_model.id,
+                {
+                    "id": create_user_model.id,
+                    "email": create_user_model.email,
+                    "username": create_user_model.username,
+                },
+            )
+            shard_db.commit()
+        except Exception:
+            shard_db.rollback()
+            if shard_db is not db:
+                db.delete(directory_entry)
+                db.commit()
+            raise
+        finally:
+            if shard_db is not db:
+                shard_db.close()
+
+        logger.info(
+            "Successfully registered user %s on shard %s",
+            register_user_request.email,
+            shard,
+        )
         return create_user_model
 
     except HTTPException:
         raise
+    except IntegrityError:
+        db.rollback()
+        logger.warning(
+            "Registration raced for %s / %s",
+            register_user_request.email,
+            register_user_request.username,
+        )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Email or username already taken",
+        )
     except Exception as e:
-        logging.error(f"Failed to register user {register_user_request.email}: {e}")
+        logger.error("Failed to register user %s: %s", register_user_request.email, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to register user",
         )
 
 
-def get_current_user(token: Annotated[str, Depends(oauth2_bearer)]) -> TokenData:
+def get_current_user(token: Annotated[str, Depends(oauth2_bearer)]) -> Principal:
     return verify_token(token)
 
 
-CurrentUser = Annotated[TokenData, Depends(get_current_user)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
+
 
+def is_admin(user: Principal | None) -> bool:
+    return user is not None and user.user_id in ADMIN_USER_IDS
+
+
+def require_admin(current_user: CurrentUser) -> Principal:
+    if not is_admin(current_user):
+        logger.warning(
+            "Non-admin %s tried to use an admin endpoint", current_user.user_id
+        )
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
+        )
+    return current_user
 
+
+AdminUser = Annotated[Principal, Depends(require_admin)]
+
+
+@traced()
 def login(
     db: Session,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     response: Response,
 ) -> Tokens:
 
-    user = db.query(Users).filter(Users.email == form_data.username).first()
+    user_id = db.execute(
+        select(UserShard.user_id).where(UserShard.email == form_data.username)
+    ).scalar()
+    user_db = db
+    if user_id is not None:
+        shard = shards.shard_for(user_id)
+        if not shards.is_primary(shard):
+            user_db = shards.sessions[shard]()
+    try:
+        return _login(user_db, user_id, form_data, response)
+    finally:
+        if user_db is not db:
+            user_db.close()
+
 
-    if not user or not verify_password(form_data.password, user.password):
-        logging.warning(
-            f"Failed authentication attempt for email: {form_data.username}"
+def _login(
+    db: Session,
+    user_id: UUID | None,
+    form_data: OAuth2PasswordRequestForm,
+    response: Response,
+) -> Tokens:
+    user = db.get(Users, user_id) if user_id is not None else None
+
+    verified, new_hash = (
+        verify_and_rehash(form_data.password, user.password) if user else (False, None)
+    )
+    if not verified:
+        logger.warning(
+            "Failed authentication attempt for email: %s", form_data.username
         )
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -197,6 +347,16 @@ def login(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate user."
         )
 
+    if new_hash:
+        try:
+            user.password = new_hash
+            db.commit()
+            mark_user_write(user.id)
+            logger.info("Rehashed password with current argon2 costs for %s", user.id)
+        except Exception as e:
+            db.rollback()
+            logger.warning("Failed to store rehashed password for %s: %s", user.id, e)
+
     try:
         access_token = create_access_token(user.email, user.id)
         refresh_token = create_refresh_token(user.email, user.id)
@@ -212,13 +372,14 @@ def login(
 
         return Tokens(access_token=access_token, token_type="bearer")
     except Exception as e:
-        logging.error(f"Failed during login token creation: {e}")
+        logger.error("Failed during login token creation: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Login failed due to server error",
         )
 
 
+@traced()
 def refresh_access_token(refresh_token: str) -> Tokens:
 
     if not refresh_token:
@@ -246,12 +407,12 @@ def refresh_access_token(refresh_token: str) -> Tokens:
         return Tokens(access_token=new_access_token, token_type="bearer")
 
     except PyJWTError as e:
-        logging.warning(f"Refresh token verification failed: {e}")
+        logger.warning("Refresh token verification failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
         )
     except Exception as e:
-        logging.error(f"Unexpected error during token refresh: {e}")
+        logger.error("Unexpected error during token refresh: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to refresh access token",
@@ -0,0 +1,194 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Hashable
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+QUERY_CACHE_REDIS_URL = os.getenv("QUERY_CACHE_REDIS_URL")
+QUERY_CACHE_TTL = int(os.getenv("QUERY_CACHE_TTL", "300"))
+# Per-process generations are only correct with a single worker: another
+# worker's write never bumps them. Off unless explicitly opted in.
+QUERY_CACHE_LOCAL = os.getenv("QUERY_CACHE_LOCAL", "false").lower() == "true"
+
+CacheKey = tuple[str, int, Hashable]
+
+
+class RedisBackend:
+    """Shared generation counters and bodies for multi-worker deployments."""
+
+    def __init__(self, url: str, namespace: str, ttl: int):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def _gen_key(self, user_id: str) -> str:
+        return f"{self.namespace}:gen:{user_id}"
+
+    def _body_key(self, key: CacheKey) -> str:
+        user_id, generation, params = key
+        return f"{self.namespace}:q:{user_id}:{generation}:{params!r}"
+
+    def generation(self, user_id: str) -> int:
+        return int(self.client.get(self._gen_key(user_id)) or 0)
+
+    def bump(self, user_id: str) -> int:
+        return int(self.client.incr(self._gen_key(user_id)))
+
+    def get(self, key: CacheKey) -> bytes | None:
+        return self.client.get(self._body_key(key))
+
+    def set(self, key: CacheKey, body: bytes) -> None:
+        self.client.set(self._body_key(key), body, ex=self.ttl)
+
+
+class QueryCache:
+    """Per-user cache of serialized query results.
+
+    Every key embeds the user's generation counter, so bumping it on a write
+    invalidates all of that user's entries in O(1); superseded entries are
+    never read again and simply age out of the LRU.
+
+    Generations are only shared between processes through the backend. A
+    disabled cache, or a backend that cannot be reached, yields a None key,
+    and lookups with it bypass the cache rather than trust a generation
+    another worker may have moved past.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        backend: RedisBackend | None = None,
+        enabled: bool = True,
+    ):
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self.enabled = enabled
+        self._generations: dict[str, int] = {}
+        self._entries: OrderedDict[CacheKey, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypassed = 0
+
+    def key(self, user_id, params: Hashable) -> CacheKey | None:
+        """Build the lookup key; take it before running the query it caches."""
+
+        if not self.enabled:
+            return None
+        user_id = str(user_id)
+        if self.backend is not None:
+            try:
+                return user_id, self.backend.generation(user_id), params
+            except Exception as e:
+                logger.warning("Query cache backend unavailable: %s", e)
+                return None
+        return user_id, self._generations.get(user_id, 0), params
+
+    def bump(self, user_id) -> None:
+        user_id = str(user_id)
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        if self.backend is not None:
+            try:
+                self.backend.bump(user_id)
+            except Exception as e:
+                logger.warning("Query cache backend unavailable: %s", e)
+
+    def get(self, key: CacheKey | None) -> bytes | None:
+        if key is None:
+            with self._lock:
+                self.bypassed += 1
+            return None
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return body
+
+        if self.backend is not None:
+            try:
+                body = self.backend.get(key)
+            except Exception as e:
+                logger.warning("Query cache backend unavailable: %s", e)
+            if body is not None:
+                self._store(key, body)
+                with self._lock:
+                    self.hits += 1
+                return body
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: CacheKey | None, body: bytes) -> None:
+        if key is None:
+            return
+        self._store(key, body)
+        if self.backend is not None:
+            try:
+                self.backend.set(key, body)
+            except Exception as e:
+                logger.warning("Query cache backend unavailable: %s", e)
+
+    def _store(self, key: CacheKey, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "bypassed": self.bypassed,
+                "shared_backend": self.backend is not None,
+            }
+
+
+def _build_backend() -> RedisBackend | None:
+    if not QUERY_CACHE_REDIS_URL:
+        return None
+    try:
+        return RedisBackend(QUERY_CACHE_REDIS_URL, "todos", QUERY_CACHE_TTL)
+    except ImportError as e:
+        raise RuntimeError(
+            "QUERY_CACHE_REDIS_URL is set but the redis package is not installed"
+        ) from e
+
+
+def _build_cache() -> QueryCache:
+    backend = _build_backend()
+    return QueryCache(
+        QUERY_CACHE_MAX_BYTES, backend, backend is not None or QUERY_CACHE_LOCAL
+    )
+
+
+todo_list_cache = _build_cache()
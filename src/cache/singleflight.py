@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import os
+from typing import Any, Callable, Hashable
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from starlette import status
+from starlette.concurrency import run_in_threadpool
+
+from src.database.dbcore import SessionLocal
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SINGLE_FLIGHT_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_TIMEOUT", "10"))
+
+
+class SingleFlight:
+    """Coalesce identical concurrent reads into one execution.
+
+    The first caller for a key starts the work in the threadpool with its own
+    session; callers arriving while it runs await the same task. Waiters are
+    shielded from each other, so a disconnecting client neither cancels the
+    shared call nor closes a session it is still using.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        timeout: float = SINGLE_FLIGHT_TIMEOUT,
+    ):
+        self.session_factory = session_factory
+        self.timeout = timeout
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def _run(
+        self,
+        fn: Callable[..., Any],
+        args: tuple,
+        session_factory: Callable[[], Session],
+    ) -> Any:
+        db = session_factory()
+        try:
+            return fn(db, *args)
+        finally:
+            db.close()
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Retrieved here so an abandoned call doesn't log "never retrieved".
+            logger.debug("Single-flight call %r failed: %s", key, task.exception())
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: float | None = None,
+        session_factory: Callable[[], Session] | None = None,
+    ) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                run_in_threadpool(
+                    self._run, fn, args, session_factory or self.session_factory
+                )
+            )
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(task), timeout if timeout is not None else self.timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Single-flight call timed out for key %r", key)
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="Request timed out",
+            )
+
+    def stats(self) -> dict:
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._calls),
+        }
+
+
+single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    return single_flight
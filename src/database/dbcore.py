@@ -5,10 +5,21 @@ from dotenv import load_dotenv
 
 load_dotenv()
 DATABASE_URL = os.getenv("POSTGRES_URL")
-
-engine = create_engine(DATABASE_URL, echo=True, future=True)
-
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() == "true"
+SQL_COMPILED_CACHE_SIZE = int(os.getenv("SQL_COMPILED_CACHE_SIZE", "500"))
+
+engine = create_engine(
+    DATABASE_URL,
+    echo=SQL_ECHO,
+    future=True,
+    query_cache_size=SQL_COMPILED_CACHE_SIZE,
+)
+
+# Sessions are request-scoped, so nothing is stale after commit; keeping the
+# loaded state avoids a refresh SELECT per object touched after db.commit().
+SessionLocal = sessionmaker(
+    bind=engine, autocommit=False, autoflush=False, expire_on_commit=False
+)
 
 Base = declarative_base()
 
@@ -21,7 +32,7 @@ def get_db():
         db.close()
 
 
-from src.entities import users, todos
+from src.entities import users, todos, outbox, idempotency, shards
 
 # import contextlib
 # from typing import Any, AsyncIterator
@@ -0,0 +1,212 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable
+
+from dotenv import load_dotenv
+from sqlalchemy import Engine, create_engine, event, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.database.dbcore import SQL_COMPILED_CACHE_SIZE, SQL_ECHO, engine
+from src.database.sharding import shards
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REPLICA_URLS = [
+    url.strip()
+    for url in os.getenv("POSTGRES_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+READ_YOUR_WRITES_WINDOW = float(os.getenv("READ_YOUR_WRITES_WINDOW", "5"))
+
+
+class ReplicaPool:
+    """Round-robin over healthy replicas.
+
+    A replica that raises a connection error is taken out of rotation and
+    probed again with SELECT 1 once REPLICA_RETRY_SECONDS have passed.
+    """
+
+    def __init__(self, engines: list[Engine], retry_seconds: float):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._down_until: dict[Engine, float] = {}
+        self._counter = itertools.count()
+        for replica in engines:
+            event.listen(replica, "handle_error", self._on_error)
+
+    def _on_error(self, context) -> None:
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(context.engine)
+
+    def mark_down(self, replica: Engine) -> None:
+        if replica not in self._down_until:
+            logger.warning("Replica %r marked unhealthy", replica.url)
+        self._down_until[replica] = time.monotonic() + self.retry_seconds
+
+    def _is_healthy(self, replica: Engine) -> bool:
+        down_until = self._down_until.get(replica)
+        if down_until is None:
+            return True
+        if time.monotonic() < down_until:
+            return False
+        try:
+            with replica.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception as e:
+            logger.warning("Replica %r still unhealthy: %s", replica.url, e)
+            self._down_until[replica] = time.monotonic() + self.retry_seconds
+            return False
+        self._down_until.pop(replica, None)
+        logger.info("Replica %r back in rotation", replica.url)
+        return True
+
+    def choose(self) -> Engine | None:
+        for _ in range(len(self.engines)):
+            replica = self.engines[next(self._counter) % len(self.engines)]
+            if self._is_healthy(replica):
+                return replica
+        return None
+
+
+class RecentWrites:
+    """Remembers which users wrote recently so their reads stay on the primary.
+
+    Only sees writes made by this process; writes made through other workers
+    reach it as the read-your-writes cookie (see RequestWrites).
+    """
+
+    def __init__(self, window: float):
+        self.window = window
+        self._last_write: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, user_id) -> None:
+        # Wall-clock time, comparable with the stamps other workers put in
+        # the read-your-writes cookie.
+        now = time.time()
+        with self._lock:
+            self._last_write[str(user_id)] = now
+            if len(self._last_write) > 10_000:
+                cutoff = now - self.window
+                self._last_write = {
+                    k: v for k, v in self._last_write.items() if v > cutoff
+                }
+
+    def last_write(self, user_id) -> float | None:
+        return self._last_write.get(str(user_id))
+
+
+class RequestWrites:
+    """Read-your-writes state of one request, kept in request_writes_var.
+
+    `last_write` starts as the stamp of the client's rw cookie and moves
+    forward when the request itself writes; `wrote` tells the middleware to
+    send the cookie back.
+    """
+
+    __slots__ = ("last_write", "wrote")
+
+    def __init__(self, last_write: float | None = None):
+        self.last_write = last_write
+        self.wrote = False
+
+
+request_writes_var: ContextVar[RequestWrites | None] = ContextVar(
+    "request_writes", default=None
+)
+
+
+replicas = ReplicaPool(
+    [
+        create_engine(
+            url,
+            echo=SQL_ECHO,
+            future=True,
+            pool_pre_ping=True,
+            query_cache_size=SQL_COMPILED_CACHE_SIZE,
+        )
+        for url in REPLICA_URLS
+    ],
+    REPLICA_RETRY_SECONDS,
+)
+recent_writes = RecentWrites(READ_YOUR_WRITES_WINDOW)
+
+
+class RoutingSession(Session):
+    """Session that sends read-only work to a replica and everything else to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.info.get("read_only") and not self._flushing:
+            replica = replicas.choose()
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+RoutingSessionLocal = sessionmaker(
+    bind=engine,
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+def mark_user_write(user_id) -> None:
+    recent_writes.mark(user_id)
+    writes = request_writes_var.get()
+    if writes is not None:
+        writes.last_write = time.time()
+        writes.wrote = True
+
+
+def last_write_at(user_id) -> float | None:
+    """Latest write of the user known here: by this process or the client's cookie."""
+
+    stamps = [recent_writes.last_write(user_id)]
+    writes = request_writes_var.get()
+    if writes is not None:
+        stamps.append(writes.last_write)
+    return max((stamp for stamp in stamps if stamp is not None), default=None)
+
+
+def read_key(kind: str, user_id, *parts) -> tuple:
+    """Single-flight key for one of a user's reads.
+
+    Carries the user's last write stamp, so a read issued after a write
+    never joins a call that may have read the rows before it.
+    """
+
+    return (kind, user_id, last_write_at(user_id), *parts)
+
+
+def is_sticky(user_id) -> bool:
+    last_write = last_write_at(user_id)
+    return last_write is not None and time.time() - last_write < READ_YOUR_WRITES_WINDOW
+
+
+def read_session_for(user_id) -> Callable[[], Session]:
+    """Session factory for a user's reads, honouring read-your-writes stickiness.
+
+    Replicas belong to the primary; users on other shards read from their shard.
+    Stickiness is decided when the factory is built, in the request's context.
+    """
+
+    sticky = is_sticky(user_id)
+
+    def factory() -> Session:
+        if shards.sharded:
+            shard = shards.shard_for(user_id)
+            if not shards.is_primary(shard):
+                return shards.sessions[shard]()
+        read_only = bool(replicas.engines) and not sticky
+        return RoutingSessionLocal(info={"read_only": read_only})
+
+    return factory
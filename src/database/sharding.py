@@ -0,0 +1,193 @@
+import bisect
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from sqlalchemy import Engine, create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from starlette import status
+
+from src.database.dbcore import (
+    DATABASE_URL,
+    SQL_COMPILED_CACHE_SIZE,
+    SQL_ECHO,
+    SessionLocal,
+    engine,
+)
+from src.entities.shards import UserShard
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# The database behind dbcore.engine; it also holds the user_shards directory.
+PRIMARY_SHARD = "primary"
+
+
+def _parse_shard_urls(spec: str) -> dict[str, str]:
+    urls = {}
+    for entry in spec.split(","):
+        name, _, url = entry.strip().partition("=")
+        if name and url:
+            urls[name.strip()] = url.strip()
+    return urls
+
+
+# "name=url,name=url"; empty keeps every user on the primary database.
+SHARD_URLS = _parse_shard_urls(os.getenv("SHARD_URLS", ""))
+SHARD_VNODES = int(os.getenv("SHARD_VNODES", "256"))
+SHARD_POOL_SIZE = int(os.getenv("SHARD_POOL_SIZE", "5"))
+SHARD_MAX_OVERFLOW = int(os.getenv("SHARD_MAX_OVERFLOW", "10"))
+SHARD_DIRECTORY_TTL = float(os.getenv("SHARD_DIRECTORY_TTL", "30"))
+SHARD_DIRECTORY_CACHE_SIZE = int(os.getenv("SHARD_DIRECTORY_CACHE_SIZE", "100000"))
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash ring over shard names.
+
+    Each shard owns `vnodes` points on a 64-bit ring and a key belongs to
+    the first point at or after its hash. Adding a shard to N moves about
+    1/(N+1) of the keys, all of them to the new shard.
+    """
+
+    def __init__(self, shards: list[str], vnodes: int = SHARD_VNODES):
+        points = sorted(
+            (_hash(f"{shard}#{i}"), shard) for shard in shards for i in range(vnodes)
+        )
+        self.shards = sorted(set(shards))
+        self._keys = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def shard_for(self, key) -> str:
+        index = bisect.bisect_left(self._keys, _hash(str(key)))
+        return self._owners[index % len(self._keys)]
+
+
+class ShardMap:
+    """Per-shard engines and sessions, and where each user's data lives.
+
+    New users are placed by the hash ring. Afterwards the user_shards
+    directory on the primary is authoritative, so the ring can change and
+    users move (src/scripts/rebalance_shards.py) without losing track of
+    anyone. Directory lookups are cached per worker for SHARD_DIRECTORY_TTL
+    seconds. With a single shard, nothing is looked up.
+    """
+
+    def __init__(
+        self,
+        urls: dict[str, str],
+        vnodes: int = SHARD_VNODES,
+        directory_ttl: float = SHARD_DIRECTORY_TTL,
+        cache_size: int = SHARD_DIRECTORY_CACHE_SIZE,
+    ):
+        self.engines: dict[str, Engine] = {}
+        self.sessions: dict[str, sessionmaker] = {}
+        for name, url in (urls or {PRIMARY_SHARD: DATABASE_URL}).items():
+            if url == DATABASE_URL:
+                self.engines[name] = engine
+                self.sessions[name] = SessionLocal
+                continue
+            self.engines[name] = create_engine(
+                url,
+                echo=SQL_ECHO,
+                future=True,
+                pool_pre_ping=True,
+                pool_size=SHARD_POOL_SIZE,
+                max_overflow=SHARD_MAX_OVERFLOW,
+                query_cache_size=SQL_COMPILED_CACHE_SIZE,
+            )
+            self.sessions[name] = sessionmaker(
+                bind=self.engines[name],
+                autocommit=False,
+                autoflush=False,
+                expire_on_commit=False,
+            )
+        self.ring = HashRing(list(self.engines), vnodes)
+        self.directory_ttl = directory_ttl
+        self.cache_size = cache_size
+        self._placements: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def sharded(self) -> bool:
+        return len(self.engines) > 1
+
+    def is_primary(self, shard: str) -> bool:
+        """Whether `shard` is the directory's own database.
+
+        A new user on it is written with its directory row in one transaction.
+        """
+
+        return self.engines[shard] is engine
+
+    def placement(self, user_id) -> tuple[str, bool]:
+        """(shard, moving) for a user, from the cached directory."""
+
+        if not self.sharded:
+            return next(iter(self.engines)), False
+
+        now = time.monotonic()
+        with self._lock:
+            cached = self._placements.get(user_id)
+            if cached is not None and cached[2] > now:
+                self._placements.move_to_end(user_id)
+                return cached[0], cached[1]
+
+        db = SessionLocal()
+        try:
+            row = db.execute(
+                select(UserShard.shard, UserShard.moving).where(
+                    UserShard.user_id == user_id
+                )
+            ).first()
+        finally:
+            db.close()
+        # The migration and create_user give every user a row; the ring is
+        # only a fallback for one that somehow has none.
+        if row is None:
+            shard, moving = self.ring.shard_for(user_id), False
+        else:
+            shard, moving = row.shard, row.moving
+
+        with self._lock:
+            self._placements[user_id] = (shard, moving, now + self.directory_ttl)
+            self._placements.move_to_end(user_id)
+            while len(self._placements) > self.cache_size:
+                self._placements.popitem(last=False)
+        return shard, moving
+
+    def forget(self, user_id) -> None:
+        with self._lock:
+            self._placements.pop(user_id, None)
+
+    def shard_for(self, user_id) -> str:
+        shard, moving = self.placement(user_id)
+        if moving:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Account is being migrated, retry shortly",
+                headers={"Retry-After": str(math.ceil(self.directory_ttl))},
+            )
+        if shard not in self.sessions:
+            logger.error("User %s is on unknown shard %s", user_id, shard)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Account storage unavailable",
+            )
+        return shard
+
+    def session_for(self, user_id) -> Session:
+        return self.sessions[self.shard_for(user_id)]()
+
+
+shards = ShardMap(SHARD_URLS)
@@ -2,6 +2,22 @@ from typing import Annotated
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
+from src.auth.service import CurrentUser
+from src.cache.singleflight import SingleFlight, get_single_flight
 from src.database.dbcore import get_db
+from src.database.sharding import shards
+
+
+def get_shard_db(current_user: CurrentUser):
+    """Session on the shard holding the current user's data."""
+
+    db = shards.session_for(current_user.user_id)
+    try:
+        yield db
+    finally:
+        db.close()
+
 
 DbSession = Annotated[Session, Depends(get_db)]
+ShardDbSession = Annotated[Session, Depends(get_shard_db)]
+Coalescer = Annotated[SingleFlight, Depends(get_single_flight)]
@@ -0,0 +1,19 @@
+from src.database.dbcore import Base
+from sqlalchemy import Column, String, SmallInteger, LargeBinary, DateTime, func, Index
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    scope = Column(String(64), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    # Both stay NULL while the first request is still running.
+    status_code = Column(SmallInteger, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    __table_args__ = (Index("ix_idempotency_keys_created_at", "created_at"),)
@@ -0,0 +1,32 @@
+from src.database.dbcore import Base
+from sqlalchemy import BigInteger, Column, String, DateTime, Identity, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    event_type = Column(String(50), nullable=False)
+    aggregate_type = Column(String(30), nullable=False)
+    aggregate_id = Column(UUID(as_uuid=True), nullable=False)
+    payload = Column(JSONB, nullable=False)
+
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class OutboxArchive(Base):
+    __tablename__ = "outbox_archive"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=False)
+    event_type = Column(String(50), nullable=False)
+    aggregate_type = Column(String(30), nullable=False)
+    aggregate_id = Column(UUID(as_uuid=True), nullable=False)
+    payload = Column(JSONB, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    delivered_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
@@ -0,0 +1,27 @@
+from src.database.dbcore import Base
+from sqlalchemy import Boolean, Column, String, DateTime, false, func
+from sqlalchemy.dialects.postgresql import UUID
+
+
+class UserShard(Base):
+    """Global directory row: which shard holds a user's data.
+
+    Lives on the primary database only. Email and username are copied here
+    so login and registration can find and reserve them across shards.
+    """
+
+    __tablename__ = "user_shards"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    email = Column(String(255), unique=True, nullable=False)
+    username = Column(String(30), unique=True, nullable=False)
+    shard = Column(String(30), nullable=False)
+    # Set by the rebalance script while the user's rows are being copied.
+    moving = Column(Boolean, server_default=false(), nullable=False)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
@@ -1,5 +1,6 @@
 from src.database.dbcore import Base
 from sqlalchemy import (
+    DDL,
     Column,
     String,
     Boolean,
@@ -9,12 +10,24 @@ from sqlalchemy import (
     ForeignKey,
     Enum,
     Index,
+    and_,
+    event,
+    false,
+    literal_column,
+    text,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import ARRAY, ENUM, UUID
 from sqlalchemy.orm import relationship
+import os
 import uuid
+from dotenv import load_dotenv
 from src.enums.todos import TodoCategory
 
+load_dotenv()
+
+# Hash partitions of the todos table by user_id; 0 keeps a plain table.
+TODOS_PARTITION_COUNT = int(os.getenv("TODOS_PARTITION_COUNT", "16"))
+
 
 class Todos(Base):
     __tablename__ = "todos"
@@ -23,11 +36,15 @@ class Todos(Base):
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        unique=True,
         nullable=False,
     )
+    # Part of the primary key because a partitioned table's unique
+    # constraints must include the partition key.
     user_id = Column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+        nullable=False,
     )
     title = Column(String(100), nullable=False)
     description = Column(String(200), nullable=False)
@@ -36,9 +53,22 @@ class Todos(Base):
         default=TodoCategory.OTHER,
         nullable=False,
     )
+    # Every tag of the todo, the primary category included; filtered with
+    # && / @> through the ix_todos_tags GIN index.
+    tags = Column(
+        ARRAY(ENUM(TodoCategory, name="todo_category", create_type=False)),
+        server_default=text("'{}'"),
+        nullable=False,
+    )
     priority = Column(Integer, nullable=False)
     complete = Column(Boolean, default=False, nullable=False)
     deadline = Column(DateTime(timezone=True), nullable=True)
+    # Deadline each reminder was last sent for (src/reminders/scheduler.py).
+    # Moving the deadline breaks the match, so the reminder goes out again.
+    due_soon_sent_for = Column(DateTime(timezone=True), nullable=True)
+    overdue_sent_for = Column(DateTime(timezone=True), nullable=True)
+    # Set by soft delete; rows are hard-deleted later by src/todos/purger.py.
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
 
     created_at = Column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -50,6 +80,128 @@ class Todos(Base):
         nullable=False,
     )
 
+    # Server defaults (created_at, updated_at) come back in the INSERT's or
+    # UPDATE's RETURNING clause instead of a later SELECT.
+    __mapper_args__ = {"eager_defaults": True}
+
     user = relationship("Users", back_populates="todos")
 
-    __table_args__ = (Index("ix_todos_user_id", "user_id"),)
+    # Lookups by todo id (get, update, delete, restore) use the (id, user_id)
+    # primary key; the list statements use the ix_todos_sort_* indexes below.
+    # A bare user_id index would serve neither.
+    __table_args__ = (
+        # The reminder sweep (DeadlineReminderScheduler._fetch_batch): open todos
+        # with a deadline in a window whose reminder is still owed, in deadline
+        # order. Rows leave the index once the reminder is sent.
+        Index(
+            "ix_todos_due_soon_pending",
+            "deadline",
+            "id",
+            postgresql_where=and_(
+                complete == false(),
+                deleted_at.is_(None),
+                due_soon_sent_for.is_distinct_from(deadline),
+            ),
+        ),
+        # The same sweep for todo.overdue.
+        Index(
+            "ix_todos_overdue_pending",
+            "deadline",
+            "id",
+            postgresql_where=and_(
+                complete == false(),
+                deleted_at.is_(None),
+                overdue_sent_for.is_distinct_from(deadline),
+            ),
+        ),
+        # The calendar statements (todos/calendar.py): a deadline range within
+        # one user's todos.
+        Index(
+            "ix_todos_user_deadline",
+            "user_id",
+            "deadline",
+            "id",
+            postgresql_where=and_(deadline.is_not(None), deleted_at.is_(None)),
+        ),
+        # Tag filters on the list statement (tags_any / tags_all overlap and
+        # contain); btree_gin lets user_id share the GIN index with the array.
+        Index(
+            "ix_todos_tags",
+            "user_id",
+            "tags",
+            postgresql_using="gin",
+            postgresql_where=deleted_at.is_(None),
+        ),
+        # The soft-delete purger: deleted rows older than the retention cutoff.
+        Index(
+            "ix_todos_deleted_at",
+            "deleted_at",
+            postgresql_where=deleted_at.is_not(None),
+        ),
+        (
+            {"postgresql_partition_by": "HASH (user_id)"}
+            if TODOS_PARTITION_COUNT
+            else {}
+        ),
+    )
+
+
+# Sortable list fields and the expression each one orders by. Nulls in
+# deadline sort as 'infinity' so keyset comparisons stay total.
+TODO_SORT_EXPRESSIONS = {
+    "priority": Todos.priority,
+    "deadline": func.coalesce(
+        Todos.deadline, literal_column("'infinity'::timestamptz")
+    ),
+    "created_at": Todos.created_at,
+    "title": Todos.title,
+}
+
+# Columns a todo list response needs.
+TODO_LIST_COLUMNS = (
+    Todos.id,
+    Todos.title,
+    Todos.description,
+    Todos.categories,
+    Todos.tags,
+    Todos.priority,
+    Todos.complete,
+    Todos.deadline,
+    Todos.created_at,
+)
+
+# The list statement (todo_list_statement) for each sort: one user's
+# undeleted todos in key order, read straight off the index, with the keyset
+# predicate seeking to the page. A page fetches at most `limit` + 1 heap rows,
+# so nothing is INCLUDEd: description alone would double every entry, and
+# without it no list page is index-only, so the other columns would be dead
+# weight too.
+for _field, _expression in TODO_SORT_EXPRESSIONS.items():
+    Index(
+        f"ix_todos_sort_{_field}",
+        Todos.user_id,
+        _expression,
+        Todos.id,
+        postgresql_where=Todos.deleted_at.is_(None),
+    )
+
+
+def todo_partition_names() -> list[str]:
+    return [f"todos_p{i}" for i in range(TODOS_PARTITION_COUNT)]
+
+
+event.listen(
+    Todos.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gin"),
+)
+
+for _remainder, _name in enumerate(todo_partition_names()):
+    event.listen(
+        Todos.__table__,
+        "after_create",
+        DDL(
+            f"CREATE TABLE IF NOT EXISTS {_name} PARTITION OF todos "
+            f"FOR VALUES WITH (MODULUS {TODOS_PARTITION_COUNT}, REMAINDER {_remainder})"
+        ),
+    )
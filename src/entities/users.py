@@ -29,6 +29,8 @@ class Users(Base):
         nullable=False,
     )
 
+    __mapper_args__ = {"eager_defaults": True}
+
     todos = relationship(
         "Todos",
         back_populates="user",
@@ -0,0 +1,25 @@
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+
+from src.entities.outbox import OutboxEvent
+
+
+def record_event(
+    db: Session,
+    event_type: str,
+    aggregate_type: str,
+    aggregate_id: UUID | str,
+    payload: dict,
+) -> None:
+    """Stage an outbox row in the caller's transaction; it commits with the change."""
+
+    db.add(
+        OutboxEvent(
+            event_type=event_type,
+            aggregate_type=aggregate_type,
+            aggregate_id=aggregate_id,
+            payload=jsonable_encoder(payload),
+        )
+    )
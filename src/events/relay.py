@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.database.dbcore import SessionLocal
+from src.entities.outbox import OutboxEvent
+from src.events.sinks import build_sink
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# On by default: every mutation stages an outbox row and only the relay
+# removes them. Claims use SKIP LOCKED, so each worker can run one.
+OUTBOX_RELAY_ENABLED = os.getenv("OUTBOX_RELAY_ENABLED", "true").lower() == "true"
+OUTBOX_SINKS = os.getenv("OUTBOX_SINKS", "log")
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "1"))
+OUTBOX_ARCHIVE = os.getenv("OUTBOX_ARCHIVE", "false").lower() == "true"
+OUTBOX_BACKLOG_COUNT_LIMIT = int(os.getenv("OUTBOX_BACKLOG_COUNT_LIMIT", "10000"))
+
+
+async def _session_call(fn, *args):
+    """Run a session call in a thread; if cancelled, wait for it to return first.
+
+    A cancelled asyncio.to_thread leaves its thread running, and the cleanup
+    that follows would then use the session concurrently and fail with an
+    error that hides the cancellation from the relay loop.
+    """
+
+    call = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+    try:
+        return await asyncio.shield(call)
+    except asyncio.CancelledError:
+        await asyncio.wait([call])
+        raise
+
+
+class OutboxRelay:
+    """Delivers outbox rows to sinks in batches.
+
+    A batch is claimed with FOR UPDATE SKIP LOCKED, so several workers can
+    relay concurrently without handing out the same row twice. Rows are
+    deleted (or moved to outbox_archive) in the claiming transaction only
+    after every sink accepted the batch; a failed delivery rolls back and the
+    rows are retried on the next poll.
+    """
+
+    def __init__(
+        self,
+        sinks: list,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        poll_interval: float = OUTBOX_POLL_INTERVAL,
+        archive: bool = OUTBOX_ARCHIVE,
+        session_factory: sessionmaker = SessionLocal,
+    ):
+        self.sinks = sinks
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.archive = archive
+        self._task: asyncio.Task | None = None
+        self._started_at = time.monotonic()
+        self.delivered = 0
+        self.batches = 0
+        self.failures = 0
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._started_at = time.monotonic()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                delivered = await self.relay_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                logger.error("Outbox relay batch failed: %s", e)
+                delivered = 0
+            # Drain a backlog without sleeping; poll only once caught up.
+            if delivered < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def _claim(self, db: Session) -> list[OutboxEvent]:
+        return list(
+            db.scalars(
+                select(OutboxEvent)
+                .order_by(OutboxEvent.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+        )
+
+    def _finish(self, db: Session, ids: list[int]) -> None:
+        if self.archive:
+            db.execute(
+                text(
+                    "WITH moved AS ("
+                    "  DELETE FROM outbox_events WHERE id = ANY(:ids) RETURNING *"
+                    ") INSERT INTO outbox_archive "
+                    "(id, event_type, aggregate_type, aggregate_id, payload, created_at) "
+                    "SELECT id, event_type, aggregate_type, aggregate_id, payload, "
+                    "created_at FROM moved"
+                ),
+                {"ids": ids},
+            )
+        else:
+            db.execute(
+                text("DELETE FROM outbox_events WHERE id = ANY(:ids)"), {"ids": ids}
+            )
+        db.commit()
+
+    async def relay_batch(self) -> int:
+        db = self.session_factory()
+        try:
+            rows = await _session_call(self._claim, db)
+            if not rows:
+                return 0
+
+            events = [
+                {
+                    "id": row.id,
+                    "type": row.event_type,
+                    "aggregate_type": row.aggregate_type,
+                    "aggregate_id": str(row.aggregate_id),
+                    "payload": row.payload,
+                    "created_at": row.created_at.isoformat(),
+                }
+                for row in rows
+            ]
+            oldest_created_at = rows[0].created_at
+            ids = [row.id for row in rows]
+            for sink in self.sinks:
+                await sink.emit(events)
+
+            await _session_call(self._finish, db, ids)
+        finally:
+            # Rolls back a claim that was not finished, releasing its rows.
+            await _session_call(db.close)
+
+        now = datetime.now(timezone.utc)
+        self.last_lag_seconds = (now - oldest_created_at).total_seconds()
+        self.max_lag_seconds = max(self.max_lag_seconds, self.last_lag_seconds)
+        self.delivered += len(ids)
+        self.batches += 1
+        return len(ids)
+
+    def stats(self) -> dict:
+        elapsed = time.monotonic() - self._started_at
+        return {
+            "delivered": self.delivered,
+            "batches": self.batches,
+            "failures": self.failures,
+            "events_per_second": round(self.delivered / elapsed, 2) if elapsed else 0.0,
+            "last_lag_seconds": round(self.last_lag_seconds, 3),
+            "max_lag_seconds": round(self.max_lag_seconds, 3),
+        }
+
+
+def outbox_backlog(session_factory: sessionmaker = SessionLocal) -> dict:
+    """Undelivered outbox rows and the age of the oldest one.
+
+    Counting stops at OUTBOX_BACKLOG_COUNT_LIMIT. The age is the current lag
+    even while no relay is delivering.
+    """
+
+    pending = (
+        select(func.count())
+        .select_from(
+            select(OutboxEvent.id).limit(OUTBOX_BACKLOG_COUNT_LIMIT).subquery()
+        )
+        .scalar_subquery()
+    )
+    oldest = (
+        select(OutboxEvent.created_at)
+        .order_by(OutboxEvent.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    db = session_factory()
+    try:
+        row = db.execute(select(pending.label("pending"), oldest.label("oldest"))).one()
+    finally:
+        db.close()
+
+    age = None
+    if row.oldest is not None:
+        age = (datetime.now(timezone.utc) - row.oldest).total_seconds()
+    return {
+        "pending": row.pending,
+        "pending_capped": row.pending >= OUTBOX_BACKLOG_COUNT_LIMIT,
+        "oldest_age_seconds": round(age, 3) if age is not None else None,
+    }
+
+
+def build_relay(session_factory: sessionmaker = SessionLocal) -> OutboxRelay:
+    return OutboxRelay(
+        [build_sink(spec.strip()) for spec in OUTBOX_SINKS.split(",")],
+        session_factory=session_factory,
+    )
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Request
+from fastapi.concurrency import run_in_threadpool
+
+from src.auth.service import AdminUser
+from src.database.sharding import shards
+from src.events.relay import outbox_backlog
+from src.observability.tracing import TracedRoute
+
+router = APIRouter(prefix="/events", tags=["events"], route_class=TracedRoute)
+
+
+@router.get("/stats")
+async def get_event_stats(request: Request, admin: AdminUser):
+    """Per shard: this worker's relay throughput and lag, and the outbox backlog.
+
+    `relay` is null when OUTBOX_RELAY_ENABLED is off on this worker.
+    """
+
+    relays = getattr(request.app.state, "outbox_relays", {})
+    stats = {}
+    for name, session_factory in shards.sessions.items():
+        relay = relays.get(name)
+        stats[name] = {
+            "relay": relay.stats() if relay is not None else None,
+            "backlog": await run_in_threadpool(outbox_backlog, session_factory),
+        }
+    return stats
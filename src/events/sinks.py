@@ -0,0 +1,66 @@
+import asyncio
+import json
+import logging
+import urllib.request
+
+logger = logging.getLogger(__name__)
+
+
+class LogSink:
+    """Writes every event to the application log."""
+
+    async def emit(self, events: list[dict]) -> None:
+        # Serializing every event is the expensive part; skip it when INFO is off.
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        for event in events:
+            logger.info(
+                "Event %s: %s", event.get("type"), json.dumps(event, default=str)
+            )
+
+
+class WebhookSink:
+    """POSTs each batch as a JSON array to a URL."""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+
+    def _post(self, body: bytes) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=body,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if response.status >= 300:
+                raise RuntimeError(f"Webhook returned {response.status}")
+
+    async def emit(self, events: list[dict]) -> None:
+        await asyncio.to_thread(
+            self._post, json.dumps(events, default=str).encode("utf-8")
+        )
+
+
+class MemorySink:
+    """Keeps events in memory; meant for tests and local runs."""
+
+    def __init__(self):
+        self.events: list[dict] = []
+
+    async def emit(self, events: list[dict]) -> None:
+        self.events.extend(events)
+
+
+def build_sink(spec: str):
+    """Create a sink from a spec string: 'log', 'memory' or 'webhook:<url>'."""
+
+    kind, _, target = spec.partition(":")
+    if kind == "log":
+        return LogSink()
+    if kind == "memory":
+        return MemorySink()
+    if kind == "webhook" and target:
+        return WebhookSink(target)
+    raise ValueError(f"Unknown event sink: {spec}")
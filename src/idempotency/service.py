@@ -0,0 +1,272 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, Any, Callable
+
+from dotenv import load_dotenv
+from fastapi import Header, HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from starlette import status
+from starlette.concurrency import run_in_threadpool
+
+from src.database.dbcore import SessionLocal, engine
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "10"))
+IDEMPOTENCY_STALE_SECONDS = int(os.getenv("IDEMPOTENCY_STALE_SECONDS", "60"))
+IDEMPOTENCY_PURGE_BATCH_SIZE = int(os.getenv("IDEMPOTENCY_PURGE_BATCH_SIZE", "5000"))
+IDEMPOTENCY_PURGE_INTERVAL = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL", "600"))
+
+_FINGERPRINT_KEY = os.getenv("JWT_SECRET", "").encode("utf-8")
+
+IdempotencyKeyHeader = Annotated[
+    str | None, Header(alias="Idempotency-Key", max_length=255)
+]
+
+# Owners in this process signal completion here so local duplicates don't poll.
+_local_inflight: dict[tuple[str, str], asyncio.Event] = {}
+
+
+def request_fingerprint(payload: Any, exclude: set[str] | None = None) -> str:
+    """HMAC of the request body, keyed with the server secret.
+
+    Stored next to the key for IDEMPOTENCY_TTL_HOURS, so secrets in the body
+    should be passed in `exclude`; the key keeps the rest from being
+    brute-forced by someone who can read the table.
+    """
+
+    body = json.dumps(
+        jsonable_encoder(payload, exclude=exclude), sort_keys=True
+    ).encode("utf-8")
+    return hmac.new(_FINGERPRINT_KEY, body, hashlib.sha256).hexdigest()
+
+
+def _claim(scope: str, key: str, request_hash: str) -> bool:
+    """Insert the in-flight marker; a stale marker left by a crashed worker is taken over."""
+
+    db = SessionLocal()
+    try:
+        claimed = db.execute(
+            text(
+                "INSERT INTO idempotency_keys (scope, key, request_hash) "
+                "VALUES (:scope, :key, :request_hash) "
+                "ON CONFLICT (scope, key) DO UPDATE SET created_at = now() "
+                "WHERE idempotency_keys.status_code IS NULL "
+                "AND idempotency_keys.request_hash = EXCLUDED.request_hash "
+                "AND idempotency_keys.created_at < now() - make_interval(secs => :stale) "
+                "RETURNING scope"
+            ),
+            {
+                "scope": scope,
+                "key": key,
+                "request_hash": request_hash,
+                "stale": IDEMPOTENCY_STALE_SECONDS,
+            },
+        ).first()
+        db.commit()
+        return claimed is not None
+    finally:
+        db.close()
+
+
+def _load(scope: str, key: str):
+    db = SessionLocal()
+    try:
+        return db.execute(
+            text(
+                "SELECT request_hash, status_code, response_body "
+                "FROM idempotency_keys WHERE scope = :scope AND key = :key"
+            ),
+            {"scope": scope, "key": key},
+        ).first()
+    finally:
+        db.close()
+
+
+def _complete(scope: str, key: str, status_code: int, body: bytes) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            text(
+                "UPDATE idempotency_keys SET status_code = :status_code, "
+                "response_body = :body WHERE scope = :scope AND key = :key"
+            ),
+            {"scope": scope, "key": key, "status_code": status_code, "body": body},
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _mark_applied(scope: str, key: str, status_code: int):
+    """before_commit hook recording, in the mutation's own transaction, that it ran."""
+
+    def mark(session: Session) -> None:
+        session.execute(
+            text(
+                "UPDATE idempotency_keys SET status_code = :status_code "
+                "WHERE scope = :scope AND key = :key"
+            ),
+            {"scope": scope, "key": key, "status_code": status_code},
+        )
+
+    return mark
+
+
+def _release(scope: str, key: str) -> None:
+    """Drop an in-flight marker; one whose mutation committed is kept."""
+
+    db = SessionLocal()
+    try:
+        db.execute(
+            text(
+                "DELETE FROM idempotency_keys "
+                "WHERE scope = :scope AND key = :key AND status_code IS NULL"
+            ),
+            {"scope": scope, "key": key},
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _replay(status_code: int, body: bytes) -> Response:
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+async def run_idempotent(
+    scope: str,
+    key: str,
+    request_hash: str,
+    call: Callable[[], Any],
+    status_code: int = status.HTTP_200_OK,
+    db: Session | None = None,
+) -> Response:
+    """Run `call` once per (scope, key) and replay its stored response on retries.
+
+    `call` runs in the threadpool. A duplicate arriving while the first
+    request is still running waits for it to finish. If the first request
+    fails, its key is released so the client can retry.
+
+    When `db`, the session `call` commits its mutation with, is on the
+    database holding idempotency_keys, the key is marked applied in that
+    same commit: a crash before the response is stored then answers retries
+    with 409 instead of running the mutation twice. Otherwise the two commits
+    are separate and a crash between them makes the request at-least-once.
+    """
+
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT_TIMEOUT
+    delay = 0.02
+    while True:
+        if await asyncio.to_thread(_claim, scope, key, request_hash):
+            break
+
+        row = await asyncio.to_thread(_load, scope, key)
+        if row is None:
+            continue
+        if row.request_hash != request_hash:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used for a different request",
+            )
+        if row.status_code is not None:
+            if row.response_body is None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key was already applied",
+                )
+            return _replay(row.status_code, row.response_body)
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress",
+            )
+        inflight = _local_inflight.get((scope, key))
+        if inflight is not None:
+            try:
+                await asyncio.wait_for(inflight.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+        else:
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.5)
+
+    done = _local_inflight.setdefault((scope, key), asyncio.Event())
+    mark = None
+    if db is not None and db.get_bind() is engine:
+        mark = _mark_applied(scope, key, status_code)
+        event.listen(db, "before_commit", mark)
+    try:
+        result = await run_in_threadpool(call)
+        body = json.dumps(jsonable_encoder(result)).encode("utf-8")
+        await asyncio.to_thread(_complete, scope, key, status_code, body)
+        return Response(
+            content=body, status_code=status_code, media_type="application/json"
+        )
+    except BaseException:
+        await asyncio.to_thread(_release, scope, key)
+        raise
+    finally:
+        if mark is not None:
+            event.remove(db, "before_commit", mark)
+        _local_inflight.pop((scope, key), None)
+        done.set()
+
+
+def purge_expired_keys(
+    ttl: timedelta = timedelta(hours=IDEMPOTENCY_TTL_HOURS),
+    batch_size: int = IDEMPOTENCY_PURGE_BATCH_SIZE,
+) -> int:
+    """Delete expired keys in short batches so no single statement holds long locks."""
+
+    cutoff = datetime.now(timezone.utc) - ttl
+    purged = 0
+    db = SessionLocal()
+    try:
+        while True:
+            deleted = db.execute(
+                text(
+                    "DELETE FROM idempotency_keys WHERE ctid IN ("
+                    "  SELECT ctid FROM idempotency_keys"
+                    "  WHERE created_at < :cutoff LIMIT :batch_size"
+                    ")"
+                ),
+                {"cutoff": cutoff, "batch_size": batch_size},
+            ).rowcount
+            db.commit()
+            purged += deleted
+            if deleted < batch_size:
+                break
+    finally:
+        db.close()
+
+    if purged:
+        logger.info("Purged %d expired idempotency keys", purged)
+    return purged
+
+
+async def purge_loop(interval: float = IDEMPOTENCY_PURGE_INTERVAL) -> None:
+    while True:
+        try:
+            await asyncio.to_thread(purge_expired_keys)
+        except Exception as e:
+            logger.error("Idempotency key purge failed: %s", e)
+        await asyncio.sleep(interval)
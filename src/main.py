@@ -1,12 +1,85 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.database.dbcore import Base, engine
-from src.entities import users, todos
+from src.database.sharding import shards
+from src.entities import users, todos, outbox, idempotency
 from src.api import register_routes
+from src.middleware.compression import CompressionMiddleware
+from src.middleware.admission import ADMISSION_ENABLED, AdmissionMiddleware
+from src.middleware.read_your_writes import ReadYourWritesMiddleware
+from src.middleware.request_id import RequestIdMiddleware
+from src.middleware.profiling import RequestProfileMiddleware
+from src.observability.logging import configure_logging
+from src.observability.sql_cache import instrument_statement_cache
+from src.profiling.service import PROFILING_ENABLED
+from src.observability.tracing import (
+    TRACING_ENABLED,
+    TracingMiddleware,
+    instrument_sqlalchemy,
+    tracer,
+)
+from src.reminders.scheduler import REMINDERS_ENABLED, build_scheduler
+from src.events.relay import OUTBOX_RELAY_ENABLED, build_relay
+from src.idempotency.service import purge_loop
+from src.todos.purger import TODO_PURGE_ENABLED, SoftDeletePurger
+
+
+log_listener = configure_logging()
+
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Outbox rows, reminders and soft-deleted todos live on every shard.
+    schedulers = (
+        [build_scheduler(factory) for factory in shards.sessions.values()]
+        if REMINDERS_ENABLED
+        else []
+    )
+    relays = (
+        {name: build_relay(factory) for name, factory in shards.sessions.items()}
+        if OUTBOX_RELAY_ENABLED
+        else {}
+    )
+    app.state.outbox_relays = relays
+    for scheduler in schedulers:
+        scheduler.start()
+    for relay in relays.values():
+        relay.start()
+    idempotency_purger = asyncio.create_task(purge_loop())
+    todo_purgers = (
+        [
+            SoftDeletePurger(session_factory=factory)
+            for factory in shards.sessions.values()
+        ]
+        if TODO_PURGE_ENABLED
+        else []
+    )
+    for todo_purger in todo_purgers:
+        todo_purger.start()
+    yield
+    for todo_purger in todo_purgers:
+        await todo_purger.stop()
+    idempotency_purger.cancel()
+    for relay in relays.values():
+        await relay.stop()
+    for scheduler in schedulers:
+        await scheduler.stop()
+    tracer.flush()
+    log_listener.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 
 Base.metadata.create_all(bind=engine)
+for shard_engine in shards.engines.values():
+    if shard_engine is not engine:
+        Base.metadata.create_all(bind=shard_engine)
+
+# Added before CORS so shed responses still carry CORS headers.
+if ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
 
 origins = ["http://localhost:3000", "https://nextjsfront.vercel.app"]
 
@@ -17,5 +90,17 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
+instrument_statement_cache()
+if TRACING_ENABLED or PROFILING_ENABLED:
+    instrument_sqlalchemy()
+if TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+# Outside tracing so a profiled request's root span is the one traced.
+if PROFILING_ENABLED:
+    app.add_middleware(RequestProfileMiddleware)
+# Outermost, so shed and compressed responses carry the request id too.
+app.add_middleware(RequestIdMiddleware)
 
 register_routes(app)
@@ -0,0 +1,258 @@
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+# Initial and ceiling concurrency per pool: the adaptive limit backs off below
+# it under latency and recovers up to it, never past. Hashing is CPU-bound, so
+# it is the core count; reads and writes are bounded by the DB pool (5 + 10
+# overflow), and admitting more would only queue them on a connection.
+ADMISSION_HASH_LIMIT = int(
+    os.getenv("ADMISSION_HASH_LIMIT", str(os.cpu_count() or 1))
+)
+ADMISSION_READ_LIMIT = int(os.getenv("ADMISSION_READ_LIMIT", "15"))
+ADMISSION_WRITE_LIMIT = int(os.getenv("ADMISSION_WRITE_LIMIT", "10"))
+# Latency above which a pool's limit is cut multiplicatively (AIMD).
+ADMISSION_HASH_TARGET_MS = float(os.getenv("ADMISSION_HASH_TARGET_MS", "500"))
+ADMISSION_READ_TARGET_MS = float(os.getenv("ADMISSION_READ_TARGET_MS", "100"))
+ADMISSION_WRITE_TARGET_MS = float(os.getenv("ADMISSION_WRITE_TARGET_MS", "250"))
+# A request still queued after this long is shed with 503.
+ADMISSION_MAX_QUEUE_MS = float(os.getenv("ADMISSION_MAX_QUEUE_MS", "100"))
+ADMISSION_USER_LIMIT = int(os.getenv("ADMISSION_USER_LIMIT", "8"))
+
+# Routes that run argon2; everything else is classified by method.
+HASH_ROUTES = {
+    ("POST", "/auth/login"),
+    ("POST", "/auth/create"),
+    ("PUT", "/users/change-password"),
+}
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class AdaptiveLimit:
+    """AIMD concurrency limit driven by observed latency.
+
+    Each request finishing under `target` while the pool is saturated grows
+    the limit by 1/limit (about +1 per round trip); a slower one shrinks it
+    by `backoff`, at most once per `target` so one burst of slow completions
+    is a single congestion signal.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        target: float,
+        minimum: int = 1,
+        maximum: int | None = None,
+        backoff: float = 0.9,
+    ):
+        self.limit = float(initial)
+        self.target = target
+        self.minimum = minimum
+        self.maximum = maximum or initial
+        self.backoff = backoff
+        self._last_decrease = 0.0
+
+    def __int__(self) -> int:
+        return max(self.minimum, int(self.limit))
+
+    def update(self, latency: float, inflight: int, failed: bool = False) -> None:
+        now = time.monotonic()
+        if failed or latency > self.target:
+            if now - self._last_decrease >= self.target:
+                self.limit = max(self.minimum, self.limit * self.backoff)
+                self._last_decrease = now
+        elif inflight + 1 >= int(self):
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+
+class AdmissionPool:
+    """Concurrency budget with a FIFO queue bounded by waiting time."""
+
+    def __init__(self, name: str, limit: AdaptiveLimit, max_queue_time: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue_time = max_queue_time
+        self.inflight = 0
+        self.latency = limit.target / 2  # EWMA, seeds Retry-After
+        self.admitted = 0
+        self.shed = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> bool:
+        if self.inflight < int(self.limit) and not self._waiters:
+            self.inflight += 1
+            self.admitted += 1
+            return True
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.max_queue_time)
+        except asyncio.TimeoutError:
+            self.shed += 1
+            return False
+        except asyncio.CancelledError:
+            # Cancelled right after release() handed us a slot: give it back.
+            if waiter.done() and not waiter.cancelled():
+                self.inflight -= 1
+                self._wake()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        # The slot was handed over by release(), inflight already counts it.
+        self.admitted += 1
+        return True
+
+    def release(self, latency: float, failed: bool = False) -> None:
+        self.inflight -= 1
+        self.latency += 0.2 * (latency - self.latency)
+        self.limit.update(latency, self.inflight, failed)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.inflight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.inflight += 1
+                waiter.set_result(None)
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue should have drained."""
+
+        backlog = len(self._waiters) + self.inflight
+        return max(1, math.ceil(self.latency * backlog / int(self.limit)))
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "inflight": self.inflight,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "latency_ms": round(self.latency * 1000, 1),
+        }
+
+
+def _client_key(scope, hashing: bool) -> str | None:
+    """Fairness key: the client address.
+
+    The bearer token is not verified until the route runs, so keying on it
+    would let a caller dodge the cap by sending a fresh made-up token with
+    every request. Requests to the argon2 routes get no key and no per-caller
+    cap: behind a proxy or NAT every login and sign-up shares one address,
+    and the hash pool already bounds them.
+    """
+
+    if hashing:
+        return None
+    client = scope.get("client")
+    return client[0] if client else "anonymous"
+
+
+class AdmissionMiddleware:
+    """ASGI middleware bounding concurrent work per route class and per caller.
+
+    Requests are admitted into the "hash" (argon2 routes), "write" or "read"
+    pool. A pool at its adaptive limit queues requests FIFO and sheds those
+    that waited longer than `max_queue_ms` with 503 and Retry-After. A caller
+    already holding `user_limit` requests gets 429 without queueing, so one
+    client cannot fill a pool; argon2 requests are exempt (see _client_key).
+    The middleware puts itself in the request state as `admission`, so
+    handlers can report stats().
+    """
+
+    def __init__(
+        self,
+        app,
+        hash_limit: int = ADMISSION_HASH_LIMIT,
+        read_limit: int = ADMISSION_READ_LIMIT,
+        write_limit: int = ADMISSION_WRITE_LIMIT,
+        hash_target_ms: float = ADMISSION_HASH_TARGET_MS,
+        read_target_ms: float = ADMISSION_READ_TARGET_MS,
+        write_target_ms: float = ADMISSION_WRITE_TARGET_MS,
+        max_queue_ms: float = ADMISSION_MAX_QUEUE_MS,
+        user_limit: int = ADMISSION_USER_LIMIT,
+        hash_routes: set[tuple[str, str]] = HASH_ROUTES,
+    ):
+        self.app = app
+        max_queue_time = max_queue_ms / 1000
+        self.pools = {
+            name: AdmissionPool(
+                name, AdaptiveLimit(limit, target_ms / 1000), max_queue_time
+            )
+            for name, limit, target_ms in (
+                ("hash", hash_limit, hash_target_ms),
+                ("read", read_limit, read_target_ms),
+                ("write", write_limit, write_target_ms),
+            )
+        }
+        self.user_limit = user_limit
+        self.hash_routes = hash_routes
+        self._per_user: dict[str, int] = {}
+
+    def _pool_for(self, scope) -> AdmissionPool:
+        method = scope["method"]
+        if (method, scope["path"]) in self.hash_routes:
+            return self.pools["hash"]
+        if method in READ_METHODS:
+            return self.pools["read"]
+        return self.pools["write"]
+
+    def stats(self) -> dict:
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        scope.setdefault("state", {})["admission"] = self
+        pool = self._pool_for(scope)
+        user = _client_key(scope, pool is self.pools["hash"])
+        if user is not None:
+            if self._per_user.get(user, 0) >= self.user_limit:
+                await _reject(send, 429, 1, "Too many concurrent requests")
+                return
+            self._per_user[user] = self._per_user.get(user, 0) + 1
+        try:
+            if not await pool.acquire():
+                await _reject(send, 503, pool.retry_after(), "Server overloaded")
+                return
+
+            started = time.monotonic()
+            failed = True
+            try:
+                await self.app(scope, receive, send)
+                failed = False
+            finally:
+                pool.release(time.monotonic() - started, failed)
+        finally:
+            if user is not None:
+                remaining = self._per_user.pop(user) - 1
+                if remaining:
+                    self._per_user[user] = remaining
+
+
+async def _reject(send, status_code: int, retry_after: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(retry_after).encode("latin-1")),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,289 @@
+import gzip
+import hashlib
+import os
+import zlib
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+load_dotenv()
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "500"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+COMPRESSION_CACHE_SIZE = int(os.getenv("COMPRESSION_CACHE_SIZE", "256"))
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+
+def available_encodings() -> list[str]:
+    """Encodings this process can produce, in order of preference."""
+
+    encodings = []
+    if brotli is not None:
+        encodings.append("br")
+    if zstandard is not None:
+        encodings.append("zstd")
+    encodings.append("gzip")
+    return encodings
+
+
+def select_encoding(accept_encoding: str, supported: list[str]) -> str | None:
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in supported:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class StreamCompressor:
+    """Incremental compressor that flushes after every chunk so clients see data early."""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        if self.encoding == "zstd":
+            return self._compressor.compress(chunk) + self._compressor.flush(
+                zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            )
+        return self._compressor.compress(chunk) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressedBodyCache:
+    """Small LRU of compressed bodies, keyed by the body's identity and encoding.
+
+    An ETag only identifies a body within one resource, so it is keyed
+    together with the request target and content type; bodies without one
+    are keyed by their digest.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, bytes] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> bytes | None:
+        body = self._entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key: tuple, body: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with br, zstd or gzip.
+
+    Bodies sent in one message are compressed once (and cached by ETag);
+    streamed bodies are compressed chunk by chunk.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+        zstd_level: int = COMPRESSION_ZSTD_LEVEL,
+        cache_size: int = COMPRESSION_CACHE_SIZE,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level, "br": brotli_quality, "zstd": zstd_level}
+        self.encodings = available_encodings()
+        self.cache = CompressedBodyCache(cache_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+
+        encoding = select_encoding(accept_encoding, self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, scope, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(
+        self, middleware: CompressionMiddleware, scope, send, encoding: str
+    ):
+        self.middleware = middleware
+        self.target = (scope.get("path", ""), scope.get("query_string", b""))
+        self.downstream = send
+        self.encoding = encoding
+        self.level = middleware.levels[encoding]
+        self.start_message = None
+        self.passthrough = False
+        self.stream: StreamCompressor | None = None
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is not None:
+            chunk = self.stream.compress(body) if body else b""
+            if not more_body:
+                chunk += self.stream.finish()
+            await self.downstream(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+            return
+
+        headers = _Headers(self.start_message["headers"])
+        if not self._should_compress(headers, body, more_body):
+            self.passthrough = True
+            await self.downstream(self.start_message)
+            await self.downstream(message)
+            return
+
+        headers.set("content-encoding", self.encoding)
+        headers.append_vary("accept-encoding")
+
+        if more_body:
+            headers.remove("content-length")
+            self.stream = StreamCompressor(self.encoding, self.level)
+            await self.downstream(self.start_message | {"headers": headers.raw})
+            await self.downstream(
+                {
+                    "type": "http.response.body",
+                    "body": self.stream.compress(body),
+                    "more_body": True,
+                }
+            )
+            return
+
+        compressed = self._compress_cached(headers, body)
+        headers.set("content-length", str(len(compressed)))
+        await self.downstream(self.start_message | {"headers": headers.raw})
+        await self.downstream({"type": "http.response.body", "body": compressed})
+
+    def _should_compress(self, headers: "_Headers", body: bytes, more_body: bool):
+        if headers.get("content-encoding"):
+            return False
+        content_type = headers.get("content-type") or ""
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        return more_body or len(body) >= self.middleware.minimum_size
+
+    def _compress_cached(self, headers: "_Headers", body: bytes) -> bytes:
+        etag = headers.get("etag")
+        if etag:
+            key = (*self.target, headers.get("content-type"), etag, self.encoding)
+        else:
+            key = (hashlib.blake2b(body, digest_size=16).digest(), self.encoding)
+        cache = self.middleware.cache
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = compress(body, self.encoding, self.level)
+            cache.put(key, compressed)
+        return compressed
+
+
+class _Headers:
+    def __init__(self, raw: list[tuple[bytes, bytes]]):
+        self.raw = list(raw)
+
+    def get(self, name: str) -> str | None:
+        key = name.encode("latin-1")
+        for header, value in self.raw:
+            if header.lower() == key:
+                return value.decode("latin-1")
+        return None
+
+    def remove(self, name: str) -> None:
+        key = name.encode("latin-1")
+        self.raw = [(h, v) for h, v in self.raw if h.lower() != key]
+
+    def set(self, name: str, value: str) -> None:
+        self.remove(name)
+        self.raw.append((name.encode("latin-1"), value.encode("latin-1")))
+
+    def append_vary(self, value: str) -> None:
+        current = self.get("vary")
+        if current and value in current.lower():
+            return
+        self.set("vary", f"{current}, {value}" if current else value)
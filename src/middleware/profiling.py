@@ -0,0 +1,91 @@
+import json
+import threading
+
+from fastapi import HTTPException
+
+from src.auth.service import is_admin, verify_token
+from src.observability.tracing import tracer
+from src.profiling.request import RequestProfile
+
+# cProfile hooks are per thread and the event loop thread is shared, so only
+# one request per worker is profiled at a time.
+_profiling = threading.Lock()
+
+
+def _header(scope, name: bytes) -> str | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _is_admin_request(scope) -> bool:
+    authorization = _header(scope, b"authorization") or ""
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        return is_admin(verify_token(token))
+    except HTTPException:
+        return False
+
+
+class RequestProfileMiddleware:
+    """ASGI middleware profiling single requests on demand.
+
+    An admin request sent with `X-Profile: 1` runs normally, but its response
+    is replaced by a JSON profile: the span tree (route and dependencies,
+    service calls, SQL statements, hashing) and the top functions from
+    cProfile, merged across the event loop and threadpool threads it touched.
+    Anyone else's X-Profile header is ignored.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or _header(scope, b"x-profile") not in ("1", "true")
+            or not _is_admin_request(scope)
+            or not _profiling.acquire(blocking=False)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        response = {"status": None, "body_bytes": 0}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["body_bytes"] += len(message.get("body", b""))
+
+        try:
+            root = tracer.start_trace(
+                f"{scope['method']} {scope['path']}",
+                _header(scope, b"traceparent"),
+                profile=profile,
+                **{"http.method": scope["method"], "http.target": scope["path"]},
+            )
+            with root:
+                await self.app(scope, receive, capture)
+        finally:
+            _profiling.release()
+
+        body = json.dumps(
+            profile.report(response["status"], response["body_bytes"]), default=str
+        ).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"x-profile", b"1"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
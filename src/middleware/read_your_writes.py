@@ -0,0 +1,66 @@
+import math
+import time
+
+from starlette.requests import cookie_parser
+
+from src.database.routing import (
+    READ_YOUR_WRITES_WINDOW,
+    RequestWrites,
+    request_writes_var,
+)
+
+READ_YOUR_WRITES_COOKIE = "rw_at"
+
+
+def _cookie_stamp(scope) -> float | None:
+    for name, value in scope["headers"]:
+        if name != b"cookie":
+            continue
+        raw = cookie_parser(value.decode("latin-1")).get(READ_YOUR_WRITES_COOKIE)
+        try:
+            stamp = float(raw)
+        except (TypeError, ValueError):
+            return None
+        # Stamps outside the window are stale or forged; neither pins reads.
+        if 0 <= time.time() - stamp < READ_YOUR_WRITES_WINDOW:
+            return stamp
+        return None
+    return None
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware carrying read-your-writes stickiness with the client.
+
+    A request that writes gets a short-lived cookie stamped with the write
+    time. Whichever worker serves the client's next requests reads the stamp
+    into request_writes_var and keeps them on the primary for the rest of
+    READ_YOUR_WRITES_WINDOW, without sharing state between processes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        writes = RequestWrites(_cookie_stamp(scope))
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and writes.wrote:
+                cookie = (
+                    f"{READ_YOUR_WRITES_COOKIE}={writes.last_write:.3f}; "
+                    f"Max-Age={math.ceil(READ_YOUR_WRITES_WINDOW)}; Path=/; "
+                    "HttpOnly; SameSite=lax"
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", cookie.encode("latin-1")))
+                message = message | {"headers": headers}
+            await send(message)
+
+        token = request_writes_var.set(writes)
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            request_writes_var.reset(token)
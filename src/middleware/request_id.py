@@ -0,0 +1,44 @@
+import re
+import uuid
+
+from src.observability.logging import request_id_var
+
+_VALID_REQUEST_ID = re.compile(rb"^[A-Za-z0-9._-]{1,128}$")
+
+
+class RequestIdMiddleware:
+    """ASGI middleware tagging each request with an id for log correlation.
+
+    A well-formed incoming X-Request-ID is reused, otherwise one is generated.
+    The id is echoed on the response and visible to loggers via request_id_var.
+    """
+
+    def __init__(self, app, header: str = "x-request-id"):
+        self.app = app
+        self.header = header.encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == self.header and _VALID_REQUEST_ID.match(value):
+                request_id = value.decode("latin-1")
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((self.header, request_id.encode("latin-1")))
+                message = message | {"headers": headers}
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
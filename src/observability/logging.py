@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+# "logger=rate,..." keeps that share of INFO/DEBUG records from the logger and
+# its children, e.g. "src.todos.service=0.1,sqlalchemy.engine=0.01".
+LOG_SAMPLE = os.getenv("LOG_SAMPLE", "")
+
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else came in through `extra=`.
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "request_id"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the request id and any `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.request_id:
+            entry["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps 1 in N INFO/DEBUG records per configured logger; WARNING and up pass.
+
+    Sampling is by counter rather than randomness so a rate of 0.1 keeps
+    exactly every tenth line and costs one dict lookup per record.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.every = {name: max(1, round(1 / rate)) for name, rate in rates.items()}
+        self._counters: dict[str, int] = {}
+        self._resolved: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+
+    def _configured(self, name: str) -> str | None:
+        try:
+            return self._resolved[name]
+        except KeyError:
+            match = None
+            for candidate in self.every:
+                if name == candidate or name.startswith(candidate + "."):
+                    if match is None or len(candidate) > len(match):
+                        match = candidate
+            self._resolved[name] = match
+            return match
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        name = self._configured(record.name)
+        if name is None:
+            return True
+        with self._lock:
+            count = self._counters.get(name, 0)
+            self._counters[name] = count + 1
+        return count % self.every[name] == 0
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Enqueues the record as-is; formatting happens on the listener thread.
+
+    The stdlib QueueHandler formats in prepare() so records can be pickled to
+    another process. Our listener is a thread in this process, so the caller
+    only pays for creating the record.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def parse_sample_rates(spec: str) -> dict[str, float]:
+    rates = {}
+    for part in spec.split(","):
+        name, _, rate = part.strip().partition("=")
+        if name and rate:
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+def configure_logging(
+    level: str = LOG_LEVEL,
+    fmt: str = LOG_FORMAT,
+    sample: str = LOG_SAMPLE,
+    stream=None,
+) -> QueueListener:
+    """Route all logging through a queue to a single writer thread.
+
+    Returns the started listener; stop it on shutdown to flush the queue.
+    """
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    if fmt == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(
+            logging.Formatter(
+                "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+            )
+        )
+
+    handler = DeferredQueueHandler(queue.SimpleQueue())
+    rates = parse_sample_rates(sample)
+    if rates:
+        handler.addFilter(SamplingFilter(rates))
+    handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,72 @@
+import threading
+from collections import Counter
+
+from sqlalchemy import Engine, event
+from sqlalchemy.engine.default import CacheStats
+
+
+class StatementCacheStats:
+    """How often statements were served from SQLAlchemy's compiled cache.
+
+    Counts the cache outcome SQLAlchemy records on every execution context:
+    a hit reuses the compiled SQL, a miss compiled it and stored it, and
+    "disabled"/"no key" compiled it without caching. A low hit ratio on a
+    warm worker means statements are built with literal values or the
+    engine's query_cache_size is too small for the number of variants.
+    """
+
+    _OUTCOMES = {
+        CacheStats.CACHE_HIT: "hits",
+        CacheStats.CACHE_MISS: "misses",
+        CacheStats.CACHING_DISABLED: "disabled",
+        CacheStats.NO_CACHE_KEY: "no_cache_key",
+        CacheStats.NO_DIALECT_SUPPORT: "no_dialect_support",
+    }
+
+    def __init__(self):
+        self.counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, context) -> None:
+        outcome = self._OUTCOMES.get(getattr(context, "cache_hit", None))
+        if outcome is None:
+            return
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts.clear()
+
+    def stats(self, *engines: Engine) -> dict:
+        with self._lock:
+            counts = dict(self.counts)
+        hits = counts.get("hits", 0)
+        cacheable = hits + counts.get("misses", 0)
+        stats = {
+            outcome: counts.get(outcome, 0) for outcome in self._OUTCOMES.values()
+        }
+        stats["hit_ratio"] = round(hits / cacheable, 4) if cacheable else 0.0
+        stats["engines"] = [
+            {
+                "entries": len(engine._compiled_cache or ()),
+                "max_entries": getattr(engine._compiled_cache, "capacity", 0),
+            }
+            for engine in engines
+        ]
+        return stats
+
+
+statement_cache = StatementCacheStats()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        statement_cache.record(context)
+
+
+def instrument_statement_cache() -> None:
+    """Count compiled-cache outcomes on every engine, primary and replicas alike."""
+
+    if not event.contains(Engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
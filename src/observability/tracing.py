@@ -0,0 +1,445 @@
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable
+
+from dotenv import load_dotenv
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+# Share of new traces recorded; requests with a sampled traceparent are always
+# recorded, unsampled ones never are (parent-based head sampling).
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.05"))
+TRACE_EXPORTERS = os.getenv("TRACE_EXPORTERS", "log")
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "todo-api")
+TRACE_EXPORT_INTERVAL = float(os.getenv("TRACE_EXPORT_INTERVAL", "5"))
+TRACE_MAX_QUEUE = int(os.getenv("TRACE_MAX_QUEUE", "10000"))
+TRACE_MAX_STATEMENT_LENGTH = 1000
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "kind",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+        "profile",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: str | None = None,
+        kind: str = "internal",
+        attributes: dict | None = None,
+        profile=None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes or {}
+        self.error: str | None = None
+        # A RequestProfile when this request is being profiled; children inherit it.
+        self.profile = profile
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+# Only sampled spans are ever current; None means "not tracing" and keeps
+# every instrumentation point down to one context variable lookup.
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+class _SpanScope:
+    __slots__ = ("span", "_token")
+
+    def __init__(self, span: Span | None):
+        self.span = span
+        self._token = None
+
+    def __enter__(self) -> Span | None:
+        if self.span is not None:
+            self._token = _current_span.set(self.span)
+            if self.span.profile is not None:
+                self.span.profile.enter(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.span is None:
+            return
+        if exc is not None:
+            self.span.record_exception(exc)
+        _current_span.reset(self._token)
+        tracer.finish(self.span)
+        if self.span.profile is not None:
+            self.span.profile.exit(self.span)
+
+
+def span(name: str, kind: str = "internal", **attributes) -> _SpanScope:
+    """Child span of the current one; a no-op when the request is not traced."""
+
+    parent = _current_span.get()
+    if parent is None:
+        return _SpanScope(None)
+    return _SpanScope(
+        Span(name, parent.trace_id, parent.span_id, kind, attributes, parent.profile)
+    )
+
+
+def traced(name: str | None = None) -> Callable:
+    """Decorator wrapping a sync or async function in a span."""
+
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if _current_span.get() is None:
+                    return await fn(*args, **kwargs)
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return fn(*args, **kwargs)
+            with span(span_name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class LogExporter:
+    def export(self, spans: list[Span]) -> None:
+        for finished in spans:
+            logger.info("span %s", json.dumps(finished.to_dict(), default=str))
+
+
+class MemoryExporter:
+    """Keeps finished spans in memory; meant for tests and local runs."""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, spans: list[Span]) -> None:
+        self.spans.extend(spans)
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpHttpExporter:
+    """POSTs spans as OTLP/HTTP JSON, e.g. to an OpenTelemetry Collector."""
+
+    _KINDS = {"internal": 1, "server": 2, "client": 3}
+
+    def __init__(self, url: str, service_name: str = TRACE_SERVICE_NAME):
+        if not url.endswith("/v1/traces"):
+            url = url.rstrip("/") + "/v1/traces"
+        self.url = url
+        self.service_name = service_name
+
+    def _span(self, finished: Span) -> dict:
+        encoded = {
+            "traceId": finished.trace_id,
+            "spanId": finished.span_id,
+            "name": finished.name,
+            "kind": self._KINDS.get(finished.kind, 1),
+            "startTimeUnixNano": str(finished.start_ns),
+            "endTimeUnixNano": str(finished.end_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in finished.attributes.items()
+            ],
+            "status": (
+                {"code": 2, "message": finished.error}
+                if finished.error
+                else {"code": 0}
+            ),
+        }
+        if finished.parent_id:
+            encoded["parentSpanId"] = finished.parent_id
+        return encoded
+
+    def export(self, spans: list[Span]) -> None:
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": self.service_name},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [self._span(finished) for finished in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(body).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=10) as response:
+            if response.status >= 300:
+                raise RuntimeError(f"OTLP endpoint returned {response.status}")
+
+
+def build_exporter(spec: str):
+    """Create an exporter from a spec string: 'log', 'memory' or 'otlp:<url>'."""
+
+    kind, _, target = spec.partition(":")
+    if kind == "log":
+        return LogExporter()
+    if kind == "memory":
+        return MemoryExporter()
+    if kind == "otlp" and target:
+        return OtlpHttpExporter(target)
+    raise ValueError(f"Unknown trace exporter: {spec}")
+
+
+class Tracer:
+    """Head-sampled tracer exporting finished spans in background batches."""
+
+    def __init__(
+        self,
+        sample_rate: float = TRACE_SAMPLE_RATE,
+        exporters: list | None = None,
+        export_interval: float = TRACE_EXPORT_INTERVAL,
+        max_queue: int = TRACE_MAX_QUEUE,
+    ):
+        self.sample_rate = sample_rate
+        self.exporters = exporters or []
+        self.export_interval = export_interval
+        self.dropped = 0
+        self._queue: deque[Span] = deque(maxlen=max_queue)
+        self._wakeup = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start_trace(
+        self, name: str, traceparent: str | None = None, profile=None, **attributes
+    ) -> _SpanScope:
+        """Root span of a request, continuing an incoming W3C traceparent.
+
+        A profiled request is always recorded, whatever the sampling decision.
+        """
+
+        match = _TRACEPARENT.match(traceparent or "")
+        if match:
+            trace_id, parent_id, flags = match.groups()
+            sampled = int(flags, 16) & 1
+        else:
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+            sampled = random.random() < self.sample_rate
+        if profile is None and not (sampled and self.exporters):
+            return _SpanScope(None)
+        return _SpanScope(
+            Span(name, trace_id, parent_id, "server", attributes, profile)
+        )
+
+    def finish(self, finished: Span) -> None:
+        finished.end_ns = time.time_ns()
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(finished)
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._export_loop, name="trace-exporter", daemon=True
+            )
+            self._thread.start()
+
+    def flush(self) -> None:
+        batch = []
+        while self._queue:
+            batch.append(self._queue.popleft())
+        if not batch:
+            return
+        for exporter in self.exporters:
+            try:
+                exporter.export(batch)
+            except Exception as e:
+                logger.warning("Trace export to %s failed: %s", exporter, e)
+
+    def _export_loop(self) -> None:
+        while True:
+            self._wakeup.wait(self.export_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+tracer = Tracer(
+    exporters=(
+        [build_exporter(spec.strip()) for spec in TRACE_EXPORTERS.split(",")]
+        if TRACING_ENABLED
+        else []
+    )
+)
+
+
+class TracingMiddleware:
+    """ASGI middleware opening the root span for each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # A profiled request already has its root span.
+        if scope["type"] != "http" or _current_span.get() is not None:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1").strip().lower()
+                break
+
+        scope_span = tracer.start_trace(
+            f"{scope['method']} {scope['path']}",
+            traceparent,
+            **{"http.method": scope["method"], "http.target": scope["path"]},
+        )
+        root = scope_span.span
+        if root is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+            await send(message)
+
+        with scope_span:
+            await self.app(scope, receive, send_with_status)
+            route = scope.get("route")
+            if route is not None:
+                root.name = f"{scope['method']} {route.path}"
+
+
+class TracedRoute(APIRoute):
+    """Route class putting each endpoint (dependencies and handler) in a span."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        span_name = f"route {self.path}"
+
+        async def traced_handler(request):
+            if _current_span.get() is None:
+                return await handler(request)
+            with span(span_name, **{"http.route": self.path}):
+                return await handler(request)
+
+        return traced_handler
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    scope = span(
+        "db.query",
+        "client",
+        **{
+            "db.system": "postgresql",
+            "db.statement": statement[:TRACE_MAX_STATEMENT_LENGTH],
+        },
+    )
+    if scope.span is not None:
+        scope.__enter__()
+        context._trace_scope = scope
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    scope = getattr(context, "_trace_scope", None)
+    if scope is not None:
+        scope.span.set_attribute("db.rows", cursor.rowcount)
+        context._trace_scope = None
+        scope.__exit__(None, None, None)
+
+
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    scope = getattr(context, "_trace_scope", None)
+    if scope is not None:
+        context._trace_scope = None
+        exc = exception_context.original_exception
+        scope.__exit__(type(exc), exc, None)
+
+
+def instrument_sqlalchemy() -> None:
+    """Trace every statement on every engine, primary and replicas alike."""
+
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
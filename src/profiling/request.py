@@ -0,0 +1,110 @@
+import cProfile
+import io
+import pstats
+import threading
+import time
+
+
+class RequestProfile:
+    """Deterministic profile of one request across the threads it runs on.
+
+    Attached to the request's root span; every span entered on a thread
+    that is not yet profiling for this request starts a cProfile there (the
+    event loop for async code, threadpool workers for sync services and
+    SQLAlchemy) and stops it when that outermost span exits. The per-thread
+    profiles and the finished span tree are merged into one report.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: list = []
+        self._profiles: list[cProfile.Profile] = []
+        self._active: dict[int, list] = {}
+        self._lock = threading.Lock()
+
+    def enter(self, span) -> None:
+        thread_id = threading.get_ident()
+        with self._lock:
+            active = self._active.get(thread_id)
+            if active is not None:
+                active[1] += 1
+                return
+            profiler = cProfile.Profile()
+            self._active[thread_id] = [profiler, 1]
+        profiler.enable()
+
+    def exit(self, span) -> None:
+        thread_id = threading.get_ident()
+        with self._lock:
+            self.spans.append(span)
+            active = self._active.get(thread_id)
+            if active is None:
+                return
+            active[1] -= 1
+            if active[1]:
+                return
+            del self._active[thread_id]
+        profiler = active[0]
+        profiler.disable()
+        with self._lock:
+            self._profiles.append(profiler)
+
+    def _span_tree(self) -> list[dict]:
+        nodes = {
+            span.span_id: {
+                "name": span.name,
+                "duration_ms": round((span.end_ns - span.start_ns) / 1e6, 3),
+                "attributes": span.attributes,
+                "error": span.error,
+                "start_ns": span.start_ns,
+                "children": [],
+            }
+            for span in self.spans
+        }
+        roots = []
+        for span in self.spans:
+            parent = nodes.get(span.parent_id)
+            (parent["children"] if parent else roots).append(nodes[span.span_id])
+        for node in nodes.values():
+            node["children"].sort(key=lambda child: child["start_ns"])
+        for node in nodes.values():
+            node.pop("start_ns")
+        return roots
+
+    def _functions(self, limit: int) -> tuple[list[dict], str]:
+        if not self._profiles:
+            return [], ""
+        output = io.StringIO()
+        stats = pstats.Stats(self._profiles[0], stream=output)
+        for profiler in self._profiles[1:]:
+            stats.add(profiler)
+        stats.sort_stats("cumulative").print_stats(limit)
+
+        functions = []
+        ranked = sorted(
+            stats.stats.items(), key=lambda item: item[1][3], reverse=True
+        )
+        for (filename, line, name), entry in ranked[:limit]:
+            _, calls, tottime, cumtime, _ = entry
+            functions.append(
+                {
+                    "function": f"{filename}:{line}({name})",
+                    "calls": calls,
+                    "tottime_ms": round(tottime * 1000, 3),
+                    "cumtime_ms": round(cumtime * 1000, 3),
+                }
+            )
+        return functions, output.getvalue()
+
+    def report(
+        self, status_code: int | None, body_bytes: int, limit: int = 40
+    ) -> dict:
+        functions, text = self._functions(limit)
+        return {
+            "status_code": status_code,
+            "body_bytes": body_bytes,
+            "duration_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "spans": self._span_tree(),
+            "functions": functions,
+            "pstats": text,
+        }
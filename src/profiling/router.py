@@ -0,0 +1,36 @@
+import os
+
+from fastapi import APIRouter, Query
+from fastapi.responses import PlainTextResponse
+
+from src.observability.tracing import TracedRoute
+from src.profiling.service import PROFILER_MAX_SECONDS, ProfilerAdmin, sample_worker
+
+router = APIRouter(prefix="/admin/profiling", tags=["admin"], route_class=TracedRoute)
+
+
+@router.post("/sample")
+async def sample_profile(
+    admin: ProfilerAdmin,
+    seconds: float = Query(10, gt=0, le=PROFILER_MAX_SECONDS),
+    interval_ms: float = Query(5, ge=1, le=100),
+    output: str = Query("collapsed", alias="format", pattern="^(collapsed|json)$"),
+):
+    """Sample this worker's stacks for `seconds`.
+
+    `collapsed` returns folded stacks for flamegraph.pl or speedscope; `json`
+    returns a d3-flame-graph tree.
+    """
+
+    sampler = await sample_worker(seconds, interval_ms / 1000)
+    if output == "collapsed":
+        return PlainTextResponse(
+            sampler.collapsed(), headers={"X-Profile-Worker": str(os.getpid())}
+        )
+    return {
+        "worker": os.getpid(),
+        "seconds": round(sampler.elapsed, 3),
+        "samples": sampler.samples,
+        "interval_ms": interval_ms,
+        "flamegraph": sampler.tree(),
+    }
@@ -0,0 +1,108 @@
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+
+_PREFIXES = (
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    sysconfig.get_paths()["stdlib"],
+)
+
+
+def frame_label(code) -> str:
+    """Frame name as "path.py:function", relative to site-packages or stdlib."""
+
+    filename = code.co_filename
+    marker = filename.rfind("site-packages" + os.sep)
+    if marker != -1:
+        filename = filename[marker + len("site-packages") + 1 :]
+    else:
+        for prefix in _PREFIXES:
+            if filename.startswith(prefix + os.sep):
+                filename = filename[len(prefix) + 1 :]
+                break
+    # co_qualname only exists from Python 3.11.
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{filename}:{name}"
+
+
+class StackSampler:
+    """Statistical profiler sampling every thread's stack on a timer.
+
+    Reads sys._current_frames() from a background thread, so the profiled
+    code is never instrumented; the cost is one stack walk per thread per
+    interval. Stacks are aggregated as collapsed "a;b;c count" lines.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self.started_at = 0.0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.elapsed = time.monotonic() - self.started_at
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack.append(f"thread:{names.get(thread_id, thread_id)}")
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format, the input of flamegraph.pl and speedscope."""
+
+        return "\n".join(
+            f"{stack} {count}" for stack, count in self.stacks.most_common()
+        )
+
+    def tree(self) -> dict:
+        """Nested {name, value, children} tree, as d3-flame-graph consumes."""
+
+        root = {"name": "all", "value": 0, "children": {}}
+        for stack, count in self.stacks.items():
+            root["value"] += count
+            node = root
+            for name in stack.split(";"):
+                child = node["children"].get(name)
+                if child is None:
+                    child = {"name": name, "value": 0, "children": {}}
+                    node["children"][name] = child
+                child["value"] += count
+                node = child
+
+        def listify(node: dict) -> dict:
+            children = sorted(
+                node["children"].values(), key=lambda c: c["value"], reverse=True
+            )
+            return node | {"children": [listify(child) for child in children]}
+
+        return listify(root)
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+import os
+from typing import Annotated
+
+from dotenv import load_dotenv
+from fastapi import Depends, HTTPException
+from starlette import status
+
+from src.auth.schemas import Principal
+from src.auth.service import CurrentUser, require_admin
+from src.profiling.sampler import StackSampler
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILER_MAX_SECONDS = int(os.getenv("PROFILER_MAX_SECONDS", "120"))
+
+# One sampling session per worker at a time; a second would double the cost.
+_sampling = asyncio.Lock()
+
+
+def require_profiler(current_user: CurrentUser) -> Principal:
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return require_admin(current_user)
+
+
+ProfilerAdmin = Annotated[Principal, Depends(require_profiler)]
+
+
+async def sample_worker(seconds: float, interval: float) -> StackSampler:
+    """Sample every thread of this worker for `seconds` and return the sampler."""
+
+    if _sampling.locked():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profiling session is already running on this worker",
+        )
+    async with _sampling:
+        sampler = StackSampler(interval)
+        sampler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+    logger.info(
+        "Profiled worker %s for %.1fs, %s samples",
+        os.getpid(),
+        sampler.elapsed,
+        sampler.samples,
+    )
+    return sampler
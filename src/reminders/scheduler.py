@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+from sqlalchemy import Connection, bindparam, false, select, text, update
+from sqlalchemy.orm import sessionmaker
+
+from src.database.dbcore import SessionLocal
+from src.entities.todos import Todos
+from src.events.sinks import build_sink
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REMINDERS_ENABLED = os.getenv("REMINDERS_ENABLED", "false").lower() == "true"
+REMINDERS_SINK = os.getenv("REMINDERS_SINK", "log")
+REMINDERS_INTERVAL = float(os.getenv("REMINDERS_INTERVAL", "60"))
+REMINDERS_LEAD_MINUTES = int(os.getenv("REMINDERS_LEAD_MINUTES", "60"))
+REMINDERS_BATCH_SIZE = int(os.getenv("REMINDERS_BATCH_SIZE", "500"))
+REMINDERS_LOOKBACK_HOURS = int(os.getenv("REMINDERS_LOOKBACK_HOURS", "24"))
+
+# Arbitrary constant shared by all workers; only the holder of this
+# session-level advisory lock runs sweeps.
+REMINDERS_LOCK_KEY = 0x7265_6D64
+
+
+# Column on todos holding the deadline each kind of reminder was sent for.
+_SENT_FOR = {
+    "todo.due_soon": Todos.due_soon_sent_for,
+    "todo.overdue": Todos.overdue_sent_for,
+}
+
+_todos = Todos.__table__
+_mark_statements = {
+    kind: update(_todos)
+    .where(_todos.c.id == bindparam("b_id"))
+    .where(_todos.c.user_id == bindparam("b_user_id"))
+    # Listing updated_at keeps its onupdate from firing: a reminder is not
+    # an edit of the todo.
+    .values({sent_for.name: bindparam("b_deadline"), "updated_at": _todos.c.updated_at})
+    for kind, sent_for in _SENT_FOR.items()
+}
+
+
+class DeadlineReminderScheduler:
+    """Emits todo.due_soon and todo.overdue events for open todos.
+
+    A todo is owed a reminder while its due_soon_sent_for / overdue_sent_for
+    differs from its deadline, so todos created or moved at short notice are
+    picked up like any other. Owed todos are the only rows in the partial
+    ix_todos_*_pending indexes, which keeps each sweep to a small range scan.
+    Overdue reminders look back at most `lookback`, which bounds how far a
+    long scheduler outage is caught up.
+    """
+
+    def __init__(
+        self,
+        sink,
+        interval: float = REMINDERS_INTERVAL,
+        lead: timedelta = timedelta(minutes=REMINDERS_LEAD_MINUTES),
+        lookback: timedelta = timedelta(hours=REMINDERS_LOOKBACK_HOURS),
+        batch_size: int = REMINDERS_BATCH_SIZE,
+        session_factory: sessionmaker = SessionLocal,
+    ):
+        self.sink = sink
+        self.session_factory = session_factory
+        self.interval = interval
+        self.lead = lead
+        self.lookback = lookback
+        self.batch_size = batch_size
+        self._task: asyncio.Task | None = None
+        self._leader_conn: Connection | None = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader_conn is not None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self._release_leadership)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if await asyncio.to_thread(self._ensure_leadership):
+                    await self.sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Deadline reminder sweep failed: %s", e)
+                await asyncio.to_thread(self._release_leadership)
+            await asyncio.sleep(self.interval)
+
+    def _ensure_leadership(self) -> bool:
+        if self._leader_conn is not None:
+            try:
+                self._leader_conn.execute(text("SELECT 1"))
+                self._leader_conn.commit()
+                return True
+            except Exception as e:
+                logger.warning("Lost reminder leader connection: %s", e)
+                self._release_leadership()
+                return False
+
+        conn = self.session_factory.kw["bind"].connect()
+        acquired = conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": REMINDERS_LOCK_KEY}
+        ).scalar()
+        conn.commit()
+        if not acquired:
+            conn.close()
+            return False
+
+        logger.info("Acquired deadline reminder leadership")
+        self._leader_conn = conn
+        return True
+
+    def _release_leadership(self) -> None:
+        conn, self._leader_conn = self._leader_conn, None
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": REMINDERS_LOCK_KEY}
+            )
+            conn.commit()
+            conn.close()
+        except Exception:
+            # Never hand a connection that may still hold the lock back to the pool.
+            conn.invalidate()
+
+    async def sweep(self) -> int:
+        now = datetime.now(timezone.utc)
+        emitted = await self._sweep_kind("todo.due_soon", now, now + self.lead)
+        emitted += await self._sweep_kind("todo.overdue", now - self.lookback, now)
+        return emitted
+
+    async def _sweep_kind(self, kind: str, lower: datetime, upper: datetime) -> int:
+        emitted = 0
+        while True:
+            rows = await asyncio.to_thread(self._fetch_batch, kind, lower, upper)
+            if not rows:
+                return emitted
+            await self.sink.emit(
+                [
+                    {
+                        "type": kind,
+                        "todo_id": str(row.id),
+                        "user_id": str(row.user_id),
+                        "title": row.title,
+                        "deadline": row.deadline.isoformat(),
+                    }
+                    for row in rows
+                ]
+            )
+            await asyncio.to_thread(self._mark_sent, kind, rows)
+            emitted += len(rows)
+            if len(rows) < self.batch_size:
+                return emitted
+
+    def _fetch_batch(self, kind: str, lower: datetime, upper: datetime) -> list:
+        """Open todos due in (lower, upper] whose `kind` reminder is owed."""
+
+        sent_for = _SENT_FOR[kind]
+        db = self.session_factory()
+        try:
+            return db.execute(
+                select(Todos.id, Todos.user_id, Todos.title, Todos.deadline)
+                .where(Todos.complete == false())
+                .where(Todos.deleted_at.is_(None))
+                .where(sent_for.is_distinct_from(Todos.deadline))
+                .where(Todos.deadline > lower)
+                .where(Todos.deadline <= upper)
+                .order_by(Todos.deadline, Todos.id)
+                .limit(self.batch_size)
+            ).all()
+        finally:
+            db.close()
+
+    def _mark_sent(self, kind: str, rows: list) -> None:
+        # Marked with the deadline that was announced: if the todo was moved
+        # meanwhile, the next sweep still sees it as owed.
+        db = self.session_factory()
+        try:
+            db.execute(
+                _mark_statements[kind],
+                [
+                    {
+                        "b_id": row.id,
+                        "b_user_id": row.user_id,
+                        "b_deadline": row.deadline,
+                    }
+                    for row in rows
+                ],
+            )
+            db.commit()
+        finally:
+            db.close()
+
+
+def build_scheduler(
+    session_factory: sessionmaker = SessionLocal,
+) -> DeadlineReminderScheduler:
+    return DeadlineReminderScheduler(
+        build_sink(REMINDERS_SINK), session_factory=session_factory
+    )
@@ -0,0 +1,91 @@
+"""Per-request cost of the auth dependency chain.
+
+Usage: python -m src.scripts.benchmark_auth [iterations]
+
+Times what every authenticated request pays: JWT decode, building the
+principal and reading its UUID the way /users/me does. The old Pydantic
+TokenData, which kept the id as a string and re-parsed it in get_uuid(),
+is rebuilt here as the baseline.
+"""
+
+import statistics
+import sys
+import time
+import uuid
+from uuid import UUID
+
+import jwt
+from pydantic import BaseModel
+
+from src.auth.schemas import Principal
+from src.auth.service import (
+    ALGORITHM,
+    SECRET_KEY,
+    create_access_token,
+    get_current_user,
+)
+
+
+class LegacyTokenData(BaseModel):
+    user_id: str | None = None
+
+    def get_uuid(self) -> UUID | None:
+        if self.user_id:
+            return UUID(self.user_id)
+        return None
+
+
+def legacy_current_user(token: str) -> UUID:
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    return LegacyTokenData(user_id=payload.get("id")).get_uuid()
+
+
+def current_user(token: str) -> UUID:
+    return get_current_user(token).user_id
+
+
+def _time(fn, arg, iterations: int) -> list[float]:
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter_ns()
+        fn(arg)
+        timings.append((time.perf_counter_ns() - started) / 1000)
+    return timings
+
+
+def main(iterations: int = 50000) -> None:
+    token = create_access_token("bench@example.com", uuid.uuid4())
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+    cases = {
+        "legacy chain": (legacy_current_user, token),
+        "principal chain": (current_user, token),
+        "jwt.decode only": (
+            lambda t: jwt.decode(t, SECRET_KEY, algorithms=[ALGORITHM]),
+            token,
+        ),
+        "legacy object": (
+            lambda p: LegacyTokenData(user_id=p["id"]).get_uuid(),
+            payload,
+        ),
+        "principal object": (
+            lambda p: Principal(
+                user_id=UUID(p["id"]), email=p["sub"], expires_at=p["exp"], claims=p
+            ).get_uuid(),
+            payload,
+        ),
+    }
+    for fn, arg in cases.values():
+        _time(fn, arg, 1000)
+
+    for name, (fn, arg) in cases.items():
+        timings = sorted(_time(fn, arg, iterations))
+        print(
+            f"{name:<17} mean={statistics.fmean(timings):.2f}us "
+            f"p50={statistics.median(timings):.2f}us "
+            f"p99={timings[int(len(timings) * 0.99)]:.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,148 @@
+"""Calendar window benchmark for a user with a large deadline history.
+
+Usage: python -m src.scripts.benchmark_calendar [todos]
+
+Seeds `todos` rows (default 500,000) with deadlines spread over ten years
+for one throwaway user, plus a tenth as many for each of 50 others. Seeding
+happens inside one transaction that is rolled back at the end. For week,
+month, quarter and year windows it reports EXPLAIN ANALYZE execution times
+of the two /todos/calendar statements. Each runs once with
+ix_todos_user_deadline and once with the index dropped inside a savepoint.
+For comparison, the last line times the full /todos/all-todo list that
+clients used to fetch and filter themselves.
+"""
+
+import json
+import statistics
+import sys
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import psycopg2
+
+from src.database.dbcore import SessionLocal
+from src.todos.calendar import (
+    CALENDAR_MAX_ITEMS,
+    calendar_counts_statement,
+    calendar_items_statement,
+    calendar_params,
+)
+from src.todos.service import todo_list_query
+from src.todos.sorting import parse_sort_spec
+
+_DIALECT = psycopg2.dialect(paramstyle="named")
+
+OTHER_USERS = 50
+HISTORY_DAYS = 3650
+RUNS = 5
+TZ = "Europe/Berlin"
+
+# name -> (days, bucket)
+WINDOWS = {
+    "week": (7, "day"),
+    "month": (31, "day"),
+    "quarter": (91, "week"),
+    "year": (365, "week"),
+}
+
+
+def _seed(conn, todos: int) -> None:
+    conn.execute(
+        text(
+            "INSERT INTO users (id, email, username, password) "
+            "SELECT gen_random_uuid(), 'calbench' || g || '@example.com', "
+            "'calbench_' || g, 'x' FROM generate_series(0, :users) g"
+        ),
+        {"users": OTHER_USERS},
+    )
+    # calbench_0 gets `todos` rows, every other user a tenth of that.
+    conn.execute(
+        text(
+            "INSERT INTO todos (id, user_id, title, description, categories, tags, "
+            "priority, complete, deadline) "
+            "SELECT gen_random_uuid(), u.id, 'Benchmark todo ' || g, "
+            "'Seeded by benchmark_calendar', 'OTHER', ARRAY['OTHER'::todo_category], "
+            "1 + g % 10, g % 3 = 0, "
+            "now() - interval '9 years' + random() * interval '1 day' * :days "
+            "FROM users u, LATERAL generate_series(1, CASE "
+            "  WHEN u.username = 'calbench_0' THEN :todos ELSE :todos / 10 END) g "
+            "WHERE u.username LIKE 'calbench\\_%'"
+        ),
+        {"todos": todos, "days": HISTORY_DAYS},
+    )
+    conn.execute(text("ANALYZE users"))
+    conn.execute(text("ANALYZE todos"))
+
+
+def _explain(conn, statement) -> tuple[float, int, bool]:
+    sql = str(
+        statement.compile(dialect=_DIALECT, compile_kwargs={"literal_binds": True})
+    )
+    raw = conn.execution_options(no_parameters=True).exec_driver_sql(
+        f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"
+    )
+    plan = raw.scalar()
+    plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]
+    return (
+        plan["Execution Time"],
+        plan["Plan"]["Actual Rows"],
+        "ix_todos_user_deadline" in json.dumps(plan["Plan"]),
+    )
+
+
+def _timed(conn, statement) -> tuple[float, int, bool]:
+    runs = [_explain(conn, statement) for _ in range(RUNS)]
+    return statistics.median(run[0] for run in runs), runs[0][1], runs[0][2]
+
+
+def _window_statements(user_id, days: int, bucket: str) -> tuple:
+    end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    params = calendar_params(user_id, end - timedelta(days=days), end, TZ)
+    return (
+        calendar_counts_statement(bucket).params(params),
+        calendar_items_statement.params(params | {"limit": CALENDAR_MAX_ITEMS + 1}),
+    )
+
+
+def main(todos: int = 500_000) -> None:
+    db = SessionLocal()
+    try:
+        conn = db.connection()
+        print(f"seeding {todos} todos for one user, {todos // 10} for each other...")
+        _seed(conn, todos)
+        user_id = conn.execute(
+            text("SELECT id FROM users WHERE username = 'calbench_0'")
+        ).scalar()
+
+        print(
+            f"{'window':<9}{'buckets':>8}{'items':>7}{'counts ms':>11}"
+            f"{'items ms':>10}{'no index':>10}{'no index':>10}  index used"
+        )
+        for name, (days, bucket) in WINDOWS.items():
+            counts, items = _window_statements(user_id, days, bucket)
+            counts_ms, buckets, counts_used = _timed(conn, counts)
+            items_ms, rows, items_used = _timed(conn, items)
+
+            conn.execute(text("SAVEPOINT calendar_bench"))
+            conn.execute(text("DROP INDEX ix_todos_user_deadline"))
+            counts_base, _, _ = _timed(conn, counts)
+            items_base, _, _ = _timed(conn, items)
+            conn.execute(text("ROLLBACK TO SAVEPOINT calendar_bench"))
+
+            print(
+                f"{name:<9}{buckets:>8}{rows:>7}{counts_ms:>11.2f}{items_ms:>10.2f}"
+                f"{counts_base:>10.2f}{items_base:>10.2f}  "
+                f"{'yes' if counts_used and items_used else 'no'}"
+            )
+
+        all_ms, all_rows, _ = _timed(
+            conn, todo_list_query(user_id, parse_sort_spec(None, "asc"))
+        )
+        print(f"all-todo list: {all_rows} rows in {all_ms:.2f} ms")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
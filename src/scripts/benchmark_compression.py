@@ -0,0 +1,56 @@
+"""Bandwidth vs CPU trade-off of the response compression codecs.
+
+Usage: python -m src.scripts.benchmark_compression [todos]
+
+Builds a todo list payload shaped like /todos/all-todo (200-char descriptions)
+and reports ratio and compression time for every available codec and level.
+"""
+
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from src.middleware.compression import available_encodings, compress
+
+LEVELS = {"gzip": (1, 4, 6, 9), "br": (1, 4, 6, 11), "zstd": (1, 3, 9, 19)}
+
+
+def _payload(todos: int) -> bytes:
+    deadline = (datetime.now(timezone.utc) + timedelta(days=7)).isoformat()
+    return json.dumps(
+        [
+            {
+                "id": str(uuid.uuid4()),
+                "title": f"Todo number {i}",
+                "description": f"Description {i} " + "lorem ipsum dolor sit amet " * 7,
+                "categories": "work",
+                "priority": i % 10 + 1,
+                "complete": False,
+                "deadline": deadline,
+            }
+            for i in range(todos)
+        ]
+    ).encode()
+
+
+def main(todos: int = 500, rounds: int = 20) -> None:
+    body = _payload(todos)
+    print(f"payload: {todos} todos, {len(body)} bytes")
+    print(f"{'codec':<6}{'level':>6}{'bytes':>10}{'ratio':>8}{'ms/resp':>10}{'MB/s':>9}")
+    for encoding in available_encodings():
+        for level in LEVELS[encoding]:
+            started = time.perf_counter()
+            for _ in range(rounds):
+                compressed = compress(body, encoding, level)
+            elapsed = (time.perf_counter() - started) / rounds
+            print(
+                f"{encoding:<6}{level:>6}{len(compressed):>10}"
+                f"{len(body) / len(compressed):>8.1f}{elapsed * 1000:>10.2f}"
+                f"{len(body) / elapsed / 1e6:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,77 @@
+"""Rows-per-second benchmark for the bulk todo import.
+
+Usage: python -m src.scripts.benchmark_import [rows] [baseline_rows]
+
+Seeds a throwaway user, imports `rows` generated todos through the COPY path
+and `baseline_rows` through the per-row ORM path (one INSERT + commit each),
+then deletes the user again.
+"""
+
+import io
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from src.database.dbcore import SessionLocal
+from src.entities.todos import Todos
+from src.entities.users import Users
+from src.enums.todos import TodoCategory
+from src.todos.importer import import_todos
+
+
+def _generate_csv(rows: int) -> bytes:
+    deadline = (datetime.now(timezone.utc) + timedelta(days=30)).isoformat()
+    categories = [c.value for c in TodoCategory]
+    lines = ["title,description,categories,priority,complete,deadline"]
+    for i in range(rows):
+        lines.append(
+            f"Imported todo {i},{'Generated description for benchmarking ' * 2}{i},"
+            f"{categories[i % len(categories)]},{i % 10 + 1},false,{deadline}"
+        )
+    return ("\n".join(lines) + "\n").encode()
+
+
+def main(rows: int = 100_000, baseline_rows: int = 1_000) -> None:
+    db = SessionLocal()
+    user = Users(
+        email=f"bench-{uuid.uuid4().hex[:8]}@example.com",
+        username=f"bench_{uuid.uuid4().hex[:8]}",
+        password="not-a-real-hash",
+    )
+    db.add(user)
+    db.commit()
+
+    try:
+        payload = _generate_csv(rows)
+        result = import_todos(db, user.id, io.BytesIO(payload), "csv")
+        print(
+            f"COPY import: {result.imported} rows in {result.elapsed_seconds}s "
+            f"({result.rows_per_second} rows/s)"
+        )
+
+        started = time.perf_counter()
+        for i in range(baseline_rows):
+            db.add(
+                Todos(
+                    user_id=user.id,
+                    title=f"Baseline todo {i}",
+                    description="Generated description for benchmarking",
+                    categories=TodoCategory.OTHER,
+                    priority=5,
+                )
+            )
+            db.commit()
+        elapsed = time.perf_counter() - started
+        print(
+            f"Per-row insert: {baseline_rows} rows in {elapsed:.3f}s "
+            f"({baseline_rows / elapsed:.1f} rows/s)"
+        )
+    finally:
+        db.delete(user)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
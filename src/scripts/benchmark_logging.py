@@ -0,0 +1,101 @@
+"""Per-request logging overhead before and after the structured logging setup.
+
+Usage: python -m src.scripts.benchmark_logging [requests]
+
+Replays the log traffic of one GET /todos/all-todo: the service's info line
+plus what `echo=True` printed for the query (BEGIN, statement, parameters,
+ROLLBACK). "before" is the old setup: eager f-strings and synchronous
+stream handlers with SQL echo on. The "after" rows use configure_logging()
+with SQL echo off, first without and then with sampling of the service's
+info lines. Only time spent on the request thread is counted; the queue
+listener writes in the background. Output goes to a temporary file, so
+the file I/O is real but the terminal stays quiet.
+"""
+
+import logging
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+from src.observability.logging import configure_logging
+
+SERVICE_LOGGER = "src.todos.service"
+SQL_LOGGER = "sqlalchemy.engine.Engine"
+STATEMENT = (
+    "SELECT todos.id, todos.title, todos.description, todos.categories, "
+    "todos.priority, todos.complete, todos.deadline, todos.created_at \n"
+    "FROM todos \nWHERE todos.user_id = %(user_id_1)s::UUID AND "
+    "todos.deleted_at IS NULL ORDER BY todos.priority ASC, todos.id ASC"
+)
+
+
+def _before_request(user_id, todos: list) -> None:
+    service, sql = logging.getLogger(SERVICE_LOGGER), logging.getLogger(SQL_LOGGER)
+    sql.info("BEGIN (implicit)")
+    sql.info(STATEMENT)
+    sql.info(f"[generated in 0.00021s] {{'user_id_1': UUID('{user_id}')}}")
+    service.info(f"Retrieved {len(todos)} todos for user {user_id}")
+    sql.info("ROLLBACK")
+
+
+def _after_request(user_id, todos: list) -> None:
+    service, sql = logging.getLogger(SERVICE_LOGGER), logging.getLogger(SQL_LOGGER)
+    sql.info("BEGIN (implicit)")
+    sql.info(STATEMENT)
+    sql.info("[generated in %.5fs] %r", 0.00021, {"user_id_1": user_id})
+    service.info("Retrieved %s todos for user %s", len(todos), user_id)
+    sql.info("ROLLBACK")
+
+
+def _reset_logging() -> None:
+    for name in ("", SQL_LOGGER):
+        logger = logging.getLogger(name)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.setLevel(logging.NOTSET)
+
+
+def _run(request, requests: int) -> list[float]:
+    user_id, todos = uuid.uuid4(), list(range(25))
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter_ns()
+        request(user_id, todos)
+        timings.append((time.perf_counter_ns() - started) / 1000)
+    return sorted(timings)
+
+
+def _report(name: str, timings: list[float]) -> None:
+    print(
+        f"{name:<28} mean={statistics.fmean(timings):6.2f}us "
+        f"p50={statistics.median(timings):6.2f}us "
+        f"p99={timings[int(len(timings) * 0.99)]:6.2f}us"
+    )
+
+
+def main(requests: int = 20000) -> None:
+    with tempfile.TemporaryFile("w") as output:
+        _reset_logging()
+        logging.basicConfig(level=logging.INFO, stream=output)
+        # What create_engine(echo=True) installs on the engine logger.
+        sql = logging.getLogger(SQL_LOGGER)
+        echo = logging.StreamHandler(output)
+        echo.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        sql.addHandler(echo)
+        _report("before (f-strings, echo)", _run(_before_request, requests))
+
+        for name, sample in (
+            ("after (queue, json)", ""),
+            ("after (+ sampling 1/10)", f"{SERVICE_LOGGER}=0.1"),
+        ):
+            _reset_logging()
+            logging.getLogger(SQL_LOGGER).setLevel(logging.WARNING)  # SQL_ECHO off
+            listener = configure_logging("INFO", "json", sample, stream=output)
+            _report(name, _run(_after_request, requests))
+            listener.stop()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,128 @@
+"""Per-execution statement overhead before a query reaches the database.
+
+Usage: python -m src.scripts.benchmark_statement_cache [iterations]
+
+For each hot query, times what SQLAlchemy does on every execute before the
+driver is called: building the statement (the legacy db.query chains and
+per-call select() the services used to run), generating its cache key and
+looking it up in a compiled cache, compiling on a miss. The prebuilt,
+bind-parameter statements the services use now skip the build and reuse a
+memoized cache key. No database is needed; compilation uses the postgres
+dialect.
+"""
+
+import statistics
+import sys
+import time
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.util import LRUCache
+
+from src.entities.todos import Todos
+from src.entities.users import Users
+from src.todos.service import _todo_by_id, todo_list_params, todo_list_statement
+from src.todos.sorting import SortKey
+from src.users.service import _user_by_id
+
+_DIALECT = postgresql.dialect()
+_KEYS = (SortKey("priority", True),)
+
+
+class CompiledCache:
+    """The engine's compiled cache: cache key -> compiled SQL, compiled on a miss."""
+
+    def __init__(self, size: int = 500):
+        self.entries = LRUCache(size)
+        self.hits = 0
+        self.misses = 0
+
+    def compile(self, statement):
+        key = statement._generate_cache_key().key
+        compiled = self.entries.get(key)
+        if compiled is None:
+            self.misses += 1
+            compiled = statement.compile(dialect=_DIALECT)
+            self.entries[key] = compiled
+        else:
+            self.hits += 1
+        return compiled
+
+
+def legacy_todo(session: Session, todo_id, user_id):
+    return (
+        session.query(Todos)
+        .filter(Todos.id == todo_id)
+        .filter(Todos.user_id == user_id)
+        .filter(Todos.deleted_at.is_(None))
+        .limit(1)
+        ._statement_20()
+    )
+
+
+def legacy_user(session: Session, user_id):
+    return session.query(Users).filter(Users.id == user_id).limit(1)._statement_20()
+
+
+def legacy_list(user_id, search):
+    return (
+        select(Todos)
+        .where(Todos.user_id == user_id, Todos.deleted_at.is_(None))
+        .where(
+            Todos.title.ilike(f"%{search}%") | Todos.description.ilike(f"%{search}%")
+        )
+        .order_by(Todos.priority.desc(), Todos.id.desc())
+        .limit(51)
+    )
+
+
+def prebuilt_list(user_id, search):
+    todo_list_params(user_id, search=search, limit=50)
+    return todo_list_statement(_KEYS, by_search=True, limited=True)
+
+
+def _time(build, cache: CompiledCache, iterations: int) -> list[float]:
+    timings = []
+    for i in range(iterations):
+        started = time.perf_counter_ns()
+        cache.compile(build(i))
+        timings.append((time.perf_counter_ns() - started) / 1000)
+    return timings
+
+
+def main(iterations: int = 20000) -> None:
+    session = Session()
+    ids = [uuid.uuid4() for _ in range(64)]
+
+    cases = {
+        "todo by id, db.query": lambda i: legacy_todo(session, ids[i % 64], ids[0]),
+        "todo by id, prebuilt": lambda i: _todo_by_id,
+        "user by id, db.query": lambda i: legacy_user(session, ids[i % 64]),
+        "user by id, prebuilt": lambda i: _user_by_id,
+        "todo list, per call": lambda i: legacy_list(ids[i % 64], f"term{i % 8}"),
+        "todo list, prebuilt": lambda i: prebuilt_list(ids[i % 64], f"term{i % 8}"),
+    }
+
+    print(f"{'case':<24}{'p50 us':>10}{'p99 us':>10}{'cold us':>10}{'hit ratio':>11}")
+    for name, build in cases.items():
+        started = time.perf_counter_ns()
+        build(0).compile(dialect=_DIALECT)
+        cold = (time.perf_counter_ns() - started) / 1000
+
+        cache = CompiledCache()
+        _time(build, cache, 1000)
+        timings = sorted(_time(build, cache, iterations))
+        lookups = cache.hits + cache.misses
+        print(
+            f"{name:<24}"
+            f"{statistics.median(timings):>10.1f}"
+            f"{timings[int(len(timings) * 0.99)]:>10.1f}"
+            f"{cold:>10.1f}"
+            f"{cache.hits / lookups:>11.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
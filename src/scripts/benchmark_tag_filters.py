@@ -0,0 +1,128 @@
+"""Tag filter benchmark on a large seeded dataset.
+
+Usage: python -m src.scripts.benchmark_tag_filters [todos]
+
+Seeds `todos` rows (default 1,000,000) over 200 throwaway users inside one
+transaction that is rolled back at the end, with tags skewed so some are
+common and some rare. For one user, it runs the tags_any / tags_all list
+statements from src/todos/service.py and reports EXPLAIN ANALYZE execution
+times. Each query runs once with the (user_id, tags) GIN index and once with
+bitmap scans disabled, the only scan type a GIN index supports, so the
+baseline is the user's sort index with the tag test as a filter.
+"""
+
+import json
+import statistics
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import psycopg2
+
+from src.database.dbcore import SessionLocal
+from src.enums.todos import TodoCategory
+from src.todos.service import todo_list_query
+from src.todos.sorting import parse_sort_spec
+
+_DIALECT = psycopg2.dialect(paramstyle="named")
+
+USERS = 200
+RUNS = 5
+
+CASES = {
+    "any common": {"tags_any": [TodoCategory.WORK]},
+    "any rare": {"tags_any": [TodoCategory.OTHER]},
+    "any two rare": {"tags_any": [TodoCategory.HOBBY, TodoCategory.OTHER]},
+    "all two": {"tags_all": [TodoCategory.WORK, TodoCategory.PERSONAL]},
+    "all rare": {"tags_all": [TodoCategory.WORK, TodoCategory.OTHER]},
+    "any + all": {
+        "tags_any": [TodoCategory.STUDY, TodoCategory.FITNESS],
+        "tags_all": [TodoCategory.WORK],
+    },
+}
+
+
+def _seed(conn, todos: int) -> None:
+    conn.execute(
+        text(
+            "INSERT INTO users (id, email, username, password) "
+            "SELECT gen_random_uuid(), 'tagbench' || g || '@example.com', "
+            "'tagbench_' || g, 'x' FROM generate_series(1, :users) g"
+        ),
+        {"users": USERS},
+    )
+    # Tag k of the enum is on roughly 40% / k of the todos besides the category.
+    conn.execute(
+        text(
+            "WITH bench_users AS ("
+            "  SELECT id, row_number() OVER (ORDER BY id) - 1 AS n FROM users"
+            "  WHERE username LIKE 'tagbench\\_%'"
+            "), seeded AS ("
+            "  SELECT g, (enum_range(NULL::todo_category))[1 + g % 8] AS category"
+            "  FROM generate_series(1, :todos) g"
+            ") "
+            "INSERT INTO todos (id, user_id, title, description, categories, tags, "
+            "priority, complete) "
+            "SELECT gen_random_uuid(), u.id, 'Benchmark todo ' || s.g, "
+            "'Seeded by benchmark_tag_filters', s.category, "
+            "ARRAY(SELECT t FROM unnest(enum_range(NULL::todo_category)) "
+            "  WITH ORDINALITY AS e(t, k) "
+            "  WHERE t = s.category OR random() < 0.4 / k), "
+            "1 + s.g % 10, s.g % 3 = 0 "
+            "FROM seeded s JOIN bench_users u ON u.n = s.g % :users"
+        ),
+        {"todos": todos, "users": USERS},
+    )
+    conn.execute(text("ANALYZE users"))
+    conn.execute(text("ANALYZE todos"))
+
+
+def _explain(conn, statement) -> tuple[float, int, bool]:
+    sql = str(
+        statement.compile(dialect=_DIALECT, compile_kwargs={"literal_binds": True})
+    )
+    raw = conn.execution_options(no_parameters=True).exec_driver_sql(
+        f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"
+    )
+    plan = raw.scalar()
+    plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]
+    return (
+        plan["Execution Time"],
+        plan["Plan"]["Actual Rows"],
+        "ix_todos_tags" in json.dumps(plan["Plan"]),
+    )
+
+
+def _timed(conn, statement) -> tuple[float, int, bool]:
+    runs = [_explain(conn, statement) for _ in range(RUNS)]
+    return statistics.median(run[0] for run in runs), runs[0][1], runs[0][2]
+
+
+def main(todos: int = 1_000_000) -> None:
+    db = SessionLocal()
+    try:
+        conn = db.connection()
+        print(f"seeding {todos} todos over {USERS} users...")
+        _seed(conn, todos)
+        user_id = conn.execute(
+            text("SELECT id FROM users WHERE username = 'tagbench_1'")
+        ).scalar()
+        keys = parse_sort_spec(None, "asc")
+
+        print(f"{'case':<14}{'rows':>8}{'gin ms':>10}{'no gin ms':>11}  index used")
+        for name, filters in CASES.items():
+            statement = todo_list_query(user_id, keys, **filters)
+            with_gin, rows, used = _timed(conn, statement)
+            conn.execute(text("SET LOCAL enable_bitmapscan = off"))
+            without_gin, _, _ = _timed(conn, statement)
+            conn.execute(text("SET LOCAL enable_bitmapscan = on"))
+            print(
+                f"{name:<14}{rows:>8}{with_gin:>10.2f}{without_gin:>11.2f}  "
+                f"{'yes' if used else 'no'}"
+            )
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
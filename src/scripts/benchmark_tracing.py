@@ -0,0 +1,57 @@
+"""Overhead of the tracing instrumentation on unsampled requests.
+
+Usage: python -m src.scripts.benchmark_tracing [iterations]
+
+Every service function carries @traced and every route uses TracedRoute,
+so when a request is not sampled those cost one context variable lookup
+each. This compares a plain call with a decorated call outside a trace,
+then inside a sampled trace (spans exported to memory), and expresses the
+unsampled cost relative to a 1 ms request, well below a typical DB round
+trip.
+"""
+
+import statistics
+import sys
+import time
+
+from src.observability import tracing
+
+
+def _work(n: int) -> int:
+    return sum(range(n))
+
+
+_traced_work = tracing.traced("bench.work")(_work)
+
+
+def _time(fn, iterations: int) -> float:
+    timings = []
+    for _ in range(5):
+        started = time.perf_counter_ns()
+        for _ in range(iterations):
+            fn(10)
+        timings.append((time.perf_counter_ns() - started) / iterations)
+    return statistics.median(timings)
+
+
+def main(iterations: int = 200000) -> None:
+    plain = _time(_work, iterations)
+    unsampled = _time(_traced_work, iterations)
+
+    tracing.tracer = tracing.Tracer(
+        sample_rate=1.0, exporters=[tracing.MemoryExporter()]
+    )
+    with tracing.tracer.start_trace("bench"):
+        sampled = _time(_traced_work, iterations // 10)
+
+    overhead = unsampled - plain
+    print(f"plain call        {plain:8.1f}ns")
+    print(f"traced, unsampled {unsampled:8.1f}ns  (+{overhead:.1f}ns)")
+    print(f"traced, sampled   {sampled:8.1f}ns")
+    # A list request crosses ~5 instrumentation points: route, two service
+    # functions, validation and serialization.
+    print(f"unsampled cost per request: {overhead * 5 / 1e6:.4%} of 1ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
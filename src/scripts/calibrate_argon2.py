@@ -0,0 +1,92 @@
+"""Calibrate argon2id costs for the login latency target on this host.
+
+Usage:
+    python -m src.scripts.calibrate_argon2 [target_ms] [concurrency] [memory_budget_mib]
+
+Hashes with a grid of memory/time/parallelism settings, first alone and then
+from `concurrency` threads at once (argon2-cffi releases the GIL, so this is
+what simultaneous logins cost), and recommends the most expensive setting
+whose concurrent p95 stays under `target_ms` and whose memory for
+`concurrency` hashes in flight fits `memory_budget_mib`. Defaults: 250 ms,
+8 concurrent logins, 1024 MiB. Print the result as ARGON2_* variables.
+"""
+
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.hash import argon2
+
+MEMORY_COSTS = (19456, 32768, 47104, 65536, 131072)  # KiB
+TIME_COSTS = (1, 2, 3, 4)
+PARALLELISMS = (1, 2, 4)
+SAMPLES = 5
+PASSWORD = "Calibrate-Password-123!"
+
+
+def _timed_hash(hasher) -> float:
+    started = time.perf_counter()
+    hasher.hash(PASSWORD)
+    return (time.perf_counter() - started) * 1000
+
+
+def _measure(hasher, concurrency: int) -> tuple[float, float]:
+    single = statistics.median(_timed_hash(hasher) for _ in range(SAMPLES))
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        timings = sorted(
+            pool.map(lambda _: _timed_hash(hasher), range(concurrency * SAMPLES))
+        )
+    return single, timings[int(len(timings) * 0.95)]
+
+
+def main(
+    target_ms: float = 250, concurrency: int = 8, memory_budget_mib: int = 1024
+) -> None:
+    cpus = os.cpu_count() or 1
+    print(
+        f"target p95 {target_ms:.0f}ms, {concurrency} concurrent hashes, "
+        f"{memory_budget_mib} MiB budget, {cpus} CPUs"
+    )
+    print(
+        f"{'memory_kib':>10} {'time':>4} {'par':>3} {'single_ms':>9} "
+        f"{'p95_ms':>8} {'peak_mib':>8}"
+    )
+
+    best = None
+    for memory_cost in MEMORY_COSTS:
+        peak_mib = memory_cost * concurrency / 1024
+        if peak_mib > memory_budget_mib:
+            continue
+        for time_cost in TIME_COSTS:
+            for parallelism in (p for p in PARALLELISMS if p <= cpus):
+                hasher = argon2.using(
+                    rounds=time_cost, memory_cost=memory_cost, parallelism=parallelism
+                )
+                single, p95 = _measure(hasher, concurrency)
+                print(
+                    f"{memory_cost:>10} {time_cost:>4} {parallelism:>3} "
+                    f"{single:>9.1f} {p95:>8.1f} {peak_mib:>8.0f}"
+                )
+                if p95 > target_ms:
+                    continue
+                # Cost to an attacker scales with memory x passes; prefer the
+                # lower parallelism on ties so logins leave cores to the API.
+                score = (memory_cost * time_cost, -parallelism)
+                if best is None or score > best[0]:
+                    best = (score, memory_cost, time_cost, parallelism, p95)
+
+    if best is None:
+        raise SystemExit("No setting meets the target; raise target_ms or budget")
+
+    _, memory_cost, time_cost, parallelism, p95 = best
+    print(f"\nrecommended (p95 {p95:.1f}ms under load):")
+    print(f"ARGON2_TIME_COST={time_cost}")
+    print(f"ARGON2_MEMORY_COST={memory_cost}")
+    print(f"ARGON2_PARALLELISM={parallelism}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:4]
+    main(*(float(arg) if i == 0 else int(arg) for i, arg in enumerate(args)))
@@ -0,0 +1,138 @@
+"""Statement-count check for the create paths.
+
+Usage: python -m src.scripts.check_create_round_trips
+
+Runs create_user and new_todo inside a transaction that is rolled back at
+the end, recording every statement sent to the database. It fails unless
+each create is its existence check and user_shards directory row (users
+only), one INSERT ... RETURNING for the row, the outbox INSERT and one
+commit, and unless reading the created objects afterwards, server defaults
+included, sends nothing.
+"""
+
+import uuid
+
+from sqlalchemy import event
+
+from src.auth.schemas import Principal, RegisterUserRequest
+from src.auth.service import create_user
+from src.database.dbcore import SessionLocal, engine
+from src.enums.todos import TodoCategory
+from src.entities.todos import Todos
+from src.todos.schemas import TodoRequest
+from src.todos.service import new_todo
+
+EXPECTED = {
+    "create_user": [
+        "SELECT user_shards.email",
+        "INSERT INTO user_shards",
+        "INSERT INTO users",
+        "INSERT INTO outbox_events",
+    ],
+    "new_todo": ["INSERT INTO todos", "INSERT INTO outbox_events"],
+}
+
+
+class StatementLog:
+    def __init__(self):
+        self.statements: list[str] = []
+        self.commits = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("RELEASE SAVEPOINT"):
+            self.commits += 1
+        elif not statement.startswith("SAVEPOINT"):
+            self.statements.append(" ".join(statement.split()))
+
+    def take(self) -> tuple[list[str], int]:
+        taken = self.statements, self.commits
+        self.statements, self.commits = [], 0
+        return taken
+
+
+def _check(name: str, table: str, log: StatementLog, read_back) -> bool:
+    statements, commits = log.take()
+    # The unit of work may flush the row and its outbox event in either order.
+    matched = sorted(
+        next((prefix for prefix in EXPECTED[name] if sql.startswith(prefix)), sql)
+        for sql in statements
+    )
+    ok = (
+        commits == 1
+        and matched == sorted(EXPECTED[name])
+        and all("RETURNING" in sql for sql in statements if sql.startswith(table))
+    )
+    read_back()
+    after, _ = log.take()
+    ok = ok and not after
+    print(
+        f"{'OK  ' if ok else 'FAIL'} {name}: "
+        f"{len(statements)} statements, {commits} commits"
+    )
+    for sql in statements + [f"(after commit) {sql}" for sql in after]:
+        print(f"     {sql[:120]}")
+    return ok
+
+
+def main() -> None:
+    log = StatementLog()
+    connection = engine.connect()
+    outer = connection.begin()
+    # Service commits release a savepoint; the outer transaction is rolled back.
+    db = SessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+    # The session only holds weak references; keep the created todo alive to
+    # read it back the way new_todo's caller would have.
+    persisted = []
+    event.listen(
+        db, "pending_to_persistent", lambda session, obj: persisted.append(obj)
+    )
+    event.listen(connection, "before_cursor_execute", log)
+    failures = 0
+    try:
+        suffix = uuid.uuid4().hex[:12]
+        user = create_user(
+            db,
+            RegisterUserRequest(
+                email=f"roundtrip_{suffix}@example.com",
+                username=f"rt_{suffix}",
+                password="Roundtrip-check1!",
+            ),
+        )
+        failures += not _check(
+            "create_user",
+            "INSERT INTO users",
+            log,
+            lambda: (user.id, user.email, user.username, user.created_at),
+        )
+
+        todo = new_todo(
+            db,
+            TodoRequest(
+                title="Round trip check",
+                description="Created by check_create_round_trips",
+                categories=TodoCategory.OTHER,
+                priority=1,
+            ),
+            Principal(user_id=user.id, email=user.email),
+        )
+        created = next(
+            obj for obj in persisted if isinstance(obj, Todos) and obj.id == todo.id
+        )
+        failures += not _check(
+            "new_todo",
+            "INSERT INTO todos",
+            log,
+            lambda: (created.complete, created.created_at, created.updated_at),
+        )
+    finally:
+        event.remove(connection, "before_cursor_execute", log)
+        db.close()
+        outer.rollback()
+        connection.close()
+
+    if failures:
+        raise SystemExit(f"{failures} create paths made extra round trips")
+
+
+if __name__ == "__main__":
+    main()
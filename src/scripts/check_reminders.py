@@ -0,0 +1,134 @@
+"""Check that short-notice and moved deadlines still get their reminders.
+
+Usage: python -m src.scripts.check_reminders
+
+Runs the deadline reminder scheduler against a throwaway user inside a
+transaction that is rolled back at the end. It fails unless:
+
+- a todo due in 55 minutes gets todo.due_soon;
+- a todo created later but due sooner (30 minutes) gets it too;
+- a third sweep sends nothing new;
+- moving the first todo to 20 minutes announces it again;
+- a todo already past its deadline gets todo.overdue once.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+from src.database.dbcore import engine
+from src.entities.todos import Todos
+from src.entities.users import Users
+from src.enums.todos import TodoCategory
+from src.events.sinks import MemorySink
+from src.reminders.scheduler import DeadlineReminderScheduler
+
+
+def _todo(user_id, title: str, deadline: datetime) -> Todos:
+    return Todos(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        title=title,
+        description="Created by check_reminders",
+        categories=TodoCategory.OTHER,
+        tags=[TodoCategory.OTHER],
+        priority=1,
+        deadline=deadline,
+    )
+
+
+async def _sweep(scheduler, sink, user_id) -> list[tuple[str, str]]:
+    sink.events.clear()
+    await scheduler.sweep()
+    return sorted(
+        (event["type"], event["title"])
+        for event in sink.events
+        if event["user_id"] == str(user_id)
+    )
+
+
+async def _run(factory) -> int:
+    sink = MemorySink()
+    scheduler = DeadlineReminderScheduler(
+        sink, lead=timedelta(hours=1), session_factory=factory
+    )
+    now = datetime.now(timezone.utc)
+    user_id = uuid.uuid4()
+    suffix = user_id.hex[:12]
+
+    db = factory()
+    db.add(
+        Users(
+            id=user_id,
+            email=f"reminders_{suffix}@example.com",
+            username=f"rem_{suffix}",
+            password="x",
+        )
+    )
+    db.flush()
+    db.add(_todo(user_id, "A", now + timedelta(minutes=55)))
+    db.add(_todo(user_id, "late", now - timedelta(minutes=5)))
+    db.commit()
+
+    failures = 0
+
+    def expect(step: str, got, want) -> None:
+        nonlocal failures
+        ok = got == sorted(want)
+        failures += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {step}: {got}")
+
+    expect(
+        "first sweep",
+        await _sweep(scheduler, sink, user_id),
+        [("todo.due_soon", "A"), ("todo.overdue", "late")],
+    )
+
+    db.add(_todo(user_id, "B", now + timedelta(minutes=30)))
+    db.commit()
+    expect(
+        "short-notice todo",
+        await _sweep(scheduler, sink, user_id),
+        [("todo.due_soon", "B")],
+    )
+    expect("nothing new", await _sweep(scheduler, sink, user_id), [])
+
+    db.execute(
+        update(Todos)
+        .where(Todos.user_id == user_id, Todos.title == "A")
+        .values(deadline=now + timedelta(minutes=20))
+    )
+    db.commit()
+    expect(
+        "moved deadline",
+        await _sweep(scheduler, sink, user_id),
+        [("todo.due_soon", "A")],
+    )
+    db.close()
+    return failures
+
+
+def main() -> None:
+    connection = engine.connect()
+    outer = connection.begin()
+    # Commits release a savepoint; the outer transaction is rolled back.
+    factory = sessionmaker(
+        bind=connection,
+        join_transaction_mode="create_savepoint",
+        expire_on_commit=False,
+    )
+    try:
+        failures = asyncio.run(_run(factory))
+    finally:
+        outer.rollback()
+        connection.close()
+
+    if failures:
+        raise SystemExit(f"{failures} reminder checks failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Check that concurrent identical reads cost one execution, and never a stale one.
+
+Usage: python -m src.scripts.check_single_flight [callers]
+
+Seeds a throwaway user with a few todos and deletes it at the end. Every
+statement sent to the database is counted with a before_cursor_execute
+listener. It fails unless:
+
+- `callers` (default 50) concurrent /todos/all-todo reads through
+  SingleFlight.do send exactly the statements of one read, and all get the
+  same body;
+- a read issued after a write commits does not join a call that read the
+  list before the write, and so sees the new todo.
+"""
+
+import asyncio
+import sys
+import threading
+import uuid
+
+from sqlalchemy import delete, event
+
+from src.auth.schemas import Principal
+from src.cache.query_cache import todo_list_cache
+from src.cache.singleflight import SingleFlight
+from src.database.dbcore import SessionLocal, engine
+from src.database.routing import mark_user_write, read_key
+from src.entities.todos import Todos
+from src.entities.users import Users
+from src.enums.todos import TodoCategory
+from src.todos.service import get_user_todos_json
+
+SEED_TODOS = 20
+
+
+class QueryCount:
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.count += 1
+
+    def take(self) -> int:
+        with self._lock:
+            taken, self.count = self.count, 0
+        return taken
+
+
+def _todo(user_id, title: str) -> Todos:
+    return Todos(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        title=title,
+        description="Created by check_single_flight",
+        categories=TodoCategory.OTHER,
+        tags=[TodoCategory.OTHER],
+        priority=1,
+    )
+
+
+def _seed() -> Principal:
+    user_id = uuid.uuid4()
+    suffix = user_id.hex[:12]
+    db = SessionLocal()
+    try:
+        db.add(
+            Users(
+                id=user_id,
+                email=f"flight_{suffix}@example.com",
+                username=f"flight_{suffix}",
+                password="x",
+            )
+        )
+        db.flush()
+        db.add_all(_todo(user_id, f"Seeded todo {i}") for i in range(SEED_TODOS))
+        db.commit()
+    finally:
+        db.close()
+    return Principal(user_id=user_id)
+
+
+def _write(user: Principal, title: str) -> None:
+    # What the todos service does around a create.
+    db = SessionLocal()
+    try:
+        db.add(_todo(user.user_id, title))
+        db.commit()
+    finally:
+        db.close()
+    todo_list_cache.bump(user.user_id)
+    mark_user_write(user.user_id)
+
+
+def _key(user: Principal) -> tuple:
+    # The key /todos/all-todo builds for a request without query parameters.
+    return read_key("all-todo", user.user_id, None, "asc", *(None,) * 6)
+
+
+async def _run(user: Principal, callers: int, log: QueryCount) -> int:
+    flight = SingleFlight()
+    failures = 0
+
+    def expect(step: str, ok: bool, detail: str) -> None:
+        nonlocal failures
+        failures += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {step}: {detail}")
+
+    def read():
+        return flight.do(_key(user), get_user_todos_json, user, None, "asc", None)
+
+    # Bumping the generation makes every round miss the list cache.
+    todo_list_cache.bump(user.user_id)
+    log.take()
+    await read()
+    single = log.take()
+
+    todo_list_cache.bump(user.user_id)
+    executions = flight.executions
+    bodies = await asyncio.gather(*(read() for _ in range(callers)))
+    queries = log.take()
+    expect(
+        f"{callers} concurrent reads",
+        queries == single
+        and flight.executions - executions == 1
+        and len(set(bodies)) == 1,
+        f"{queries} statements (one read sends {single}), "
+        f"{flight.executions - executions} executions",
+    )
+
+    read_done, release = threading.Event(), threading.Event()
+
+    def held(db, *args):
+        body = get_user_todos_json(db, *args)
+        read_done.set()
+        release.wait(5)
+        return body
+
+    todo_list_cache.bump(user.user_id)
+    before = asyncio.ensure_future(
+        flight.do(_key(user), held, user, None, "asc", None)
+    )
+    await asyncio.to_thread(read_done.wait, 5)
+    await asyncio.to_thread(_write, user, "Written mid-flight")
+    executions = flight.executions
+    after = asyncio.ensure_future(read())
+    # Let the second read pick its call while the first is still in flight.
+    await asyncio.sleep(0)
+    release.set()
+    stale, fresh = await asyncio.gather(before, after)
+    expect(
+        "read after write",
+        flight.executions - executions == 1
+        and b"Written mid-flight" in fresh
+        and b"Written mid-flight" not in stale,
+        f"{flight.executions - executions} new executions, "
+        f"sees the write: {b'Written mid-flight' in fresh}",
+    )
+    return failures
+
+
+def main(callers: int = 50) -> None:
+    user = _seed()
+    log = QueryCount()
+    event.listen(engine, "before_cursor_execute", log)
+    try:
+        failures = asyncio.run(_run(user, callers, log))
+    finally:
+        event.remove(engine, "before_cursor_execute", log)
+        with engine.begin() as conn:
+            conn.execute(delete(Users).where(Users.id == user.user_id))
+
+    if failures:
+        raise SystemExit(f"{failures} single-flight checks failed")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
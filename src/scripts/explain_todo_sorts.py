@@ -0,0 +1,109 @@
+"""EXPLAIN ANALYZE check that no todo list sort spills to disk.
+
+Usage: python -m src.scripts.explain_todo_sorts [limit]
+
+Runs the list statement built by src/todos/service.py for every single-key
+sort in both directions plus a few multi-key specs, for the user with the
+most todos, first page and a follow-up keyset page. It fails if any Sort
+node used disk or an external sort method; plans that need no Sort node at
+all are answered straight from an ix_todos_sort_* index.
+"""
+
+import json
+import sys
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import psycopg2
+
+from src.database.dbcore import SessionLocal
+from src.entities.todos import TODO_SORT_EXPRESSIONS, Todos
+from src.todos.service import todo_list_query
+from src.todos.sorting import parse_sort_spec, sort_values
+
+_DIALECT = psycopg2.dialect(paramstyle="named")
+
+MULTI_KEY_SPECS = (
+    "deadline:asc,priority:desc",
+    "priority:desc,created_at:desc",
+    "title:asc,deadline:asc,created_at:desc",
+)
+
+
+def _sort_specs() -> list[str]:
+    specs = []
+    for field in TODO_SORT_EXPRESSIONS:
+        specs += [f"{field}:asc", f"{field}:desc"]
+    return specs + list(MULTI_KEY_SPECS)
+
+
+def _sort_nodes(plan: dict) -> list[dict]:
+    found = [plan] if "Sort Method" in plan else []
+    for child in plan.get("Plans", []):
+        found += _sort_nodes(child)
+    return found
+
+
+def _explain(conn, statement) -> dict:
+    sql = str(
+        statement.compile(dialect=_DIALECT, compile_kwargs={"literal_binds": True})
+    )
+    raw = conn.execution_options(no_parameters=True).exec_driver_sql(
+        f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"
+    )
+    plan = raw.scalar()
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+
+
+def main(limit: int = 50) -> None:
+    db = SessionLocal()
+    try:
+        user_id = db.execute(
+            select(Todos.user_id)
+            .where(Todos.deleted_at.is_(None))
+            .group_by(Todos.user_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        ).scalar()
+        if user_id is None:
+            raise SystemExit("No todos to inspect; seed some data first")
+
+        conn = db.connection()
+        failures = 0
+        for spec in _sort_specs():
+            keys = parse_sort_spec(spec)
+            first = todo_list_query(user_id, keys, limit=limit)
+            rows = db.execute(first).all()
+            statements = {"first": first}
+            if rows:
+                after = sort_values(keys, rows[min(len(rows), limit) - 1])
+                statements["next"] = todo_list_query(
+                    user_id, keys, after=after, limit=limit
+                )
+
+            for page, statement in statements.items():
+                sorts = _sort_nodes(_explain(conn, statement))
+                spilled = [
+                    node
+                    for node in sorts
+                    if node.get("Sort Space Type") == "Disk"
+                    or "external" in node["Sort Method"]
+                ]
+                failures += bool(spilled)
+                methods = ", ".join(
+                    f"{node['Sort Method']} ({node.get('Sort Space Used', '?')}kB "
+                    f"{node.get('Sort Space Type', '?')})"
+                    for node in sorts
+                )
+                print(
+                    f"{'FAIL' if spilled else 'OK  '} {spec} [{page}]: "
+                    f"{methods or 'index order, no sort'}"
+                )
+    finally:
+        db.close()
+
+    if failures:
+        raise SystemExit(f"{failures} sorts spilled to disk")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,112 @@
+"""Open-loop load test of the admission middleware at a multiple of capacity.
+
+Usage: python -m src.scripts.loadtest_admission [overload] [seconds]
+
+Runs in-process against a stand-in backend with a fixed capacity (a DB pool
+of CAPACITY connections, SERVICE_TIME per request) so the result does not
+depend on a database. Requests arrive as a Poisson stream at `overload` times
+capacity (default 3) from USERS callers, once straight into the backend and
+once through AdmissionMiddleware, and the script prints served/shed counts
+and latency percentiles for both. Without admission the backend queue grows
+for the whole run; with it, served latency stays near SERVICE_TIME plus the
+queue bound and the excess is shed with 503.
+"""
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+from src.middleware.admission import AdmissionMiddleware
+
+CAPACITY = 10
+SERVICE_TIME = 0.02
+USERS = 200
+
+
+def _backend():
+    pool = asyncio.Semaphore(CAPACITY)
+
+    async def app(scope, receive, send):
+        async with pool:
+            await asyncio.sleep(SERVICE_TIME * random.uniform(0.8, 1.2))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    return app
+
+
+async def _request(app, user: int, results: list) -> None:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/todos/all-todo",
+        "headers": [],
+        "client": (f"10.0.{user // 256}.{user % 256}", 0),
+    }
+    status = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    results.append((status["code"], time.perf_counter() - started))
+
+
+async def _run(app, rate: float, seconds: float) -> list:
+    results: list = []
+    tasks = []
+    next_arrival = time.perf_counter()
+    deadline = next_arrival + seconds
+    while next_arrival < deadline:
+        # Arrivals follow the schedule, not the loop: late ticks catch up.
+        while next_arrival <= time.perf_counter():
+            user = random.randrange(USERS)
+            tasks.append(asyncio.create_task(_request(app, user, results)))
+            next_arrival += random.expovariate(rate)
+        await asyncio.sleep(next_arrival - time.perf_counter())
+    await asyncio.gather(*tasks)
+    return results
+
+
+def _report(name: str, results: list) -> None:
+    served = sorted(latency * 1000 for code, latency in results if code == 200)
+    shed = sum(1 for code, _ in results if code == 503)
+    limited = sum(1 for code, _ in results if code == 429)
+    line = f"{name:<16} requests={len(results)} served={len(served)} shed={shed}"
+    if limited:
+        line += f" user_limited={limited}"
+    if served:
+        line += (
+            f" p50={statistics.median(served):.0f}ms"
+            f" p99={served[int(len(served) * 0.99)]:.0f}ms"
+            f" max={served[-1]:.0f}ms"
+        )
+    print(line)
+
+
+async def main(overload: float = 3, seconds: float = 10) -> None:
+    capacity_rps = CAPACITY / SERVICE_TIME
+    rate = capacity_rps * overload
+    print(
+        f"capacity {capacity_rps:.0f} rps, offered {rate:.0f} rps "
+        f"({overload:g}x) for {seconds:g}s"
+    )
+
+    _report("no admission", await _run(_backend(), rate, seconds))
+
+    admission = AdmissionMiddleware(
+        _backend(), read_limit=CAPACITY, read_target_ms=SERVICE_TIME * 2000
+    )
+    _report("admission", await _run(admission, rate, seconds))
+    print(f"pool: {admission.stats()['read']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(float(arg) for arg in sys.argv[1:3])))
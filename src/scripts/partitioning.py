@@ -0,0 +1,144 @@
+"""Partition pruning check and lookup benchmark for the todos table.
+
+Usage:
+    python -m src.scripts.partitioning verify
+    python -m src.scripts.partitioning bench [iterations]
+
+`verify` EXPLAINs every todo query shape used by the service layer for a real
+user and fails unless each plan touches exactly one todos partition. `bench`
+times list and point lookups; run it before and after the partitioning
+migration to compare.
+"""
+
+import json
+import random
+import statistics
+import sys
+import time
+
+from sqlalchemy import and_, select
+from sqlalchemy.dialects.postgresql import psycopg2
+
+from src.database.dbcore import SessionLocal
+from src.entities.todos import Todos, todo_partition_names
+from src.enums.todos import TodoCategory
+from src.todos.service import todo_list_query
+from src.todos.sorting import parse_sort_spec
+
+_DIALECT = psycopg2.dialect(paramstyle="named")
+
+
+def _service_queries(user_id, todo_id) -> dict:
+    """The statements issued by src/todos/service.py, one per filter shape."""
+
+    active = Todos.deleted_at.is_(None)
+    by_priority = parse_sort_spec(None, "asc")
+    return {
+        "list": todo_list_query(user_id, by_priority),
+        "list_category": todo_list_query(
+            user_id, parse_sort_spec("deadline:asc,priority:desc"), TodoCategory.WORK
+        ),
+        "list_search": todo_list_query(user_id, by_priority, search="todo"),
+        "list_tags": todo_list_query(
+            user_id,
+            by_priority,
+            tags_any=[TodoCategory.WORK, TodoCategory.STUDY],
+            tags_all=[TodoCategory.WORK],
+        ),
+        "list_page": todo_list_query(
+            user_id, parse_sort_spec("created_at:desc"), limit=50
+        ),
+        "single": select(Todos)
+        .where(Todos.id == todo_id)
+        .where(Todos.user_id == user_id)
+        .where(active)
+        .limit(1),
+        "update_delete": select(Todos)
+        .where(and_(Todos.id == todo_id, Todos.user_id == user_id, active))
+        .limit(1),
+    }
+
+
+def _relations(plan: dict) -> set[str]:
+    found = set()
+    if "Relation Name" in plan:
+        found.add(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found |= _relations(child)
+    return found
+
+
+def _explain(conn, statement) -> dict:
+    sql = str(
+        statement.compile(dialect=_DIALECT, compile_kwargs={"literal_binds": True})
+    )
+    raw = conn.execution_options(no_parameters=True).exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {sql}"
+    )
+    plan = raw.scalar()
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+
+
+def _sample_todo(db) -> tuple:
+    row = db.execute(select(Todos.user_id, Todos.id).limit(1)).first()
+    if row is None:
+        raise SystemExit("No todos to inspect; seed some data first")
+    return row
+
+
+def verify() -> None:
+    partitions = set(todo_partition_names())
+    if not partitions:
+        raise SystemExit("TODOS_PARTITION_COUNT is 0, nothing to verify")
+
+    db = SessionLocal()
+    try:
+        user_id, todo_id = _sample_todo(db)
+        conn = db.connection()
+        failures = 0
+        for name, statement in _service_queries(user_id, todo_id).items():
+            scanned = _relations(_explain(conn, statement)) & partitions
+            ok = len(scanned) == 1
+            failures += not ok
+            print(f"{'OK  ' if ok else 'FAIL'} {name}: {sorted(scanned)}")
+    finally:
+        db.close()
+
+    if failures:
+        raise SystemExit(f"{failures} queries did not prune to a single partition")
+
+
+def bench(iterations: int = 500) -> None:
+    db = SessionLocal()
+    try:
+        rows = db.execute(select(Todos.user_id, Todos.id).limit(5000)).all()
+        if not rows:
+            raise SystemExit("No todos to benchmark; seed some data first")
+
+        for name, build in (
+            ("list", lambda u, t: _service_queries(u, t)["list"]),
+            ("point", lambda u, t: _service_queries(u, t)["single"]),
+        ):
+            timings = []
+            for _ in range(iterations):
+                user_id, todo_id = random.choice(rows)
+                started = time.perf_counter()
+                db.execute(build(user_id, todo_id)).all()
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            print(
+                f"{name:<6} p50={statistics.median(timings):.2f}ms "
+                f"p95={timings[int(len(timings) * 0.95)]:.2f}ms"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "verify"
+    if command == "verify":
+        verify()
+    elif command == "bench":
+        bench(*(int(arg) for arg in sys.argv[2:3]))
+    else:
+        raise SystemExit(__doc__)
@@ -0,0 +1,197 @@
+"""Move users to the shard the hash ring assigns them, in batches.
+
+Usage:
+    python -m src.scripts.rebalance_shards plan
+    python -m src.scripts.rebalance_shards move [batch_size]
+    python -m src.scripts.rebalance_shards verify
+
+Run it after changing SHARD_URLS. `plan` counts the users whose directory
+shard differs from their ring shard. `move` relocates them batch by batch:
+
+1. Flag the batch as moving in user_shards. Workers then answer its
+   requests with 503 + Retry-After.
+2. Wait SHARD_DIRECTORY_TTL plus REBALANCE_DRAIN_SECONDS. This lets every
+   cached placement expire and in-flight requests finish.
+3. Copy the users and todos rows to the target shard with ON CONFLICT DO
+   NOTHING, so a crashed run can simply be repeated.
+4. Point the directory at the target and clear the flag.
+5. Delete the rows from the source; todos go with their user by cascade.
+
+Pending outbox events stay on the source shard and are delivered by its
+relay. `verify` lists users rows that sit on a shard other than the one
+the directory names, such as the leftovers of a run that stopped between
+steps 4 and 5.
+"""
+
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from src.database.dbcore import SessionLocal
+from src.database.sharding import SHARD_DIRECTORY_TTL, shards
+from src.entities.shards import UserShard
+from src.entities.todos import Todos
+from src.entities.users import Users
+
+REBALANCE_DRAIN_SECONDS = float(os.getenv("REBALANCE_DRAIN_SECONDS", "10"))
+SCAN_PAGE = 5000
+
+# Per-user tables in foreign-key order, with the column naming the owner.
+USER_TABLES = (
+    (Users.__table__, Users.__table__.c.id),
+    (Todos.__table__, Todos.__table__.c.user_id),
+)
+
+
+def _misplaced(batch_size: int):
+    """Batches of directory rows not on their ring shard, or left moving."""
+
+    last_id = None
+    batch = []
+    while True:
+        db = SessionLocal()
+        try:
+            query = select(UserShard.user_id, UserShard.shard, UserShard.moving)
+            if last_id is not None:
+                query = query.where(UserShard.user_id > last_id)
+            rows = db.execute(
+                query.order_by(UserShard.user_id).limit(SCAN_PAGE)
+            ).all()
+        finally:
+            db.close()
+        if not rows:
+            break
+        last_id = rows[-1].user_id
+
+        for row in rows:
+            target = shards.ring.shard_for(row.user_id)
+            if row.shard != target or row.moving:
+                batch.append((row.user_id, row.shard, target))
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+    if batch:
+        yield batch
+
+
+def plan() -> None:
+    moves = Counter(
+        (source, target)
+        for batch in _misplaced(SCAN_PAGE)
+        for _, source, target in batch
+        if source != target
+    )
+    if not moves:
+        print("Every user is on its ring shard")
+        return
+    for (source, target), count in sorted(moves.items()):
+        known = source in shards.engines
+        print(f"{source} -> {target}: {count}{'' if known else ' (unknown source)'}")
+
+
+def _copy(source: str, target: str, user_ids: list) -> dict[str, int]:
+    copied = {}
+    with shards.engines[source].connect() as src, shards.engines[target].begin() as dst:
+        for table, owner in USER_TABLES:
+            rows = src.execute(select(table).where(owner.in_(user_ids))).mappings()
+            rows = [dict(row) for row in rows]
+            if rows:
+                dst.execute(insert(table).on_conflict_do_nothing(), rows)
+            copied[table.name] = len(rows)
+    return copied
+
+
+def _set_directory(values: dict, user_ids: list) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(UserShard).where(UserShard.user_id.in_(user_ids)).values(**values)
+        )
+        db.commit()
+    finally:
+        db.close()
+    for user_id in user_ids:
+        shards.forget(user_id)
+
+
+def move(batch_size: int = 100) -> None:
+    if not shards.sharded:
+        raise SystemExit("SHARD_URLS names a single database; nothing to rebalance")
+
+    moved = 0
+    for batch in _misplaced(batch_size):
+        movable = [entry for entry in batch if entry[1] in shards.engines]
+        for user_id, source, _ in batch:
+            if source not in shards.engines:
+                print(f"skipping {user_id}: shard {source} is not in SHARD_URLS")
+        if not movable:
+            continue
+
+        _set_directory({"moving": True}, [user_id for user_id, _, _ in movable])
+        time.sleep(SHARD_DIRECTORY_TTL + REBALANCE_DRAIN_SECONDS)
+
+        groups = defaultdict(list)
+        for user_id, source, target in movable:
+            groups[(source, target)].append(user_id)
+        for (source, target), user_ids in groups.items():
+            if source != target:
+                copied = _copy(source, target, user_ids)
+            _set_directory({"shard": target, "moving": False}, user_ids)
+            if source != target:
+                with shards.engines[source].begin() as conn:
+                    conn.execute(delete(Users).where(Users.id.in_(user_ids)))
+                print(f"{source} -> {target}: {len(user_ids)} users, {copied}")
+            moved += len(user_ids)
+    print(f"moved {moved} users")
+
+
+def verify() -> None:
+    strays = 0
+    for name, engine in shards.engines.items():
+        last_id = None
+        with engine.connect() as conn:
+            while True:
+                query = select(Users.id)
+                if last_id is not None:
+                    query = query.where(Users.id > last_id)
+                ids = conn.execute(query.order_by(Users.id).limit(SCAN_PAGE)).scalars()
+                ids = list(ids)
+                if not ids:
+                    break
+                last_id = ids[-1]
+
+                db = SessionLocal()
+                try:
+                    placed = dict(
+                        db.execute(
+                            select(UserShard.user_id, UserShard.shard).where(
+                                UserShard.user_id.in_(ids)
+                            )
+                        ).all()
+                    )
+                finally:
+                    db.close()
+                for user_id in ids:
+                    placed_on = placed.get(user_id)
+                    if placed_on != name:
+                        strays += 1
+                        print(f"{user_id} on {name}, directory says {placed_on}")
+    if strays:
+        raise SystemExit(f"{strays} users rows are not where the directory says")
+    print("Every users row is on its directory shard")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "plan"
+    if command == "plan":
+        plan()
+    elif command == "move":
+        move(*(int(arg) for arg in sys.argv[2:3]))
+    elif command == "verify":
+        verify()
+    else:
+        raise SystemExit(__doc__)
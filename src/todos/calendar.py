@@ -0,0 +1,169 @@
+import logging
+import os
+from datetime import datetime, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from sqlalchemy import Date, Integer, String, bindparam, cast, func, literal_column
+from sqlalchemy.future import select
+from sqlalchemy.orm import Session
+from starlette import status
+
+from src.auth.service import CurrentUser
+from src.entities.todos import TODO_LIST_COLUMNS, Todos
+from src.observability.tracing import span, traced
+from src.todos.schemas import CalendarBucket, TodoCalendar, TodoResponse
+
+load_dotenv()
+
+# Longest window one request may cover, and most todos it returns in full.
+CALENDAR_MAX_DAYS = int(os.getenv("CALENDAR_MAX_DAYS", "366"))
+CALENDAR_MAX_ITEMS = int(os.getenv("CALENDAR_MAX_ITEMS", "1000"))
+
+# Bucket name -> generate_series step; the name is also the date_trunc field.
+CALENDAR_BUCKETS = {"day": "1 day", "week": "1 week"}
+
+logger = logging.getLogger(__name__)
+
+
+def _invalid(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail
+    )
+
+
+def _window():
+    """Undeleted todos of one user due in [start, end).
+
+    A range on deadline right after the user_id equality, so both calendar
+    statements are index range scans on ix_todos_user_deadline.
+    """
+
+    return (
+        Todos.user_id == bindparam("user_id"),
+        Todos.deleted_at.is_(None),
+        Todos.deadline >= bindparam("start", type_=Todos.deadline.type),
+        Todos.deadline < bindparam("end", type_=Todos.deadline.type),
+    )
+
+
+@lru_cache(maxsize=None)
+def calendar_counts_statement(bucket: str):
+    """Todo count per local day or week of the window, empty buckets included.
+
+    Deadlines are shifted to wall-clock time in `tz` before date_trunc, so
+    buckets follow the caller's days across DST changes. generate_series
+    lists every bucket the window touches and the counts are joined onto it.
+    """
+
+    field = literal_column(f"'{bucket}'")
+    step = literal_column(f"interval '{CALENDAR_BUCKETS[bucket]}'")
+    tz = bindparam("tz", type_=String)
+
+    local = (
+        select(func.timezone(tz, Todos.deadline).label("deadline"))
+        .where(*_window())
+        .subquery("local")
+    )
+    truncated = func.date_trunc(field, local.c.deadline)
+    counts = (
+        select(truncated.label("bucket"), func.count().label("total"))
+        .group_by(truncated)
+        .subquery("counts")
+    )
+
+    # Cast so timezone() resolves to its timestamptz form with literal binds.
+    start = cast(bindparam("start", type_=Todos.deadline.type), Todos.deadline.type)
+    end = cast(bindparam("end", type_=Todos.deadline.type), Todos.deadline.type)
+    local_start, local_end = func.timezone(tz, start), func.timezone(tz, end)
+    series = (
+        func.generate_series(func.date_trunc(field, local_start), local_end, step)
+        .table_valued("bucket")
+        .render_derived(name="series")
+    )
+    return (
+        select(
+            cast(series.c.bucket, Date).label("bucket"),
+            func.coalesce(counts.c.total, 0).label("count"),
+        )
+        .select_from(series.outerjoin(counts, counts.c.bucket == series.c.bucket))
+        .where(series.c.bucket < local_end)
+        .order_by(series.c.bucket)
+    )
+
+
+# Todos of the window in deadline order, read in index order without a sort.
+calendar_items_statement = (
+    select(*TODO_LIST_COLUMNS)
+    .where(*_window())
+    .order_by(Todos.deadline, Todos.id)
+    .limit(bindparam("limit", type_=Integer))
+)
+
+
+def calendar_params(user_id, start: datetime, end: datetime, tz: str) -> dict:
+    return {"user_id": user_id, "start": start, "end": end, "tz": tz}
+
+
+def _resolve_window(
+    start: datetime, end: datetime, tz: str
+) -> tuple[datetime, datetime]:
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise _invalid(f"Unknown time zone: {tz}")
+    # A naive bound is wall-clock time in the requested zone.
+    start = start if start.tzinfo else start.replace(tzinfo=zone)
+    end = end if end.tzinfo else end.replace(tzinfo=zone)
+    if end <= start:
+        raise _invalid("`to` must be after `from`")
+    if end - start > timedelta(days=CALENDAR_MAX_DAYS):
+        raise _invalid(f"Calendar window is limited to {CALENDAR_MAX_DAYS} days")
+    return start, end
+
+
+@traced()
+def get_todo_calendar(
+    db: Session,
+    user: CurrentUser,
+    start: datetime,
+    end: datetime,
+    bucket: str = "day",
+    tz: str = "UTC",
+) -> TodoCalendar:
+
+    if not user:
+        logger.warning("Unauthorized access attempt to get_todo_calendar")
+        raise HTTPException(status_code=401, detail="Auth failed")
+    if bucket not in CALENDAR_BUCKETS:
+        raise _invalid(f"Unknown bucket: {bucket}")
+
+    start, end = _resolve_window(start, end, tz)
+    params = calendar_params(user.user_id, start, end, tz)
+
+    try:
+        buckets = db.execute(calendar_counts_statement(bucket), params).all()
+        todos = db.execute(
+            calendar_items_statement, params | {"limit": CALENDAR_MAX_ITEMS + 1}
+        ).all()
+
+        logger.info(
+            "Retrieved calendar of %s todos for user %s", len(todos), user.user_id
+        )
+        with span("todos.validate", rows=len(todos)):
+            items = [TodoResponse.model_validate(t) for t in todos]
+        return TodoCalendar(
+            bucket=bucket,
+            start=start,
+            end=end,
+            tz=tz,
+            buckets=[CalendarBucket(bucket=day, count=count) for day, count in buckets],
+            items=items[:CALENDAR_MAX_ITEMS],
+            truncated=len(items) > CALENDAR_MAX_ITEMS,
+        )
+
+    except Exception as e:
+        logger.error("Error retrieving calendar for user %s: %s", user.user_id, e)
+        raise HTTPException(status_code=500, detail="Failed to retrieve calendar")
@@ -0,0 +1,258 @@
+import csv
+import io
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Annotated, BinaryIO, Iterator
+from uuid import UUID
+
+from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.cache.query_cache import todo_list_cache
+from src.database.routing import mark_user_write
+from src.enums.todos import TodoCategory
+from src.events.outbox import record_event
+from src.todos.schemas import TodoImportError, TodoImportResponse, TodoRequest
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+STAGING_COLUMNS = (
+    "title",
+    "description",
+    "categories",
+    "priority",
+    "complete",
+    "deadline",
+)
+
+# Accept both the API values ("work") and the enum names stored by the DB ("WORK").
+_CATEGORY_LOOKUP = {c.value: c.name for c in TodoCategory} | {
+    c.name: c.name for c in TodoCategory
+}
+# The same int coercion and bounds as TodoRequest.priority: "3" and 3.0 pass,
+# 3.5 and "3.5" do not.
+_PRIORITY = TypeAdapter(Annotated[int, TodoRequest.model_fields["priority"]])
+
+_TRUE = {"true", "1", "yes", "y", "t"}
+_FALSE = {"false", "0", "no", "n", "f", ""}
+
+
+def _iter_csv(stream: BinaryIO) -> Iterator[dict]:
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8", newline=""))
+    yield from reader
+
+
+def _iter_ndjson(stream: BinaryIO) -> Iterator[dict]:
+    for line in io.TextIOWrapper(stream, encoding="utf-8"):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else {"__invalid__": line}
+
+
+def _parse_bool(value) -> bool | None:
+    if value is None:
+        return False
+    if isinstance(value, bool):
+        return value
+    normalized = str(value).strip().lower()
+    if normalized in _TRUE:
+        return True
+    if normalized in _FALSE:
+        return False
+    return None
+
+
+def _parse_deadline(value, now: datetime) -> tuple[datetime | None, str | None]:
+    if value in (None, ""):
+        return None, None
+    try:
+        deadline = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None, "deadline must be an ISO 8601 datetime"
+    if deadline.tzinfo is None:
+        deadline = deadline.replace(tzinfo=timezone.utc)
+    if deadline < now:
+        return None, "Deadline must be in the future"
+    return deadline, None
+
+
+def validate_row(row: dict, now: datetime) -> tuple[tuple | None, str | None]:
+    """Apply the TodoRequest rules to a raw row without building a model.
+
+    Returns the staging tuple for a valid row, otherwise an error message.
+    """
+
+    if "__invalid__" in row:
+        return None, "Row is not a valid JSON object"
+
+    title = row.get("title")
+    if not isinstance(title, str) or not 5 <= len(title) <= 100:
+        return None, "Title should be between 5 and 100 chars"
+
+    description = row.get("description")
+    if not isinstance(description, str) or not 20 <= len(description) <= 200:
+        return None, "Description should be between 20 and 200 chars"
+
+    category = _CATEGORY_LOOKUP.get(str(row.get("categories", "")).strip())
+    if category is None:
+        return None, "categories must be one of: " + ", ".join(
+            c.value for c in TodoCategory
+        )
+
+    # Pydantic's lax int coerces true to 1; a JSON boolean is not a priority.
+    priority = row.get("priority")
+    if isinstance(priority, bool):
+        return None, "priority must be an integer"
+    try:
+        priority = _PRIORITY.validate_python(priority)
+    except ValidationError as e:
+        if e.errors()[0]["type"] in ("greater_than", "less_than"):
+            return None, "priority must be between 1 and 10"
+        return None, "priority must be an integer"
+
+    complete = _parse_bool(row.get("complete"))
+    if complete is None:
+        return None, "complete must be a boolean"
+
+    deadline, error = _parse_deadline(row.get("deadline"), now)
+    if error:
+        return None, error
+
+    return (title, description, category, priority, complete, deadline), None
+
+
+def _copy_chunk(cursor, rows: list[tuple]) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for title, description, category, priority, complete, deadline in rows:
+        writer.writerow(
+            (
+                title,
+                description,
+                category,
+                priority,
+                "t" if complete else "f",
+                deadline.isoformat() if deadline else None,
+            )
+        )
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY todos_import_staging ({', '.join(STAGING_COLUMNS)}) "
+        "FROM STDIN WITH (FORMAT csv)",
+        buffer,
+    )
+
+
+def import_todos(
+    db: Session, user_id: UUID | str, stream: BinaryIO, file_format: str
+) -> TodoImportResponse:
+    """Stream rows into a temp staging table via COPY, then insert them at once."""
+
+    if file_format == "csv":
+        rows = _iter_csv(stream)
+    elif file_format == "ndjson":
+        rows = _iter_ndjson(stream)
+    else:
+        raise HTTPException(
+            status_code=400, detail="Unsupported import format, use csv or ndjson"
+        )
+
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    errors: list[TodoImportError] = []
+    error_count = 0
+    total = 0
+    chunk: list[tuple] = []
+
+    try:
+        cursor = db.connection().connection.cursor()
+        cursor.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS todos_import_staging ("
+            "title varchar(100) NOT NULL, "
+            "description varchar(200) NOT NULL, "
+            "categories text NOT NULL, "
+            "priority integer NOT NULL, "
+            "complete boolean NOT NULL, "
+            "deadline timestamptz"
+            ") ON COMMIT DROP"
+        )
+
+        for line_number, row in enumerate(rows, start=1):
+            total += 1
+            staged, error = validate_row(row, now)
+            if error:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append(TodoImportError(row=line_number, error=error))
+                continue
+
+            chunk.append(staged)
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                _copy_chunk(cursor, chunk)
+                chunk.clear()
+
+        if chunk:
+            _copy_chunk(cursor, chunk)
+
+        result = db.execute(
+            text(
+                "INSERT INTO todos "
+                "(id, user_id, title, description, categories, tags, priority, "
+                "complete, deadline) "
+                "SELECT gen_random_uuid(), CAST(:user_id AS uuid), title, description, "
+                "categories::todo_category, ARRAY[categories::todo_category], "
+                "priority, complete, deadline "
+                "FROM todos_import_staging"
+            ),
+            {"user_id": user_id},
+        )
+        imported = result.rowcount
+        # One summary event instead of one per imported row.
+        record_event(
+            db,
+            "todo.imported",
+            "user",
+            user_id,
+            {"user_id": user_id, "imported": imported},
+        )
+        db.commit()
+        todo_list_cache.bump(user_id)
+        mark_user_write(user_id)
+    except HTTPException:
+        raise
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Import file must be UTF-8")
+    except Exception as e:
+        db.rollback()
+        logger.error("Error importing todos for user %s: %s", user_id, e)
+        raise HTTPException(status_code=500, detail="Failed to import todos")
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Imported %d of %d todos for user %s in %.2fs",
+        imported,
+        total,
+        user_id,
+        elapsed,
+    )
+    return TodoImportResponse(
+        total_rows=total,
+        imported=imported,
+        failed=error_count,
+        errors=errors,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(total / elapsed, 1) if elapsed else 0.0,
+    )
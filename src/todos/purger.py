@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, time, timedelta, timezone
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from src.database.dbcore import SessionLocal
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+TODO_PURGE_ENABLED = os.getenv("TODO_PURGE_ENABLED", "true").lower() == "true"
+# Off-peak window in UTC, "HH:MM-HH:MM"; it may wrap past midnight.
+TODO_PURGE_WINDOW = os.getenv("TODO_PURGE_WINDOW", "01:00-05:00")
+TODO_PURGE_RETENTION_HOURS = int(os.getenv("TODO_PURGE_RETENTION_HOURS", "24"))
+TODO_PURGE_BATCH_SIZE = int(os.getenv("TODO_PURGE_BATCH_SIZE", "1000"))
+TODO_PURGE_MAX_BATCHES_PER_SECOND = float(
+    os.getenv("TODO_PURGE_MAX_BATCHES_PER_SECOND", "2")
+)
+TODO_PURGE_MAX_REPLICATION_LAG = float(
+    os.getenv("TODO_PURGE_MAX_REPLICATION_LAG", "5")
+)
+TODO_PURGE_CHECK_INTERVAL = float(os.getenv("TODO_PURGE_CHECK_INTERVAL", "300"))
+
+
+def _parse_window(window: str) -> tuple[time, time]:
+    start, end = window.split("-")
+    return time.fromisoformat(start.strip()), time.fromisoformat(end.strip())
+
+
+def in_window(now: datetime, window: tuple[time, time]) -> bool:
+    start, end = window
+    current = now.time()
+    if start <= end:
+        return start <= current < end
+    return current >= start or current < end
+
+
+def replication_lag_seconds(session_factory: sessionmaker = SessionLocal) -> float:
+    """Worst replay lag reported by the primary; 0 when there are no replicas."""
+
+    db = session_factory()
+    try:
+        lag = db.execute(
+            text(
+                "SELECT COALESCE(EXTRACT(EPOCH FROM max(replay_lag)), 0) "
+                "FROM pg_stat_replication"
+            )
+        ).scalar()
+        return float(lag or 0)
+    finally:
+        db.close()
+
+
+def purge_batch(
+    cutoff: datetime, batch_size: int, session_factory: sessionmaker = SessionLocal
+) -> int:
+    """Hard-delete one batch of soft-deleted todos older than `cutoff`.
+
+    SKIP LOCKED lets purgers on several workers take disjoint batches.
+    """
+
+    db = session_factory()
+    try:
+        deleted = db.execute(
+            text(
+                "DELETE FROM todos WHERE (id, user_id) IN ("
+                "  SELECT id, user_id FROM todos"
+                "  WHERE deleted_at IS NOT NULL AND deleted_at < :cutoff"
+                "  LIMIT :batch_size FOR UPDATE SKIP LOCKED"
+                ")"
+            ),
+            {"cutoff": cutoff, "batch_size": batch_size},
+        ).rowcount
+        db.commit()
+        return deleted
+    finally:
+        db.close()
+
+
+class SoftDeletePurger:
+    """Hard-deletes soft-deleted todos in bounded, rate-limited batches.
+
+    Runs only inside the off-peak window and backs off while replicas lag
+    more than TODO_PURGE_MAX_REPLICATION_LAG seconds behind.
+    """
+
+    def __init__(
+        self,
+        window: str = TODO_PURGE_WINDOW,
+        retention: timedelta = timedelta(hours=TODO_PURGE_RETENTION_HOURS),
+        batch_size: int = TODO_PURGE_BATCH_SIZE,
+        max_batches_per_second: float = TODO_PURGE_MAX_BATCHES_PER_SECOND,
+        max_replication_lag: float = TODO_PURGE_MAX_REPLICATION_LAG,
+        check_interval: float = TODO_PURGE_CHECK_INTERVAL,
+        session_factory: sessionmaker = SessionLocal,
+    ):
+        self.window = _parse_window(window)
+        self.retention = retention
+        self.batch_size = batch_size
+        self.batch_pause = 1 / max_batches_per_second
+        self.max_replication_lag = max_replication_lag
+        self.check_interval = check_interval
+        self.session_factory = session_factory
+        self.purged = 0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Soft-delete purge failed: %s", e)
+            await asyncio.sleep(self.check_interval)
+
+    async def _replication_ok(self) -> bool:
+        try:
+            lag = await asyncio.to_thread(
+                replication_lag_seconds, self.session_factory
+            )
+        except Exception as e:
+            logger.debug("Could not read replication lag: %s", e)
+            return True
+        if lag > self.max_replication_lag:
+            logger.info("Pausing todo purge, replication lag is %.1fs", lag)
+            return False
+        return True
+
+    async def run_once(self) -> int:
+        purged = 0
+        while in_window(datetime.now(timezone.utc), self.window):
+            if not await self._replication_ok():
+                await asyncio.sleep(self.check_interval)
+                continue
+
+            cutoff = datetime.now(timezone.utc) - self.retention
+            deleted = await asyncio.to_thread(
+                purge_batch, cutoff, self.batch_size, self.session_factory
+            )
+            purged += deleted
+            if deleted < self.batch_size:
+                break
+            await asyncio.sleep(self.batch_pause)
+
+        if purged:
+            self.purged += purged
+            logger.info("Purged %d soft-deleted todos", purged)
+        return purged
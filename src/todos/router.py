@@ -1,51 +1,194 @@
-from fastapi import APIRouter, Query
+from datetime import datetime
+
+from fastapi import APIRouter, File, HTTPException, Query, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from src.todos.service import (
     new_todo,
-    get_user_todos,
+    get_user_todos_json,
+    normalize_tags,
     get_todo_by_id,
     delete_todo_by_id,
     update_todo_by_id,
+    restore_todo_by_id,
 )
+from src.todos.calendar import get_todo_calendar
+from src.todos.importer import import_todos
 from src.enums.todos import TodoCategory
-from src.dependency import DbSession
-from src.todos.schemas import TodoRequest
-from src.auth.service import CurrentUser
+from src.dependency import Coalescer, ShardDbSession
+from src.todos.schemas import TodoCalendar, TodoRequest, TodoImportResponse
+from src.auth.service import AdminUser, CurrentUser
+from src.cache.query_cache import todo_list_cache
+from src.database.dbcore import engine
+from src.database.routing import read_key, read_session_for, replicas
+from src.idempotency.service import (
+    IdempotencyKeyHeader,
+    request_fingerprint,
+    run_idempotent,
+)
+from src.observability.sql_cache import statement_cache
+from src.observability.tracing import TracedRoute
 
-router = APIRouter(prefix="/todos", tags=["todos"])
+router = APIRouter(prefix="/todos", tags=["todos"], route_class=TracedRoute)
 
 
 @router.get("/all-todo")
 async def get_all_todos(
-    db: DbSession,
+    flight: Coalescer,
     current_user: CurrentUser,
     category: TodoCategory | None = Query(None),
-    sort_order: str = Query("asc", description="Sort by priority: 'asc' or 'desc'"),
+    sort_order: str = Query(
+        "asc",
+        pattern="(?i)^(asc|desc)$",
+        description="Priority direction when `sort` is omitted: 'asc' or 'desc'",
+    ),
     search: str | None = Query(
         None, description="Search todos by title or description"
     ),
+    sort: str | None = Query(
+        None,
+        max_length=100,
+        description="Up to 3 keys, e.g. 'deadline:asc,priority:desc'; "
+        "fields: priority, deadline, created_at, title",
+    ),
+    limit: int | None = Query(
+        None, ge=1, le=500, description="Page size; returns {items, next_cursor}"
+    ),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    tags_any: list[TodoCategory] | None = Query(
+        None, description="Todos with at least one of these tags"
+    ),
+    tags_all: list[TodoCategory] | None = Query(
+        None, description="Todos with every one of these tags"
+    ),
 ):
-    return get_user_todos(db, current_user, category, sort_order, search)
+    tags_any, tags_all = normalize_tags(tags_any), normalize_tags(tags_all)
+    body = await flight.do(
+        read_key(
+            "all-todo",
+            current_user.user_id,
+            category,
+            sort_order.lower(),
+            search,
+            sort,
+            limit,
+            cursor,
+            tags_any,
+            tags_all,
+        ),
+        get_user_todos_json,
+        current_user,
+        category,
+        sort_order,
+        search,
+        sort,
+        limit,
+        cursor,
+        tags_any,
+        tags_all,
+        session_factory=read_session_for(current_user.user_id),
+    )
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/calendar", response_model=TodoCalendar)
+async def get_calendar(
+    flight: Coalescer,
+    current_user: CurrentUser,
+    start: datetime = Query(
+        ..., alias="from", description="Window start, inclusive; naive means `tz`"
+    ),
+    end: datetime = Query(..., alias="to", description="Window end, exclusive"),
+    bucket: str = Query("day", pattern="^(day|week)$"),
+    tz: str = Query("UTC", max_length=64, description="IANA zone for the buckets"),
+):
+    return await flight.do(
+        read_key("calendar", current_user.user_id, start, end, bucket, tz),
+        get_todo_calendar,
+        current_user,
+        start,
+        end,
+        bucket,
+        tz,
+        session_factory=read_session_for(current_user.user_id),
+    )
+
+
+@router.get("/cache-stats")
+async def get_cache_stats(admin: AdminUser):
+    return todo_list_cache.stats() | {
+        "statement_cache": statement_cache.stats(engine, *replicas.engines)
+    }
 
 
 @router.get("/single-todo/{todo_id}")
-async def get_single_todo(db: DbSession, current_user: CurrentUser, todo_id: str):
-    return get_todo_by_id(db, current_user, todo_id)
+async def get_single_todo(flight: Coalescer, current_user: CurrentUser, todo_id: str):
+    return await flight.do(
+        read_key("single-todo", current_user.user_id, todo_id),
+        get_todo_by_id,
+        current_user,
+        todo_id,
+        session_factory=read_session_for(current_user.user_id),
+    )
 
 
 @router.post("/create-todo")
 async def create_todo(
-    db: DbSession, todo_request: TodoRequest, current_user: CurrentUser
+    db: ShardDbSession,
+    todo_request: TodoRequest,
+    current_user: CurrentUser,
+    idempotency_key: IdempotencyKeyHeader = None,
+):
+    if idempotency_key is None:
+        return await run_in_threadpool(new_todo, db, todo_request, current_user)
+    return await run_idempotent(
+        f"todos.create:{current_user.user_id}",
+        idempotency_key,
+        request_fingerprint(todo_request),
+        lambda: new_todo(db, todo_request, current_user),
+        db=db,
+    )
+
+
+@router.post("/import", response_model=TodoImportResponse)
+async def import_todo_file(
+    db: ShardDbSession,
+    current_user: CurrentUser,
+    file: UploadFile = File(...),
+    file_format: str | None = Query(
+        None, alias="format", description="'csv' or 'ndjson', inferred if omitted"
+    ),
 ):
-    return new_todo(db, todo_request, current_user)
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Auth failed")
+
+    if file_format is None:
+        name = (file.filename or "").lower()
+        is_ndjson = name.endswith((".ndjson", ".jsonl")) or (
+            file.content_type or ""
+        ).endswith(("ndjson", "jsonl"))
+        file_format = "ndjson" if is_ndjson else "csv"
+
+    # Parsing plus COPY runs for seconds on big files; keep it off the event loop.
+    return await run_in_threadpool(
+        import_todos, db, current_user.user_id, file.file, file_format.lower()
+    )
 
 
 @router.patch("/update-todo/{todo_id}")
 async def update_todo(
-    db: DbSession, todo_request: TodoRequest, current_user: CurrentUser, todo_id: str
+    db: ShardDbSession,
+    todo_request: TodoRequest,
+    current_user: CurrentUser,
+    todo_id: str,
 ):
     return update_todo_by_id(db, todo_request, current_user, todo_id)
 
 
 @router.delete("/delete-todo/{todo_id}")
-async def delete_todo(db: DbSession, current_user: CurrentUser, todo_id: str):
+async def delete_todo(db: ShardDbSession, current_user: CurrentUser, todo_id: str):
     return delete_todo_by_id(db, current_user, todo_id)
+
+
+@router.patch("/restore-todo/{todo_id}")
+async def restore_todo(db: ShardDbSession, current_user: CurrentUser, todo_id: str):
+    return restore_todo_by_id(db, current_user, todo_id)
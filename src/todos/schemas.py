@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from src.enums.todos import TodoCategory
 from uuid import UUID
 
@@ -16,6 +16,11 @@ class TodoRequest(BaseModel):
         description="Description could be up to 200 chars",
     )
     categories: TodoCategory
+    tags: list[TodoCategory] | None = Field(
+        default=None,
+        max_length=len(TodoCategory),
+        description="Extra tags; the category is always one of them",
+    )
     priority: int = Field(gt=0, lt=11)
     complete: bool | None = None
     deadline: datetime | None = None
@@ -32,6 +37,7 @@ class UpdateTodoRequest(BaseModel):
     title: str | None = None
     description: str | None = None
     categories: TodoCategory | None = None
+    tags: list[TodoCategory] | None = Field(default=None, max_length=len(TodoCategory))
     priority: int | None = Field(default=None, gt=0, lt=11)
     complete: bool | None = None
     deadline: datetime | None = None
@@ -42,8 +48,43 @@ class TodoResponse(BaseModel):
     title: str
     description: str
     categories: TodoCategory
+    tags: list[TodoCategory] = []
     priority: int
     complete: bool
-    deadline: datetime
+    deadline: datetime | None = None
 
     model_config = {"from_attributes": True}
+
+
+class TodoPage(BaseModel):
+    items: list[TodoResponse]
+    next_cursor: str | None = None
+
+
+class CalendarBucket(BaseModel):
+    bucket: date
+    count: int
+
+
+class TodoCalendar(BaseModel):
+    bucket: str
+    start: datetime
+    end: datetime
+    tz: str
+    buckets: list[CalendarBucket]
+    items: list[TodoResponse]
+    truncated: bool = False
+
+
+class TodoImportError(BaseModel):
+    row: int
+    error: str
+
+
+class TodoImportResponse(BaseModel):
+    total_rows: int
+    imported: int
+    failed: int
+    errors: list[TodoImportError]
+    elapsed_seconds: float
+    rows_per_second: float
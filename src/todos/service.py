@@ -1,196 +1,490 @@
 from fastapi import HTTPException
-from src.todos.schemas import TodoRequest, TodoResponse, UpdateTodoRequest
-from src.entities.todos import Todos
+from src.todos.schemas import TodoRequest, TodoResponse, TodoPage, UpdateTodoRequest
+from src.todos.sorting import (
+    SortKey,
+    decode_cursor,
+    encode_cursor,
+    keyset_params,
+    keyset_predicate,
+    order_by_clauses,
+    parse_sort_spec,
+    sort_values,
+)
+from src.entities.todos import Todos, TODO_LIST_COLUMNS
 from src.auth.service import CurrentUser
 from src.enums.todos import TodoCategory
 from sqlalchemy.future import select
-from sqlalchemy import asc, desc, and_
+from sqlalchemy import Integer, asc, bindparam, cast, desc, and_, func
 import logging
+from src.observability.tracing import span, traced
 from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
+from src.cache.query_cache import todo_list_cache
+from src.database.routing import mark_user_write
+from src.events.outbox import record_event
+import uuid
+import os
+from functools import lru_cache
+from dotenv import load_dotenv
 
+load_dotenv()
 
+SOFT_DELETE_ENABLED = os.getenv("SOFT_DELETE_ENABLED", "true").lower() == "true"
+
+logger = logging.getLogger(__name__)
+
+_todo_list_adapter = TypeAdapter(list[TodoResponse])
+
+
+def normalize_tags(tags) -> tuple[TodoCategory, ...] | None:
+    """A tag filter as a sorted, duplicate-free tuple; None when empty."""
+
+    if not tags:
+        return None
+    return tuple(sorted(set(tags), key=lambda tag: tag.value))
+
+
+def todo_tags(category: TodoCategory, tags=None) -> list[TodoCategory]:
+    """Stored tags of a todo: its category plus any extra tags."""
+
+    return list(normalize_tags([category, *(tags or ())]))
+
+
+@lru_cache(maxsize=4096)
+def todo_list_statement(
+    keys: tuple[SortKey, ...],
+    by_category: bool = False,
+    by_search: bool = False,
+    paged: bool = False,
+    limited: bool = False,
+    by_tags_any: bool = False,
+    by_tags_all: bool = False,
+):
+    """The list statement for one filter/sort combination, built once.
+
+    Every value is a bound parameter (see todo_list_params), so each variant
+    compiles once per engine and then hits SQLAlchemy's compiled cache.
+    """
+
+    statement = select(*TODO_LIST_COLUMNS).where(
+        Todos.user_id == bindparam("user_id"), Todos.deleted_at.is_(None)
+    )
+    if by_category:
+        statement = statement.where(Todos.categories == bindparam("category"))
+    if by_search:
+        statement = statement.where(
+            Todos.title.ilike(bindparam("search"))
+            | Todos.description.ilike(bindparam("search"))
+        )
+    # Both are answered from the (user_id, tags) GIN index. The casts keep the
+    # arrays typed as todo_category[] when rendered with literal binds.
+    if by_tags_any:
+        tags_any = cast(bindparam("tags_any", type_=Todos.tags.type), Todos.tags.type)
+        statement = statement.where(Todos.tags.overlap(tags_any))
+    if by_tags_all:
+        tags_all = cast(bindparam("tags_all", type_=Todos.tags.type), Todos.tags.type)
+        statement = statement.where(Todos.tags.contains(tags_all))
+    if paged:
+        statement = statement.where(keyset_predicate(keys))
+    statement = statement.order_by(*order_by_clauses(keys))
+    if limited:
+        statement = statement.limit(bindparam("limit", type_=Integer))
+    return statement
+
+
+def todo_list_params(
+    user_id,
+    category: TodoCategory | None = None,
+    search: str | None = None,
+    after: list | None = None,
+    limit: int | None = None,
+    tags_any: tuple[TodoCategory, ...] | None = None,
+    tags_all: tuple[TodoCategory, ...] | None = None,
+) -> dict:
+    """Bind values for todo_list_statement.
+
+    Fetches limit + 1 rows so the caller can tell whether a next page exists.
+    """
+
+    params = {"user_id": user_id}
+    if category:
+        params["category"] = category
+    if search:
+        params["search"] = f"%{search}%"
+    if tags_any:
+        params["tags_any"] = list(tags_any)
+    if tags_all:
+        params["tags_all"] = list(tags_all)
+    if after is not None:
+        params.update(keyset_params(after))
+    if limit is not None:
+        params["limit"] = limit + 1
+    return params
+
+
+def todo_list_query(
+    user_id,
+    keys: tuple[SortKey, ...],
+    category: TodoCategory | None = None,
+    search: str | None = None,
+    after: list | None = None,
+    limit: int | None = None,
+    tags_any=None,
+    tags_all=None,
+):
+    """The list statement with its values bound, for EXPLAIN and scripts."""
+
+    tags_any, tags_all = normalize_tags(tags_any), normalize_tags(tags_all)
+    statement = todo_list_statement(
+        keys,
+        bool(category),
+        bool(search),
+        after is not None,
+        limit is not None,
+        bool(tags_any),
+        bool(tags_all),
+    )
+    return statement.params(
+        todo_list_params(user_id, category, search, after, limit, tags_any, tags_all)
+    )
+
+
+@traced()
 def get_user_todos(
     db: Session,
     user: CurrentUser,
     category: TodoCategory | None,
     sort_order: str,
     search: str | None,
-) -> list[TodoResponse]:
+    sort: str | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+    tags_any=None,
+    tags_all=None,
+) -> TodoPage:
 
     if not user:
-        logging.warning("Unauthorized access attempt to get_user_todos")
+        logger.warning("Unauthorized access attempt to get_user_todos")
         raise HTTPException(status_code=401, detail="Auth failed")
 
+    keys = parse_sort_spec(sort, sort_order)
+    after = decode_cursor(keys, cursor) if cursor else None
+    tags_any, tags_all = normalize_tags(tags_any), normalize_tags(tags_all)
+
     try:
-        todos_query = db.query(Todos).filter(Todos.user_id == user.user_id)
+        statement = todo_list_statement(
+            keys,
+            bool(category),
+            bool(search),
+            after is not None,
+            limit is not None,
+            bool(tags_any),
+            bool(tags_all),
+        )
+        todos = db.execute(
+            statement,
+            todo_list_params(
+                user.user_id, category, search, after, limit, tags_any, tags_all
+            ),
+        ).all()
+
+        next_cursor = None
+        if limit is not None and len(todos) > limit:
+            todos = todos[:limit]
+            next_cursor = encode_cursor(keys, sort_values(keys, todos[-1]))
+
+        logger.info("Retrieved %s todos for user %s", len(todos), user.user_id)
+        with span("todos.validate", rows=len(todos)):
+            items = [TodoResponse.model_validate(t) for t in todos]
+        return TodoPage(items=items, next_cursor=next_cursor)
 
-        if category:
-            todos_query = todos_query.filter(Todos.categories == category)
+    except Exception as e:
+        logger.error("Error retrieving todos for user %s: %s", user.user_id, e)
+        raise HTTPException(status_code=500, detail="Failed to retrieve todos")
 
-        if search:
-            search_pattern = f"%{search}%"
-            todos_query = todos_query.filter(
-                (Todos.title.ilike(search_pattern))
-                | (Todos.description.ilike(search_pattern))
-            )
 
-        if sort_order.lower() == "asc":
-            todos_query = todos_query.order_by(Todos.priority.asc())
-        else:
-            todos_query = todos_query.order_by(Todos.priority.desc())
-
-        todos = todos_query.all()
-
-        logging.info(f"Retrieved {len(todos)} todos for user {user.user_id}")
-        return [
-            TodoResponse.model_validate(
-                {
-                    "id": t.id,
-                    "title": t.title,
-                    "description": t.description,
-                    "categories": t.categories,
-                    "priority": t.priority,
-                    "complete": t.complete,
-                    "deadline": t.deadline,
-                }
-            )
-            for t in todos
-        ]
+@traced()
+def get_user_todos_json(
+    db: Session,
+    user: CurrentUser,
+    category: TodoCategory | None,
+    sort_order: str,
+    search: str | None,
+    sort: str | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+    tags_any=None,
+    tags_all=None,
+) -> bytes:
+    """Cached JSON for a todo list: a bare array, or a TodoPage when `limit` is set."""
+
+    if not user:
+        logger.warning("Unauthorized access attempt to get_user_todos_json")
+        raise HTTPException(status_code=401, detail="Auth failed")
+
+    keys = parse_sort_spec(sort, sort_order)
+    tags_any, tags_all = normalize_tags(tags_any), normalize_tags(tags_all)
+    params = (
+        category.value if category else None,
+        ",".join(str(key) for key in keys),
+        search.lower() if search else None,
+        limit,
+        cursor,
+        tuple(tag.value for tag in tags_any or ()),
+        tuple(tag.value for tag in tags_all or ()),
+    )
+    cache_key = todo_list_cache.key(user.user_id, params)
+
+    body = todo_list_cache.get(cache_key)
+    if body is None:
+        page = get_user_todos(
+            db,
+            user,
+            category,
+            sort_order,
+            search,
+            sort,
+            limit,
+            cursor,
+            tags_any,
+            tags_all,
+        )
+        with span("todos.serialize", rows=len(page.items)):
+            if limit is None:
+                body = _todo_list_adapter.dump_json(page.items)
+            else:
+                body = page.model_dump_json().encode("utf-8")
+        todo_list_cache.set(cache_key, body)
+
+    return body
 
-    except Exception as e:
-        logging.error(f"Error retrieving todos for user {user.user_id}: {e}")
-        raise HTTPException(status_code=500, detail="Failed to retrieve todos")
 
+_todo_by_id = (
+    select(*TODO_LIST_COLUMNS)
+    .where(
+        Todos.id == bindparam("todo_id"),
+        Todos.user_id == bindparam("user_id"),
+        Todos.deleted_at.is_(None),
+    )
+    .limit(1)
+)
 
+
+@traced()
 def get_todo_by_id(db: Session, user: CurrentUser, todo_id: str) -> TodoResponse:
 
     if not user:
-        logging.warning("Unauthorized access attempt to get_todo_by_id")
+        logger.warning("Unauthorized access attempt to get_todo_by_id")
         raise HTTPException(status_code=401, detail="Auth failed")
 
     try:
-        todo = (
-            db.query(Todos)
-            .filter(Todos.id == todo_id)
-            .filter(Todos.user_id == user.user_id)
-            .first()
-        )
+        todo = db.execute(
+            _todo_by_id, {"todo_id": todo_id, "user_id": user.user_id}
+        ).first()
 
         if not todo:
-            logging.warning(f"Todo not found: {todo_id} for user {user.user_id}")
+            logger.warning("Todo not found: %s for user %s", todo_id, user.user_id)
             raise HTTPException(status_code=404, detail="Todo not found")
 
-        return TodoResponse.model_validate(
-            {
-                "id": todo.id,
-                "title": todo.title,
-                "description": todo.description,
-                "categories": todo.categories,
-                "priority": todo.priority,
-                "complete": todo.complete,
-                "deadline": todo.deadline,
-            }
-        )
+        return TodoResponse.model_validate(todo)
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error retrieving todo {todo_id} for user {user.user_id}: {e}")
+        logger.error(
+            "Error retrieving todo %s for user %s: %s", todo_id, user.user_id, e
+        )
         raise HTTPException(status_code=500, detail="Failed to retrieve todo")
 
 
+@traced()
 def new_todo(db: Session, todo_request: TodoRequest, user: CurrentUser) -> TodoResponse:
 
     if not user:
-        logging.warning("Unauthorized access attempt to new_todo")
+        logger.warning("Unauthorized access attempt to new_todo")
         raise HTTPException(status_code=401, detail="Auth failed")
 
     try:
         todo_data = todo_request.model_dump()
-        new_todo = Todos(**todo_data, user_id=user.user_id)
+        todo_data["tags"] = todo_tags(todo_request.categories, todo_request.tags)
+        new_todo = Todos(**todo_data, id=uuid.uuid4(), user_id=user.user_id)
 
         db.add(new_todo)
+        record_event(
+            db,
+            "todo.created",
+            "todo",
+            new_todo.id,
+            {**todo_data, "id": new_todo.id, "user_id": user.user_id},
+        )
         db.commit()
+        todo_list_cache.bump(user.user_id)
+        mark_user_write(user.user_id)
 
-        logging.info(f"Created new todo {new_todo.id} for user {user.user_id}")
-        return TodoResponse.model_validate(
-            {
-                "id": new_todo.id,
-                "title": new_todo.title,
-                "description": new_todo.description,
-                "categories": new_todo.categories,
-                "priority": new_todo.priority,
-                "complete": new_todo.complete,
-                "deadline": new_todo.deadline,
-            }
-        )
+        logger.info("Created new todo %s for user %s", new_todo.id, user.user_id)
+        # Nothing was expired by the commit, so this reads no columns back.
+        return TodoResponse.model_validate(new_todo)
     except Exception as e:
-        logging.error(f"Error creating todo for user {user.user_id}: {e}")
+        logger.error("Error creating todo for user %s: %s", user.user_id, e)
         raise HTTPException(status_code=500, detail="Failed to create todo")
 
 
+@traced()
 def update_todo_by_id(
     db: Session, todo_request: UpdateTodoRequest, user: CurrentUser, todo_id: str
 ) -> TodoResponse:
 
     if not user:
-        logging.warning("Unauthorized access attempt to update_todo_by_id")
+        logger.warning("Unauthorized access attempt to update_todo_by_id")
         raise HTTPException(status_code=401, detail="Auth failed")
 
     try:
         todo = (
             db.query(Todos)
-            .filter(and_(Todos.id == todo_id, Todos.user_id == user.user_id))
+            .filter(
+                and_(
+                    Todos.id == todo_id,
+                    Todos.user_id == user.user_id,
+                    Todos.deleted_at.is_(None),
+                )
+            )
             .first()
         )
 
         if not todo:
-            logging.warning(f"Todo not found for update: {todo_id} user {user.user_id}")
+            logger.warning(
+                "Todo not found for update: %s user %s", todo_id, user.user_id
+            )
             raise HTTPException(status_code=404, detail="Todo not found")
 
         update_data = todo_request.model_dump(exclude_unset=True)
+        if "tags" in update_data or "categories" in update_data:
+            category = update_data.get("categories") or todo.categories
+            # Without new tags, keep the extras and swap the old category out.
+            extra = update_data.get("tags")
+            if extra is None:
+                extra = [tag for tag in todo.tags if tag != todo.categories]
+            update_data["tags"] = todo_tags(category, extra)
         for key, value in update_data.items():
             setattr(todo, key, value)
 
         db.add(todo)
+        record_event(
+            db,
+            "todo.updated",
+            "todo",
+            todo.id,
+            {**update_data, "id": todo.id, "user_id": user.user_id},
+        )
         db.commit()
+        todo_list_cache.bump(user.user_id)
+        mark_user_write(user.user_id)
 
-        logging.info(f"Updated todo {todo_id} for user {user.user_id}")
+        logger.info("Updated todo %s for user %s", todo_id, user.user_id)
         return TodoResponse.model_validate(todo)
 
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error updating todo {todo_id} for user {user.user_id}: {e}")
+        logger.error("Error updating todo %s for user %s: %s", todo_id, user.user_id, e)
         raise HTTPException(status_code=500, detail="Failed to update todo")
 
 
+@traced()
 def delete_todo_by_id(db: Session, user: CurrentUser, todo_id: str) -> bool:
 
     if not user:
-        logging.warning("Unauthorized access attempt to delete_todo_by_id")
+        logger.warning("Unauthorized access attempt to delete_todo_by_id")
         raise HTTPException(status_code=401, detail="Auth failed")
 
     try:
         todo = (
             db.query(Todos)
-            .filter(and_(Todos.id == todo_id, Todos.user_id == user.user_id))
+            .filter(
+                and_(
+                    Todos.id == todo_id,
+                    Todos.user_id == user.user_id,
+                    Todos.deleted_at.is_(None),
+                )
+            )
             .first()
         )
 
         if not todo:
-            logging.warning(
-                f"Todo not found for deletion: {todo_id} user {user.user_id}"
+            logger.warning(
+                "Todo not found for deletion: %s user %s", todo_id, user.user_id
             )
             raise HTTPException(status_code=404, detail="Todo not found")
 
-        db.delete(todo)
+        if SOFT_DELETE_ENABLED:
+            todo.deleted_at = func.now()
+        else:
+            db.delete(todo)
+        record_event(
+            db,
+            "todo.deleted",
+            "todo",
+            todo.id,
+            {"id": todo.id, "user_id": user.user_id, "soft": SOFT_DELETE_ENABLED},
+        )
         db.commit()
+        todo_list_cache.bump(user.user_id)
+        mark_user_write(user.user_id)
 
-        logging.info(f"Deleted todo {todo_id} for user {user.user_id}")
+        logger.info("Deleted todo %s for user %s", todo_id, user.user_id)
         return True
 
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error deleting todo {todo_id} for user {user.user_id}: {e}")
+        logger.error("Error deleting todo %s for user %s: %s", todo_id, user.user_id, e)
         raise HTTPException(status_code=500, detail="Failed to delete todo")
+
+
+@traced()
+def restore_todo_by_id(db: Session, user: CurrentUser, todo_id: str) -> TodoResponse:
+
+    if not user:
+        logger.warning("Unauthorized access attempt to restore_todo_by_id")
+        raise HTTPException(status_code=401, detail="Auth failed")
+
+    try:
+        todo = (
+            db.query(Todos)
+            .filter(
+                and_(
+                    Todos.id == todo_id,
+                    Todos.user_id == user.user_id,
+                    Todos.deleted_at.is_not(None),
+                )
+            )
+            .first()
+        )
+
+        if not todo:
+            logger.warning(
+                "Deleted todo not found for restore: %s user %s", todo_id, user.user_id
+            )
+            raise HTTPException(status_code=404, detail="Deleted todo not found")
+
+        todo.deleted_at = None
+        record_event(
+            db,
+            "todo.restored",
+            "todo",
+            todo.id,
+            {"id": todo.id, "user_id": user.user_id},
+        )
+        db.commit()
+        todo_list_cache.bump(user.user_id)
+        mark_user_write(user.user_id)
+
+        logger.info("Restored todo %s for user %s", todo_id, user.user_id)
+        return TodoResponse.model_validate(todo)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(
+            "Error restoring todo %s for user %s: %s", todo_id, user.user_id, e
+        )
+        raise HTTPException(status_code=500, detail="Failed to restore todo")
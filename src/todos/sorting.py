@@ -0,0 +1,170 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, String, and_, bindparam, cast, or_, tuple_
+from starlette import status
+
+from src.entities.todos import TODO_SORT_EXPRESSIONS, Todos
+
+MAX_SORT_KEYS = 3
+_TIMESTAMP_FIELDS = {"deadline", "created_at"}
+
+
+@dataclass(frozen=True)
+class SortKey:
+    field: str
+    descending: bool = False
+
+    def __str__(self) -> str:
+        return f"{self.field}:{'desc' if self.descending else 'asc'}"
+
+
+def _invalid(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail
+    )
+
+
+def parse_sort_spec(sort: str | None, sort_order: str = "asc") -> tuple[SortKey, ...]:
+    """Parse "field[:asc|desc],..." against the whitelist in TODO_SORT_EXPRESSIONS.
+
+    Without a spec, the legacy behaviour applies: priority in `sort_order`.
+    """
+
+    if not sort:
+        return (SortKey("priority", sort_order.lower() == "desc"),)
+
+    keys = []
+    for part in sort.split(","):
+        field, _, direction = part.strip().partition(":")
+        direction = direction.lower() or "asc"
+        if field not in TODO_SORT_EXPRESSIONS:
+            raise _invalid(
+                f"Cannot sort by '{field}'; allowed: "
+                + ", ".join(TODO_SORT_EXPRESSIONS)
+            )
+        if direction not in ("asc", "desc"):
+            raise _invalid(f"Sort direction must be 'asc' or 'desc': '{direction}'")
+        if any(key.field == field for key in keys):
+            raise _invalid(f"Duplicate sort field '{field}'")
+        keys.append(SortKey(field, direction == "desc"))
+
+    if len(keys) > MAX_SORT_KEYS:
+        raise _invalid(f"At most {MAX_SORT_KEYS} sort keys are allowed")
+    return tuple(keys)
+
+
+def order_by_clauses(keys: tuple[SortKey, ...]) -> list:
+    clauses = [
+        TODO_SORT_EXPRESSIONS[key.field].desc()
+        if key.descending
+        else TODO_SORT_EXPRESSIONS[key.field].asc()
+        for key in keys
+    ]
+    # id breaks ties so every sort is a total order and pages never overlap;
+    # it follows the last key's direction so a single-direction sort can be
+    # read straight off the (user_id, key, id) index in either direction.
+    clauses.append(Todos.id.desc() if keys[-1].descending else Todos.id.asc())
+    return clauses
+
+
+def sort_values(keys: tuple[SortKey, ...], row) -> list:
+    """The cursor values of a result row, as JSON-friendly scalars."""
+
+    values = []
+    for key in keys:
+        value = getattr(row, key.field)
+        if key.field == "deadline" and value is None:
+            value = "infinity"
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        values.append(value)
+    values.append(str(row.id))
+    return values
+
+
+def encode_cursor(keys: tuple[SortKey, ...], values: list) -> str:
+    payload = {"s": ",".join(str(key) for key in keys), "v": values}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _check_cursor_value(field: str, value) -> None:
+    """Raise ValueError unless `value` is what sort_values writes for `field`."""
+
+    if field == "id":
+        UUID(value)
+    elif field in _TIMESTAMP_FIELDS:
+        if not isinstance(value, str):
+            raise ValueError(field)
+        if not (field == "deadline" and value == "infinity"):
+            datetime.fromisoformat(value)
+    # bool is an int subclass, so compare types exactly.
+    elif type(value) is not TODO_SORT_EXPRESSIONS[field].type.python_type:
+        raise ValueError(field)
+
+
+def decode_cursor(keys: tuple[SortKey, ...], cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        values = payload["v"]
+    except (ValueError, KeyError, TypeError):
+        raise _invalid("Malformed cursor")
+    spec = ",".join(str(key) for key in keys)
+    if (
+        payload.get("s") != spec
+        or not isinstance(values, list)
+        or len(values) != len(keys) + 1
+    ):
+        raise _invalid("Cursor does not match the requested sort")
+    fields = [key.field for key in keys] + ["id"]
+    try:
+        for field, value in zip(fields, values):
+            _check_cursor_value(field, value)
+    except (ValueError, TypeError, AttributeError):
+        raise _invalid("Malformed cursor")
+    return values
+
+
+def keyset_params(values: list) -> dict:
+    """Bind values for keyset_predicate, from decode_cursor or sort_values."""
+
+    return {f"after_{i}": value for i, value in enumerate(values)}
+
+
+def keyset_predicate(keys: tuple[SortKey, ...]):
+    """Rows strictly after the cursor in the order given by `keys` then id.
+
+    The cursor arrives through bound parameters (see keyset_params), so the
+    statement for a sort spec is the same on every page. A single-direction
+    sort becomes one row-value comparison the index can seek on; mixed
+    directions expand to (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ... with
+    per-key operators.
+    """
+
+    fields = [key.field for key in keys] + ["id"]
+    expressions = [TODO_SORT_EXPRESSIONS[key.field] for key in keys] + [Todos.id]
+    directions = [key.descending for key in keys] + [keys[-1].descending]
+    bound = [
+        cast(bindparam(f"after_{i}", type_=String), DateTime(timezone=True))
+        if field in _TIMESTAMP_FIELDS
+        else bindparam(f"after_{i}", type_=expression.type)
+        for i, (field, expression) in enumerate(zip(fields, expressions))
+    ]
+
+    if len(set(directions)) == 1:
+        if directions[0]:
+            return tuple_(*expressions) < tuple_(*bound)
+        return tuple_(*expressions) > tuple_(*bound)
+
+    alternatives = []
+    for i, (expression, descending) in enumerate(zip(expressions, directions)):
+        equal_prefix = [expressions[j] == bound[j] for j in range(i)]
+        after = expression < bound[i] if descending else expression > bound[i]
+        alternatives.append(and_(*equal_prefix, after))
+    return or_(*alternatives)
@@ -1,22 +1,29 @@
 from fastapi import APIRouter, status
-from uuid import UUID
 from src.users.schemas import UserResponse, PasswordChange
-from src.dependency import DbSession
+from src.dependency import Coalescer, ShardDbSession
 from src.auth.service import CurrentUser
 from src.users.service import get_user_by_id, change_pass
+from src.database.routing import read_key, read_session_for
+from src.observability.tracing import TracedRoute
 
 
-router = APIRouter(prefix="/users", tags=["Users"])
+router = APIRouter(prefix="/users", tags=["Users"], route_class=TracedRoute)
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user(current_user: CurrentUser, db: DbSession):
-    return get_user_by_id(db, current_user.get_uuid())
+async def get_current_user(current_user: CurrentUser, flight: Coalescer):
+    user_id = current_user.user_id
+    return await flight.do(
+        read_key("me", user_id),
+        get_user_by_id,
+        user_id,
+        session_factory=read_session_for(user_id),
+    )
 
 
 @router.put("/change-password", status_code=status.HTTP_200_OK)
 async def change_password(
-    password_change: PasswordChange, db: DbSession, current_user: CurrentUser
+    password_change: PasswordChange, db: ShardDbSession, current_user: CurrentUser
 ):
-    change_pass(db, current_user.get_uuid(), password_change)
+    change_pass(db, current_user.user_id, password_change)
     return {"message": "Password changed successfully."}
@@ -1,57 +1,66 @@
 from src.users.schemas import UserResponse, PasswordChange
 from src.entities.users import Users
 from src.auth.service import get_password_hash, verify_password
+from src.database.routing import mark_user_write
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 from starlette import status
 from uuid import UUID
 from fastapi import HTTPException
 import logging
+from src.observability.tracing import traced
 from sqlalchemy.ext.asyncio import AsyncSession
 
+logger = logging.getLogger(__name__)
 
+_user_by_id = select(Users).where(Users.id == bindparam("user_id")).limit(1)
+
+
+@traced()
 def get_user_by_id(db: Session, user_id: UUID) -> Users:
 
     try:
-        user = db.query(Users).filter(Users.id == user_id).first()
+        user = db.scalars(_user_by_id, {"user_id": user_id}).first()
 
         if not user:
-            logging.warning(f"User not found with ID: {user_id}")
+            logger.warning("User not found with ID: %s", user_id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found."
             )
 
-        logging.info(f"Successfully retrieved user with ID: {user_id}")
+        logger.info("Successfully retrieved user with ID: %s", user_id)
         return user
 
     except Exception as e:
-        logging.error(f"Error retrieving user with ID {user_id}: {e}")
+        logger.error("Error retrieving user with ID %s: %s", user_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to retrieve user.",
         )
 
 
+@traced()
 def change_pass(db: Session, user_id: UUID, change_pass: PasswordChange) -> None:
 
     try:
         user = get_user_by_id(db, user_id)
 
         if not verify_password(change_pass.current_password, user.password):
-            logging.warning(f"Invalid current password for user ID: {user_id}")
+            logger.warning("Invalid current password for user ID: %s", user_id)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid current password.",
             )
 
         if verify_password(change_pass.new_password, user.password):
-            logging.warning(f"New password same as old password for user ID: {user_id}")
+            logger.warning("New password same as old password for user ID: %s", user_id)
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="New password cannot be the same as the old password.",
             )
 
         if change_pass.new_password != change_pass.new_password_confirm:
-            logging.warning(f"Password confirmation mismatch for user ID: {user_id}")
+            logger.warning("Password confirmation mismatch for user ID: %s", user_id)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="New password and confirmation do not match.",
@@ -60,21 +69,22 @@ def change_pass(db: Session, user_id: UUID, change_pass: PasswordChange) -> None
         try:
             user.password = get_password_hash(change_pass.new_password)
         except Exception as e:
-            logging.error(f"Failed to hash password for user ID {user_id}: {e}")
+            logger.error("Failed to hash password for user ID %s: %s", user_id, e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to update password.",
             )
 
         db.commit()
+        mark_user_write(user_id)
 
-        logging.info(f"Password successfully changed for user ID: {user_id}")
+        logger.info("Password successfully changed for user ID: %s", user_id)
 
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(
-            f"Unexpected error during password change for user ID {user_id}: {e}"
+        logger.error(
+            "Unexpected error during password change for user ID %s: %s", user_id, e
         )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -0,0 +1,32 @@
+"""Shared fixtures. The tests run against the database in POSTGRES_URL.
+
+Every test module skips itself when POSTGRES_URL is unset, before it
+imports anything from src: dbcore builds its engine at import time.
+"""
+
+import uuid
+
+import pytest
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+@pytest.fixture
+def connection():
+    """A connection whose outer transaction is rolled back after the test."""
+
+    from src.database.dbcore import engine
+
+    conn = engine.connect()
+    outer = conn.begin()
+    try:
+        yield conn
+    finally:
+        outer.rollback()
+        conn.close()
+
+
+@pytest.fixture
+def suffix():
+    return uuid.uuid4().hex[:12]
@@ -0,0 +1,121 @@
+import os
+
+import pytest
+
+if not os.getenv("POSTGRES_URL"):
+    pytest.skip("POSTGRES_URL is not set", allow_module_level=True)
+
+from sqlalchemy import event
+
+from src.auth.schemas import Principal, RegisterUserRequest
+from src.auth.service import create_user
+from src.database.dbcore import SessionLocal
+from src.entities.todos import Todos
+from src.enums.todos import TodoCategory
+from src.todos.schemas import TodoRequest
+from src.todos.service import new_todo
+
+
+class StatementLog:
+    """Statements sent on a connection; savepoint releases count as commits."""
+
+    def __init__(self):
+        self.statements: list[str] = []
+        self.commits = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("RELEASE SAVEPOINT"):
+            self.commits += 1
+        elif not statement.startswith("SAVEPOINT"):
+            self.statements.append(" ".join(statement.split()))
+
+    def take(self) -> tuple[list[str], int]:
+        taken = self.statements, self.commits
+        self.statements, self.commits = [], 0
+        return taken
+
+
+@pytest.fixture
+def db(connection):
+    # Production session settings; service commits only release a savepoint.
+    session = SessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def log(connection):
+    statements = StatementLog()
+    event.listen(connection, "before_cursor_execute", statements)
+    yield statements
+    event.remove(connection, "before_cursor_execute", statements)
+
+
+def _prefixes(statements: list[str], expected: list[str]) -> list[str]:
+    # The unit of work may flush the row and its outbox event in either order.
+    return sorted(
+        next((prefix for prefix in expected if sql.startswith(prefix)), sql)
+        for sql in statements
+    )
+
+
+def _register(db, suffix):
+    return create_user(
+        db,
+        RegisterUserRequest(
+            email=f"roundtrip_{suffix}@example.com",
+            username=f"rt_{suffix}",
+            password="Roundtrip-check1!",
+        ),
+    )
+
+
+def test_create_user_is_one_insert_returning_and_one_commit(db, log, suffix):
+    expected = [
+        "SELECT user_shards.email",
+        "INSERT INTO user_shards",
+        "INSERT INTO users",
+        "INSERT INTO outbox_events",
+    ]
+
+    user = _register(db, suffix)
+    statements, commits = log.take()
+
+    assert commits == 1
+    assert _prefixes(statements, expected) == sorted(expected)
+    assert all("RETURNING" in sql for sql in statements if "INTO users " in sql)
+    # Server defaults came back with the INSERT: reading them sends nothing.
+    assert (user.id, user.email, user.username, user.created_at)
+    assert log.take() == ([], 0)
+
+
+def test_new_todo_is_one_insert_returning_and_one_commit(db, log, suffix):
+    user = _register(db, suffix)
+    # new_todo returns a response model; hold on to the row it persisted,
+    # which the session itself only references weakly.
+    persisted = []
+    event.listen(db, "pending_to_persistent", lambda session, obj: persisted.append(obj))
+    log.take()
+
+    todo = new_todo(
+        db,
+        TodoRequest(
+            title="Round trip check",
+            description="Created by test_create_round_trips",
+            categories=TodoCategory.OTHER,
+            priority=1,
+        ),
+        Principal(user_id=user.id, email=user.email),
+    )
+    statements, commits = log.take()
+
+    expected = ["INSERT INTO todos", "INSERT INTO outbox_events"]
+    assert commits == 1
+    assert _prefixes(statements, expected) == sorted(expected)
+    assert all("RETURNING" in sql for sql in statements if "INTO todos " in sql)
+
+    created = next(obj for obj in persisted if isinstance(obj, Todos))
+    assert created.id == todo.id
+    assert created.complete is False
+    assert created.created_at is not None and created.updated_at is not None
+    assert log.take() == ([], 0)
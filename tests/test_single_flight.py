@@ -0,0 +1,132 @@
+import asyncio
+import os
+import threading
+import uuid
+
+import pytest
+
+if not os.getenv("POSTGRES_URL"):
+    pytest.skip("POSTGRES_URL is not set", allow_module_level=True)
+
+from sqlalchemy import delete, event
+
+from src.auth.schemas import Principal
+from src.cache.query_cache import todo_list_cache
+from src.cache.singleflight import SingleFlight
+from src.database.dbcore import SessionLocal, engine
+from src.database.routing import mark_user_write, read_key
+from src.entities.todos import Todos
+from src.entities.users import Users
+from src.enums.todos import TodoCategory
+from src.todos.service import get_user_todos_json
+
+CALLERS = 50
+
+
+def _todo(user_id, title: str) -> Todos:
+    return Todos(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        title=title,
+        description="Created by test_single_flight",
+        categories=TodoCategory.OTHER,
+        tags=[TodoCategory.OTHER],
+        priority=1,
+    )
+
+
+@pytest.fixture
+def user(suffix):
+    # Committed for real: single-flight runs each call on its own session in
+    # the threadpool, so the rows must be visible outside one connection.
+    user_id = uuid.uuid4()
+    with SessionLocal() as db:
+        db.add(
+            Users(
+                id=user_id,
+                email=f"flight_{suffix}@example.com",
+                username=f"flight_{suffix}",
+                password="x",
+            )
+        )
+        db.flush()
+        db.add_all(_todo(user_id, f"Seeded todo {i}") for i in range(20))
+        db.commit()
+    yield Principal(user_id=user_id)
+    with engine.begin() as conn:
+        conn.execute(delete(Users).where(Users.id == user_id))
+
+
+@pytest.fixture
+def statements():
+    executed = []
+    lock = threading.Lock()
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        with lock:
+            executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(engine, "before_cursor_execute", count)
+
+
+def _key(user: Principal) -> tuple:
+    # The key /todos/all-todo builds for a request without query parameters.
+    return read_key("all-todo", user.user_id, None, "asc", *(None,) * 6)
+
+
+def _read(flight: SingleFlight, user: Principal, fn=get_user_todos_json):
+    return flight.do(_key(user), fn, user, None, "asc", None)
+
+
+def test_concurrent_identical_reads_run_one_query(user, statements):
+    flight = SingleFlight()
+    asyncio.run(_read(flight, user))
+    single = len(statements)
+    statements.clear()
+    todo_list_cache.bump(user.user_id)
+
+    async def burst():
+        return await asyncio.gather(*(_read(flight, user) for _ in range(CALLERS)))
+
+    bodies = asyncio.run(burst())
+
+    assert len(statements) == single
+    assert flight.executions == 2
+    assert flight.coalesced == CALLERS - 1
+    assert len(set(bodies)) == 1
+
+
+def test_read_after_write_does_not_join_earlier_call(user):
+    flight = SingleFlight()
+    read_done, release = threading.Event(), threading.Event()
+
+    def held(db, *args):
+        body = get_user_todos_json(db, *args)
+        read_done.set()
+        release.wait(5)
+        return body
+
+    def write():
+        with SessionLocal() as db:
+            db.add(_todo(user.user_id, "Written mid-flight"))
+            db.commit()
+        todo_list_cache.bump(user.user_id)
+        mark_user_write(user.user_id)
+
+    async def scenario():
+        before = asyncio.ensure_future(_read(flight, user, held))
+        await asyncio.to_thread(read_done.wait, 5)
+        await asyncio.to_thread(write)
+        after = asyncio.ensure_future(_read(flight, user))
+        # Let the second read pick its call while the first is still running.
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(before, after)
+
+    stale, fresh = asyncio.run(scenario())
+
+    assert flight.executions == 2
+    assert b"Written mid-flight" not in stale
+    assert b"Written mid-flight" in fresh
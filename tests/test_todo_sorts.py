@@ -0,0 +1,187 @@
+import base64
+import json
+import os
+import uuid
+
+import pytest
+
+if not os.getenv("POSTGRES_URL"):
+    pytest.skip("POSTGRES_URL is not set", allow_module_level=True)
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import psycopg2
+
+from src.database.dbcore import engine
+from src.entities.todos import TODO_SORT_EXPRESSIONS
+from src.todos.service import todo_list_query
+from src.todos.sorting import (
+    decode_cursor,
+    encode_cursor,
+    parse_sort_spec,
+    sort_values,
+)
+
+_DIALECT = psycopg2.dialect(paramstyle="named")
+
+TODOS = 20_000
+PAGE = 50
+SINGLE_KEY_SPECS = [
+    f"{field}:{direction}"
+    for field in TODO_SORT_EXPRESSIONS
+    for direction in ("asc", "desc")
+]
+MULTI_KEY_SPECS = [
+    "deadline:asc,priority:desc",
+    "priority:desc,created_at:desc",
+    "title:asc,deadline:asc,created_at:desc",
+]
+
+
+@pytest.fixture(scope="module")
+def seeded():
+    """One user with TODOS todos, in a transaction rolled back afterwards."""
+
+    conn = engine.connect()
+    outer = conn.begin()
+    try:
+        user_id = conn.execute(
+            text(
+                "INSERT INTO users (id, email, username, password) "
+                "VALUES (gen_random_uuid(), 'sorts@example.com', 'sorts_test', 'x') "
+                "RETURNING id"
+            )
+        ).scalar()
+        conn.execute(
+            text(
+                "INSERT INTO todos (id, user_id, title, description, categories, "
+                "tags, priority, complete, deadline) "
+                "SELECT gen_random_uuid(), :user_id, 'Todo ' || md5(g::text), "
+                "'Seeded by test_todo_sorts', 'OTHER', ARRAY['OTHER'::todo_category], "
+                "1 + g % 10, g % 3 = 0, "
+                "CASE WHEN g % 4 = 0 THEN NULL "
+                "ELSE now() + g * interval '1 minute' END "
+                "FROM generate_series(1, :todos) g"
+            ),
+            {"user_id": user_id, "todos": TODOS},
+        )
+        conn.execute(text("ANALYZE todos"))
+        # The smallest work_mem: any sort of more than a page would spill.
+        conn.execute(text("SET LOCAL work_mem = '64kB'"))
+        yield conn, user_id
+    finally:
+        outer.rollback()
+        conn.close()
+
+
+def _plan(conn, statement) -> dict:
+    sql = str(
+        statement.compile(dialect=_DIALECT, compile_kwargs={"literal_binds": True})
+    )
+    raw = conn.execution_options(no_parameters=True).exec_driver_sql(
+        f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"
+    )
+    plan = raw.scalar()
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+
+
+def _sort_nodes(plan: dict) -> list[dict]:
+    found = [plan] if plan["Node Type"] == "Sort" else []
+    for child in plan.get("Plans", []):
+        found += _sort_nodes(child)
+    return found
+
+
+def _index_names(plan: dict) -> set[str]:
+    found = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        found |= _index_names(child)
+    return found
+
+
+def _sort_index(conn, field: str) -> set[str]:
+    """ix_todos_sort_<field> and, on a partitioned table, its partitions' indexes."""
+
+    name = f"ix_todos_sort_{field}"
+    partitions = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:name AS regclass)"
+        ),
+        {"name": name},
+    ).scalars()
+    return {name, *partitions}
+
+
+def _pages(conn, user_id, spec: str):
+    keys = parse_sort_spec(spec)
+    first = todo_list_query(user_id, keys, limit=PAGE)
+    last = conn.execute(first).all()[-1]
+    after = sort_values(keys, last)
+    return first, todo_list_query(user_id, keys, after=after, limit=PAGE)
+
+
+@pytest.mark.parametrize("spec", SINGLE_KEY_SPECS + MULTI_KEY_SPECS)
+def test_paged_sorts_never_spill_to_disk(seeded, spec):
+    conn, user_id = seeded
+    for statement in _pages(conn, user_id, spec):
+        for node in _sort_nodes(_plan(conn, statement)):
+            assert node.get("Sort Space Type") != "Disk", node
+            assert "external" not in node["Sort Method"], node
+
+
+@pytest.mark.parametrize("spec", SINGLE_KEY_SPECS)
+def test_single_key_sorts_read_index_order(seeded, spec):
+    conn, user_id = seeded
+    index = _sort_index(conn, spec.partition(":")[0])
+    for statement in _pages(conn, user_id, spec):
+        plan = _plan(conn, statement)
+        assert not _sort_nodes(plan), f"{spec} sorts instead of reading an index"
+        assert _index_names(plan) & index, _index_names(plan)
+
+
+CURSOR_SPEC = "priority:asc,deadline:desc,title:asc"
+_ID = str(uuid.UUID(int=1))
+
+
+def _cursor(values) -> str:
+    payload = json.dumps({"s": CURSOR_SPEC, "v": values}).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [1, "infinity", "a", _ID],
+        [1, "2026-01-01T09:30:00+00:00", "a", _ID],
+    ],
+)
+def test_cursor_values_round_trip(values):
+    keys = parse_sort_spec(CURSOR_SPEC)
+
+    assert decode_cursor(keys, encode_cursor(keys, values)) == values
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "!!not base64!!",
+        base64.urlsafe_b64encode(b"[1, 2]").decode("ascii"),
+        _cursor([True, "infinity", "a", _ID]),
+        _cursor([1.5, "infinity", "a", _ID]),
+        _cursor(["1", "infinity", "a", _ID]),
+        _cursor([None, "infinity", "a", _ID]),
+        _cursor([1, "tomorrow", "a", _ID]),
+        _cursor([1, 1767225600, "a", _ID]),
+        _cursor([1, "infinity", 7, _ID]),
+        _cursor([1, "infinity", "a", "not-a-uuid"]),
+        _cursor([1, "infinity", "a", 1]),
+        _cursor([1, "infinity", "a"]),
+        _cursor("1aa" + _ID),
+    ],
+)
+def test_decode_cursor_rejects_mistyped_values(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(parse_sort_spec(CURSOR_SPEC), cursor)
+
+    assert raised.value.status_code == 422